@@ -0,0 +1,90 @@
+"""
+Measures the client-side overhead of a call: building the url, headers and
+auth, preparing the request and decoding the response. Requests never leave
+the process; they are answered by :class:`StubAdapter`, so any change in the
+numbers comes from the client itself.
+
+Usage::
+
+    python -m benchmarks.client_overhead [--calls 20000] [--repeat 5]
+"""
+import argparse
+import timeit
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+from rabbitmq_admin import AdminAPI
+
+
+class StubAdapter(BaseAdapter):
+    """
+    A transport adapter that answers every request from memory, with a small
+    JSON document for GETs and ``204 No Content`` for everything else
+    """
+
+    body = b'{"management_version": "3.8.0", "cluster_name": "rabbit@stub"}'
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if request.method == 'GET':
+            response.status_code = 200
+            response._content = self.body
+        else:
+            response.status_code = 204
+            response._content = b''
+        return response
+
+    def close(self):
+        pass
+
+
+def stub_client():
+    """
+    An :class:`AdminAPI` whose connection pool is replaced by
+    :class:`StubAdapter`
+    """
+    api = AdminAPI('http://stub:15672', auth=('guest', 'guest'))
+    api._adapter = StubAdapter()
+    return api
+
+
+#: The calls measured, by name
+CASES = {
+    'overview': lambda api: api.overview(),
+    'get_node': lambda api: api.get_node('rabbit@stub', memory=True),
+    'list_queues_for_vhost': lambda api: api.list_queues_for_vhost(
+        'my-vhost', columns=['name', 'messages'], disable_stats=True),
+    'create_vhost': lambda api: api.create_vhost('my-vhost'),
+    'delete_vhost': lambda api: api.delete_vhost('my-vhost'),
+}
+
+
+def measure(calls, repeat):
+    """
+    :returns: The best time per call, in microseconds, of every case
+    :rtype: dict
+    """
+    api = stub_client()
+    results = {}
+    for name, case in sorted(CASES.items()):
+        case(api)  # warm up the session
+        best = min(timeit.repeat(lambda: case(api), number=calls, repeat=repeat))
+        results[name] = best / calls * 1e6
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name, overhead in sorted(measure(args.calls, args.repeat).items()):
+        print('{0:24} {1:8.1f} us/call'.format(name, overhead))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the time taken to decode the responses of the largest endpoints:
+with :meth:`requests.Response.json`, as the client used to, and with each
+available :mod:`rabbitmq_admin.codec` codec. Bodies come from a synthetic
+cluster, so no server is needed.
+
+Usage::
+
+    python -m benchmarks.codec [--bindings 500000] [--queues 100000] [--repeat 3]
+"""
+import argparse
+import timeit
+
+from requests.models import Response
+
+from benchmarks.synthetic import SyntheticCluster
+from rabbitmq_admin.codec import JSONCodec, OrjsonCodec
+
+#: The endpoints whose responses are decoded
+PATHS = ('/api/bindings', '/api/queues', '/api/definitions')
+
+
+def codecs():
+    """
+    Every codec that can be used here, by name
+    """
+    available = {'json': JSONCodec()}
+    try:
+        available['orjson'] = OrjsonCodec()
+    except ImportError:
+        pass
+    return available
+
+
+def response_json(body):
+    response = Response()
+    response.status_code = 200
+    response._content = body
+    return response.json()
+
+
+def measure(cluster, repeat):
+    """
+    :returns: Per endpoint, its body size and the best decode time in
+        seconds of every decoder
+    :rtype: dict
+    """
+    decoders = dict(('{0}.loads'.format(name), codec.loads) for name, codec in codecs().items())
+    decoders['Response.json'] = response_json
+
+    results = {}
+    for path in PATHS:
+        body = cluster.body_for(path)
+        times = dict(
+            (name, min(timeit.repeat(lambda: decode(body), number=1, repeat=repeat)))
+            for name, decode in decoders.items()
+        )
+        results[path] = {'bytes': len(body), 'seconds': times}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bindings', type=int, default=500000)
+    parser.add_argument('--queues', type=int, default=100000)
+    parser.add_argument('--exchanges', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cluster = SyntheticCluster(
+        bindings=args.bindings, queues=args.queues, exchanges=args.exchanges)
+    for path, result in sorted(measure(cluster, args.repeat).items()):
+        print('{0} ({1:.1f} MB)'.format(path, result['bytes'] / 1e6))
+        for name, seconds in sorted(result['seconds'].items()):
+            print('    {0:16} {1:8.3f} s'.format(name, seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the per-call latency of a fresh connection per request (module-level
+``requests.get``, the pre-0.3 behaviour) against the pooled keep-alive session
+owned by :class:`rabbitmq_admin.base.Resource`.
+
+Usage::
+
+    python -m benchmarks.keep_alive [--calls 2000]
+"""
+import argparse
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from rabbitmq_admin import AdminAPI
+
+
+def timed(calls, func):
+    start = time.time()
+    for _ in range(calls):
+        func()
+    return (time.time() - start) / calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with StubServer() as server:
+        auth = ('guest', 'guest')
+        url = server.url + '/api/overview'
+
+        def fresh_connection():
+            requests.get(url, auth=auth, headers={'Content-type': 'application/json'}).json()
+
+        with AdminAPI(server.url, auth=auth) as api:
+            api.overview()  # warm up the pool
+            pooled = timed(args.calls, api.overview)
+        fresh = timed(args.calls, fresh_connection)
+
+    print('fresh connection per call: {0:8.1f} us/call'.format(fresh * 1e6))
+    print('pooled keep-alive session: {0:8.1f} us/call'.format(pooled * 1e6))
+    print('speed-up:                  {0:8.2f}x'.format(fresh / pooled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the memory held by the decoded responses of the largest list
+endpoints: as plain dicts, and as :mod:`rabbitmq_admin.records` records.
+Bodies come from a synthetic cluster, so no server is needed.
+
+Usage::
+
+    python -m benchmarks.records [--connections 100000] [--bindings 500000]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.synthetic import SyntheticCluster
+from rabbitmq_admin.codec import default_codec
+from rabbitmq_admin.records import Binding, Channel, Connection, Queue
+
+#: The endpoints whose responses are decoded, with their record type
+PATHS = (
+    ('/api/connections', Connection),
+    ('/api/channels', Channel),
+    ('/api/queues', Queue),
+    ('/api/bindings', Binding),
+)
+
+
+def held(build):
+    """
+    The bytes still allocated by ``build()`` while its result is alive
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def measure(cluster):
+    """
+    :returns: Per endpoint, its item count and the bytes held as dicts and as
+        records
+    :rtype: dict
+    """
+    codec = default_codec()
+    results = {}
+    for path, record_type in PATHS:
+        body = cluster.body_for(path)
+        items = codec.loads(body)
+        results[path] = {
+            'items': len(items),
+            'dicts': held(lambda: codec.loads(body)),
+            'records': held(lambda: record_type.convert(codec.loads(body))),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--connections', type=int, default=100000)
+    parser.add_argument('--queues', type=int, default=100000)
+    parser.add_argument('--bindings', type=int, default=500000)
+    args = parser.parse_args(argv)
+
+    cluster = SyntheticCluster(
+        connections=args.connections, queues=args.queues, bindings=args.bindings)
+    for path, result in sorted(measure(cluster).items()):
+        print('{0} ({1} items)'.format(path, result['items']))
+        for name in ('dicts', 'records'):
+            print('    {0:8} {1:8.1f} MB {2:6.0f} B/item'.format(
+                name, result[name] / 1e6, result[name] / float(result['items'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+A tiny stand-in for the RabbitMQ management HTTP API, used by the
+benchmarks. It answers every GET with a canned JSON document and every other
+method with ``204 No Content``, over HTTP/1.1 so that clients can keep their
+connections alive. Given a :class:`benchmarks.synthetic.SyntheticCluster`, it
+serves that cluster's objects instead.
+"""
+import json
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b''):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _drain(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+    def do_GET(self):
+        body = self.server.body_for(self.path)
+        if body is None:
+            self._send(404, b'{"error":"Object Not Found","reason":"Not Found"}')
+        else:
+            self._send(200, body)
+
+    def do_PUT(self):
+        self._drain()
+        self._send(204)
+
+    do_POST = do_PUT
+    do_DELETE = do_PUT
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, handler=StubHandler, cluster=None):
+        HTTPServer.__init__(self, (host, port), handler)
+        self.cluster = cluster
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self.server_address)
+
+    def body_for(self, path):
+        if self.cluster is not None:
+            return self.cluster.body_for(path)
+        return json.dumps({'management_version': 'stub', 'path': path}).encode('utf-8')
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
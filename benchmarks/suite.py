@@ -0,0 +1,284 @@
+"""
+Measures every ``list_*``, ``get_*`` and ``iter_*`` method, and the bulk
+helpers, against a synthetic cluster served by a local stub of the management
+API. Reports throughput, p50/p99 latency and peak RSS per method as JSON, so
+results can be compared across releases.
+
+The stub runs in its own process, and every method is measured in a fresh
+process of its own, so that peak RSS reflects that method alone.
+
+Usage::
+
+    python -m benchmarks.suite [--connections 100000] [--bindings 500000]
+        [--vhosts 10000] [--calls 5] [--only PATTERN] [--output results.json]
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import re
+import sys
+import time
+import timeit
+
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import SyntheticCluster
+from rabbitmq_admin import AdminAPI
+from rabbitmq_admin.bulk import BulkReport
+from rabbitmq_admin.version import __version__
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+AUTH = ('guest', 'guest')
+
+#: The calls measured, by name. Each takes the client and the sample object
+#: names found by :func:`find_samples`.
+CASES = {
+    'overview': lambda api, s: api.overview(),
+    'get_cluster_name': lambda api, s: api.get_cluster_name(),
+    'list_nodes': lambda api, s: api.list_nodes(),
+    'get_node': lambda api, s: api.get_node(s['node'], memory=True),
+    'list_extensions': lambda api, s: api.list_extensions(),
+    'get_definitions': lambda api, s: api.get_definitions(),
+    'list_connections': lambda api, s: api.list_connections(),
+    'list_connections(stream=True)': lambda api, s: api.list_connections(stream=True),
+    'iter_connections': lambda api, s: api.iter_connections(page_size=500),
+    'get_connection': lambda api, s: api.get_connection(s['connection']),
+    'list_connection_channels': lambda api, s: api.list_connection_channels(s['connection']),
+    'list_channels': lambda api, s: api.list_channels(),
+    'iter_channels': lambda api, s: api.iter_channels(page_size=500),
+    'get_channel': lambda api, s: api.get_channel(s['channel']),
+    'list_consumers': lambda api, s: api.list_consumers(),
+    'list_consumers_for_vhost': lambda api, s: api.list_consumers_for_vhost(s['vhost']),
+    'iter_consumers': lambda api, s: api.iter_consumers(),
+    'list_exchanges': lambda api, s: api.list_exchanges(),
+    'list_exchanges_for_vhost': lambda api, s: api.list_exchanges_for_vhost(s['vhost']),
+    'iter_exchanges': lambda api, s: api.iter_exchanges(page_size=500),
+    'get_exchange_for_vhost': lambda api, s: api.get_exchange_for_vhost(
+        s['exchange'], s['vhost']),
+    'list_queues': lambda api, s: api.list_queues(),
+    'list_queues(stream=True)': lambda api, s: api.list_queues(stream=True),
+    'list_queues_for_vhost': lambda api, s: api.list_queues_for_vhost(s['vhost']),
+    'iter_queues': lambda api, s: api.iter_queues(page_size=500),
+    'get_queue_for_vhost': lambda api, s: api.get_queue_for_vhost(s['queue'], s['vhost']),
+    'select_queues': lambda api, s: api.select_queues(min_messages=50),
+    'list_bindings': lambda api, s: api.list_bindings(),
+    'list_bindings(stream=True)': lambda api, s: api.list_bindings(stream=True),
+    'list_bindings_for_vhost': lambda api, s: api.list_bindings_for_vhost(s['vhost']),
+    'iter_bindings': lambda api, s: api.iter_bindings(),
+    'list_bindings_between': lambda api, s: api.list_bindings_between(
+        s['vhost'], s['exchange'], s['queue']),
+    'list_vhosts': lambda api, s: api.list_vhosts(),
+    'get_vhost': lambda api, s: api.get_vhost(s['vhost']),
+    'list_users': lambda api, s: api.list_users(),
+    'get_user': lambda api, s: api.get_user(s['user']),
+    'list_user_permissions': lambda api, s: api.list_user_permissions(s['user']),
+    'list_permissions': lambda api, s: api.list_permissions(),
+    'get_user_permission': lambda api, s: api.get_user_permission(s['vhost'], s['user']),
+    'list_policies': lambda api, s: api.list_policies(),
+    'list_policies_for_vhost': lambda api, s: api.list_policies_for_vhost(s['vhost']),
+    'get_policy_for_vhost': lambda api, s: api.get_policy_for_vhost(s['vhost'], s['policy']),
+    'bulk_create_vhosts': lambda api, s: api.bulk_create_vhosts(
+        ['bulk-{0}'.format(index) for index in range(s['bulk_size'])]),
+    'bulk_create_user_permissions': lambda api, s: api.bulk_create_user_permissions([
+        {'name': s['user'], 'vhost': 'bulk-{0}'.format(index)}
+        for index in range(s['bulk_size'])]),
+    'bulk_purge_queues': lambda api, s: api.bulk_purge_queues(min_messages=50),
+    'bulk_delete_queues': lambda api, s: api.bulk_delete_queues(vhost=s['vhost']),
+}
+
+
+def uncovered_methods():
+    """
+    The read methods of :class:`AdminAPI` that no case measures
+    """
+    measured = set(name.split('(')[0] for name in CASES)
+    return sorted(
+        name for name in dir(AdminAPI)
+        if name.startswith(('list_', 'get_', 'iter_')) and name not in measured
+    )
+
+
+def find_samples(api, bulk_size):
+    """
+    The names of one object of every kind, for the cases that read a single
+    object
+    """
+    def first(items, field='name'):
+        for item in items:
+            return item[field]
+
+    vhost = first(api.list_vhosts())
+    return {
+        'vhost': vhost,
+        'node': first(api.list_nodes()),
+        'user': first(api.list_users()),
+        'connection': first(api.iter_connections(page_size=1)),
+        'channel': first(api.iter_channels(page_size=1)),
+        'exchange': first(api.iter_exchanges(vhost, page_size=1)),
+        'queue': first(api.iter_queues(vhost, page_size=1)),
+        'policy': first(api.list_policies_for_vhost(vhost)),
+        'bulk_size': bulk_size,
+    }
+
+
+def consume(result):
+    """
+    Reads the whole result of a call, and returns its number of items
+    """
+    if isinstance(result, dict):
+        return 1
+    if isinstance(result, (list, BulkReport)):
+        return len(result)
+    return sum(1 for _ in result)
+
+
+def percentile(values, fraction):
+    """
+    The nearest-rank percentile of ``values``
+    """
+    ordered = sorted(values)
+    rank = int(math.ceil(fraction * len(ordered))) - 1
+    return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+def peak_rss_kb():
+    """
+    The peak resident set size of this process so far, in KiB, or ``None``
+    where it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure(url, name, samples, calls):
+    """
+    Calls case ``name`` ``calls`` times and summarises its performance
+    """
+    api = AdminAPI(url, AUTH)
+    case = CASES[name]
+    baseline = peak_rss_kb()
+    consume(case(api, samples))  # warm up the connection pool
+
+    latencies = []
+    items = 0
+    for _ in range(calls):
+        start = timeit.default_timer()
+        items = consume(case(api, samples))
+        latencies.append(timeit.default_timer() - start)
+
+    elapsed = sum(latencies)
+    peak = peak_rss_kb()
+    return {
+        'name': name,
+        'calls': calls,
+        'items': items,
+        'calls_per_second': calls / elapsed,
+        'items_per_second': items * calls / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_rss_kb': peak,
+        'rss_growth_kb': None if peak is None else peak - baseline,
+    }
+
+
+def _measure_in_child(results, *args):
+    try:
+        results.put(measure(*args))
+    except Exception as error:
+        results.put({'name': args[1], 'error': repr(error)})
+
+
+def _serve(sizes, urls):
+    server = StubServer(cluster=SyntheticCluster(**sizes))
+    urls.put(server.url)
+    server.serve_forever()
+
+
+def _context():
+    """
+    Fresh processes are spawned rather than forked where possible, so that
+    they do not inherit the memory of this one
+    """
+    if hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.get_context('spawn')
+    return multiprocessing  # pragma: no cover
+
+
+def run(sizes, calls=5, only=None, bulk_size=1000):
+    """
+    Starts a stub server for a cluster of ``sizes`` and measures every case
+    whose name matches the regular expression ``only``.
+
+    :returns: The results as a JSON-serialisable document
+    :rtype: dict
+    """
+    context = _context()
+    queue = context.Queue()
+    server = context.Process(target=_serve, args=(sizes, queue))
+    server.daemon = True
+    server.start()
+    try:
+        url = queue.get(timeout=600)
+        samples = find_samples(AdminAPI(url, AUTH), bulk_size)
+
+        results = []
+        for name in sorted(CASES):
+            if only and not re.search(only, name):
+                continue
+            worker = context.Process(
+                target=_measure_in_child, args=(queue, url, name, samples, calls))
+            worker.start()
+            results.append(queue.get())
+            worker.join()
+            sys.stderr.write('{0}\n'.format(json.dumps(results[-1], sort_keys=True)))
+    finally:
+        server.terminate()
+        server.join()
+
+    return {
+        'rabbitmq_admin': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': int(time.time()),
+        'sizes': sizes,
+        'calls': calls,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    for name, default in sorted(SyntheticCluster.DEFAULT_SIZES.items()):
+        parser.add_argument(
+            '--' + name.replace('_', '-'), dest=name, type=int, default=default,
+            help='default: {0}'.format(default))
+    parser.add_argument('--calls', type=int, default=5, help='calls per method')
+    parser.add_argument('--bulk-size', type=int, default=1000,
+                        help='operations per bulk call')
+    parser.add_argument('--only', help='only run methods matching this regular expression')
+    parser.add_argument('--output', help='write the results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    for name in uncovered_methods():
+        sys.stderr.write('warning: {0} is not measured\n'.format(name))
+
+    sizes = dict((name, getattr(args, name)) for name in SyntheticCluster.DEFAULT_SIZES)
+    report = json.dumps(
+        run(sizes, calls=args.calls, only=args.only, bulk_size=args.bulk_size),
+        indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+A synthetic RabbitMQ cluster of configurable size, served by
+:class:`benchmarks.stub_server.StubServer` in place of its canned document.
+It answers the read endpoints of the management API, including pagination,
+with objects shaped like the real ones.
+
+Items are kept as encoded JSON, which keeps clusters with hundreds of
+thousands of objects affordable and lets collection responses be assembled
+without encoding anything per request.
+"""
+import json
+import re
+
+from six.moves import urllib
+
+
+def _encode(item):
+    return json.dumps(item, separators=(',', ':'), sort_keys=True)
+
+
+class SyntheticCluster(object):
+    """
+    Every object is spread round-robin over the vhosts: the ``n``-th queue,
+    exchange or connection belongs to vhost ``n % vhosts``. Generation is
+    deterministic, so the same sizes always give the same cluster.
+    """
+
+    #: Collections that can be listed per vhost, e.g. ``/api/queues/my-vhost``
+    VHOST_COLLECTIONS = ('exchanges', 'queues', 'bindings', 'consumers', 'policies')
+
+    #: The default number of objects of each kind
+    DEFAULT_SIZES = {
+        'nodes': 3,
+        'vhosts': 10,
+        'users': 10,
+        'connections': 1000,
+        'channels_per_connection': 1,
+        'exchanges': 100,
+        'queues': 1000,
+        'bindings': 2000,
+        'consumers': 500,
+        'policies': 10,
+    }
+
+    def __init__(self, **sizes):
+        unknown = set(sizes) - set(self.DEFAULT_SIZES)
+        if unknown:
+            raise ValueError('Unknown sizes: {0}'.format(', '.join(sorted(unknown))))
+        self.sizes = dict(self.DEFAULT_SIZES)
+        self.sizes.update(sizes)
+
+        # Per collection, a list of (vhost, key, encoded item)
+        self.collections = {}
+        self._bodies = {}
+        self._generate()
+        self.objects = dict(
+            (name, dict((entry[1], entry[2]) for entry in entries))
+            for name, entries in self.collections.items()
+        )
+
+    def vhost(self, index):
+        return 'vhost-{0:05d}'.format(index % self.sizes['vhosts'])
+
+    def _add(self, collection, vhost, key, item):
+        self.collections.setdefault(collection, []).append((vhost, key, _encode(item)))
+
+    def _generate(self):
+        sizes = self.sizes
+        for index in range(sizes['nodes']):
+            name = 'rabbit@stub-{0}'.format(index)
+            self._add('nodes', None, name, {
+                'name': name, 'type': 'disc', 'running': True, 'mem_used': 150000000,
+                'fd_used': 100, 'sockets_used': 50, 'proc_used': 2000, 'uptime': 86400000,
+            })
+        for index in range(sizes['vhosts']):
+            name = self.vhost(index)
+            self._add('vhosts', None, name, {'name': name, 'tracing': False, 'messages': 0})
+        for index in range(sizes['users']):
+            name = 'user-{0:05d}'.format(index)
+            self._add('users', None, name, {
+                'name': name, 'password_hash': 'c3R1Yg==', 'tags': '',
+                'hashing_algorithm': 'rabbit_password_hashing_sha256',
+            })
+            vhost = self.vhost(index)
+            self._add('permissions', vhost, (vhost, name), {
+                'user': name, 'vhost': vhost, 'configure': '.*', 'write': '.*', 'read': '.*'})
+        for index in range(sizes['policies']):
+            vhost, name = self.vhost(index), 'policy-{0:05d}'.format(index)
+            self._add('policies', vhost, (vhost, name), {
+                'vhost': vhost, 'name': name, 'pattern': '^ha\\.', 'apply-to': 'queues',
+                'definition': {'ha-mode': 'all'}, 'priority': 0,
+            })
+        self._generate_connections()
+        self._generate_topology()
+
+    def _generate_connections(self):
+        sizes = self.sizes
+        for index in range(sizes['connections']):
+            vhost = self.vhost(index)
+            name = '10.0.{0}.{1}:{2} -> 10.1.0.1:5672'.format(
+                index // 65536 % 256, index // 256 % 256, 1024 + index % 256)
+            self._add('connections', vhost, name, {
+                'name': name, 'vhost': vhost, 'user': 'user-00000', 'state': 'running',
+                'node': 'rabbit@stub-{0}'.format(index % sizes['nodes']),
+                'channels': sizes['channels_per_connection'], 'protocol': 'AMQP 0-9-1',
+                'peer_host': '10.0.0.1', 'peer_port': 1024 + index % 256,
+                'recv_oct': 1000 * index, 'send_oct': 2000 * index,
+                'client_properties': {
+                    'product': 'stub', 'connection_name': 'app-{0}'.format(index)},
+            })
+            for number in range(1, sizes['channels_per_connection'] + 1):
+                channel = '{0} ({1})'.format(name, number)
+                self._add('channels', vhost, channel, {
+                    'name': channel, 'number': number, 'vhost': vhost, 'user': 'user-00000',
+                    'state': 'running', 'consumer_count': 0, 'messages_unacknowledged': 0,
+                    'prefetch_count': 10, 'connection_details': {'name': name, 'peer_port': 1024},
+                })
+
+    def _generate_topology(self):
+        sizes = self.sizes
+        vhosts = sizes['vhosts']
+        for index in range(sizes['exchanges']):
+            vhost, name = self.vhost(index), 'exchange-{0:06d}'.format(index)
+            self._add('exchanges', vhost, (vhost, name), {
+                'name': name, 'vhost': vhost, 'type': 'topic', 'durable': True,
+                'auto_delete': False, 'internal': False, 'arguments': {},
+            })
+        for index in range(sizes['queues']):
+            vhost, name = self.vhost(index), 'queue-{0:07d}'.format(index)
+            self._add('queues', vhost, (vhost, name), {
+                'name': name, 'vhost': vhost, 'durable': True, 'auto_delete': False,
+                'exclusive': False, 'arguments': {}, 'state': 'running',
+                'node': 'rabbit@stub-{0}'.format(index % sizes['nodes']),
+                'messages': index % 100, 'messages_ready': index % 100,
+                'messages_unacknowledged': 0, 'consumers': 0,
+                'message_stats': {'publish': index, 'publish_details': {'rate': 0.0}},
+            })
+        for index in range(sizes['bindings']):
+            queue = index % max(sizes['queues'], 1)
+            vhost = self.vhost(queue)
+            # An exchange of the same vhost, or amq.topic if it has none
+            exchanges = len(range(queue % vhosts, sizes['exchanges'], vhosts))
+            source = 'amq.topic'
+            if exchanges:
+                source = 'exchange-{0:06d}'.format(
+                    queue % vhosts + vhosts * (index // max(sizes['queues'], 1) % exchanges))
+            routing_key = 'key.{0}'.format(index)
+            self._add('bindings', vhost, (vhost, source, 'queue-{0:07d}'.format(queue)), {
+                'source': source, 'vhost': vhost, 'destination': 'queue-{0:07d}'.format(queue),
+                'destination_type': 'queue', 'routing_key': routing_key, 'arguments': {},
+                'properties_key': routing_key,
+            })
+        for index in range(sizes['consumers']):
+            vhost = self.vhost(index)
+            self._add('consumers', vhost, index, {
+                'consumer_tag': 'amq.ctag-{0}'.format(index), 'ack_required': True,
+                'prefetch_count': 10, 'exclusive': False, 'arguments': {},
+                'queue': {'name': 'queue-{0:07d}'.format(index), 'vhost': vhost},
+                'channel_details': {'name': 'channel-{0}'.format(index)},
+            })
+
+    def overview(self):
+        return {
+            'management_version': 'stub', 'cluster_name': 'rabbit@stub-0',
+            'node': 'rabbit@stub-0',
+            'object_totals': dict(
+                (name, len(self.collections.get(name, ())))
+                for name in ('connections', 'channels', 'exchanges', 'queues', 'consumers')
+            ),
+        }
+
+    def body_for(self, path):
+        """
+        The response body for a GET of ``path``, or ``None`` if no such
+        object exists
+        """
+        url = urllib.parse.urlsplit(path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        segments = [urllib.parse.unquote_plus(segment) for segment in url.path.split('/')[2:]]
+        if 'page' in query:
+            return self._page(segments, query)
+
+        # Only the last body is kept, as bodies of large collections are big
+        bodies = self._bodies
+        if url.path not in bodies:
+            body = self._route(segments)
+            bodies = {url.path: None if body is None else body.encode('utf-8')}
+            self._bodies = bodies
+        return bodies[url.path]
+
+    def _entries(self, segments):
+        """
+        The entries of a collection, optionally limited to one vhost
+        """
+        entries = self.collections.get(segments[0])
+        if entries is None or len(segments) > 2:
+            return None
+        if len(segments) == 2:
+            entries = [entry for entry in entries if entry[0] == segments[1]]
+        return entries
+
+    def _route(self, segments):
+        """
+        Builds the body for the path split into ``segments``
+        """
+        documents = {
+            'overview': self.overview,
+            'cluster-name': lambda: {'name': 'rabbit@stub-0'},
+            'whoami': lambda: {'name': 'guest', 'tags': 'administrator'},
+            'extensions': lambda: [],
+            'aliveness-test': lambda: {'status': 'ok'},
+        }
+        if segments[0] in documents:
+            return _encode(documents[segments[0]]())
+        if segments[0] == 'definitions':
+            return self._definitions()
+
+        if len(segments) == 1 or (
+                len(segments) == 2 and segments[0] in self.VHOST_COLLECTIONS):
+            entries = self._entries(segments)
+            return '[' + ','.join(entry[2] for entry in entries) + ']'
+        return self._object(segments)
+
+    def _object(self, segments):
+        """
+        The body of a single object, or of a collection below one
+        """
+        collection, names = segments[0], segments[1:]
+        objects = self.objects.get(collection, {})
+        if collection == 'bindings' and len(names) == 5:
+            matches = self.collections['bindings']
+            key = (names[0], names[2], names[4])
+            return '[' + ','.join(entry[2] for entry in matches if entry[1] == key) + ']'
+        if collection == 'connections' and names[1:] == ['channels']:
+            return '[' + ','.join(
+                encoded for name, encoded in self.objects['channels'].items()
+                if name.startswith(names[0] + ' (')) + ']'
+        if collection == 'users' and names[1:] == ['permissions']:
+            return '[' + ','.join(
+                encoded for key, encoded in self.objects['permissions'].items()
+                if key[1] == names[0]) + ']'
+        key = names[0] if len(names) == 1 else tuple(names)
+        return objects.get(key)
+
+    def _definitions(self):
+        parts = ['"rabbit_version":"stub"']
+        for name in ('users', 'vhosts', 'permissions', 'policies', 'exchanges', 'queues',
+                     'bindings'):
+            parts.append('"{0}":[{1}]'.format(
+                name, ','.join(entry[2] for entry in self.collections.get(name, ()))))
+        return '{' + ','.join(parts) + '}'
+
+    def _page(self, segments, query):
+        """
+        One page of a collection, filtered by name the way the management API
+        does it
+        """
+        entries = self._entries(segments)
+        if entries is None:
+            return None
+        total = len(entries)
+        name = query.get('name')
+        if name:
+            if query.get('use_regex') == 'true':
+                pattern = re.compile(name)
+                entries = [entry for entry in entries if pattern.search(_name(entry))]
+            else:
+                entries = [entry for entry in entries if name in _name(entry)]
+
+        page, page_size = int(query['page']), int(query.get('page_size', 100))
+        start = (page - 1) * page_size
+        items = ','.join(entry[2] for entry in entries[start:start + page_size])
+        return (
+            '{{"filtered_count":{0},"item_count":{1},"page":{2},"page_count":{3},'
+            '"page_size":{4},"total_count":{5},"items":[{6}]}}'
+        ).format(
+            len(entries), len(entries[start:start + page_size]), page,
+            max(1, -(-len(entries) // page_size)), page_size, total, items,
+        ).encode('utf-8')
+
+
+def _name(entry):
+    key = entry[1]
+    return key[-1] if isinstance(key, tuple) else str(key)
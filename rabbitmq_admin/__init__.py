@@ -1,2 +1,16 @@
 # flake8: noqa
-from rabbitmq_admin.api import AdminAPI
+import sys
+
+if sys.version_info >= (3, 7):
+    # Import the client, and requests with it, on first use only, so that
+    # importing a submodule such as the command line entry point stays fast
+    def __getattr__(name):
+        if name == 'AdminAPI':
+            from rabbitmq_admin.api import AdminAPI
+            return AdminAPI
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+    def __dir__():
+        return sorted(list(globals()) + ['AdminAPI'])
+else:
+    from rabbitmq_admin.api import AdminAPI
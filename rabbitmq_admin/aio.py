@@ -0,0 +1,362 @@
+"""
+An asyncio client for the RabbitMQ Management HTTP API. This module needs
+Python 3.7 or later and `aiohttp`_, which can be installed with
+``pip install rabbitmq-admin[async]``.
+
+.. _aiohttp: https://docs.aiohttp.org/
+"""
+import asyncio
+import base64
+import contextlib
+import contextvars
+import timeit
+
+import aiohttp
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.streaming import JSONArrayDecoder
+
+
+class AsyncAdminAPI(AdminAPI):
+    """
+    The asyncio entrypoint for interacting with the RabbitMQ Management HTTP
+    API. It has exactly the same methods as
+    :class:`rabbitmq_admin.api.AdminAPI`, but each of them returns a
+    coroutine. URLs, parameters and request bodies are built by the same code
+    as in the blocking client; only the transport differs.
+
+    Example ::
+
+        >>> async with AsyncAdminAPI(url, auth=('guest', 'guest')) as api:
+        ...     results = await asyncio.gather(*[
+        ...         api.is_vhost_alive(vhost['name'])
+        ...         for vhost in await api.list_vhosts()
+        ...     ])
+
+    Failed requests raise :class:`requests.HTTPError`, just like the blocking
+    client does. With ``stream=True``, list methods return an asynchronous
+    iterator (``async for``) instead of a list. The methods in
+    :data:`BLOCKING_ONLY`, such as the ``iter_*`` generators and ``bulk_*``
+    helpers, are built on blocking calls and raise :class:`TypeError`; use
+    :func:`asyncio.gather` instead. Spreading requests over several cluster
+    nodes is not supported either.
+
+    :meth:`caller`, :meth:`call_timeout`, :meth:`deadline` and
+    :meth:`pinned` apply to the current task, and to the tasks it starts
+    within the block.
+    """
+
+    #: Methods of :class:`AdminAPI` that are built on blocking calls, and
+    #: raise :class:`TypeError` on the async client
+    BLOCKING_ONLY = (
+        'iter_connections', 'iter_channels', 'iter_consumers', 'iter_exchanges', 'iter_queues',
+        'iter_bindings', 'select_connections', 'select_queues', 'bulk_apply',
+        'bulk_close_connections', 'bulk_purge_queues', 'bulk_delete_queues',
+        'bulk_create_vhosts', 'bulk_create_users', 'bulk_create_user_permissions',
+        'bulk_create_policies', 'reconcile_definitions', 'export_definitions',
+        'import_definitions', 'discover_nodes', 'health_sweep',
+    )
+
+    def __init__(self, url, auth, pool_maxsize=100, keep_alive=True, hooks=None, codec=None,
+                 retry=None, breaker=None, timeout=AdminAPI.DEFAULT_TIMEOUT):
+        """
+        :param url: The RabbitMQ API url to connect to. This should include the
+            protocol and port number.
+        :type url: str
+
+        :param auth: A tuple of ``('username', 'password')``
+        :type auth: tuple
+
+        :param pool_maxsize: The maximum number of simultaneous connections
+            to the API
+        :type pool_maxsize: int
+
+        :param keep_alive: Set to ``False`` to close the connection after
+            every request
+        :type keep_alive: bool
+
+        :param hooks: Functions called with a
+            :class:`rabbitmq_admin.metrics.RequestEvent` after every request
+        :type hooks: list of callable
+
+        :param codec: The JSON codec for request and response bodies
+        :type codec: rabbitmq_admin.codec.JSONCodec
+
+        :param retry: Retries requests that failed for a transient reason.
+            Waits between attempts do not block the event loop.
+        :type retry: rabbitmq_admin.retry.RetryPolicy
+
+        :param breaker: Fails requests fast while their endpoint keeps
+            failing
+        :type breaker: rabbitmq_admin.retry.CircuitBreaker
+
+        :param timeout: How long to wait for a connection and then between
+            bytes of the response, in seconds: a number for both, or a
+            ``(connect, read)`` tuple
+        :type timeout: float or tuple
+        """
+        if not isinstance(url, str):
+            raise TypeError('AsyncAdminAPI connects to a single url')
+        super(AsyncAdminAPI, self).__init__(
+            url, auth, keep_alive=keep_alive, hooks=hooks, codec=codec, retry=retry,
+            breaker=breaker, timeout=timeout)
+        self.pool_maxsize = pool_maxsize
+        self._client_session = None
+        self._context = _TaskContext()
+
+    @contextlib.contextmanager
+    def restore_context(self, context):
+        """
+        Applies a context returned by :meth:`capture_context` to the current
+        task within the block
+        """
+        token = self._context.replace(context)
+        try:
+            yield
+        finally:
+            self._context.reset(token)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def client_session(self):
+        """
+        The :class:`aiohttp.ClientSession` requests are sent with. It is
+        created on first use, from within the running event loop.
+        """
+        if self._client_session is None or self._client_session.closed:
+            self._client_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_maxsize,
+                    force_close=not self.keep_alive,
+                ),
+            )
+        return self._client_session
+
+    async def close(self):
+        """
+        Closes every pooled connection.
+        """
+        if self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+
+    @staticmethod
+    def _authorization(auth):
+        """
+        The basic ``Authorization`` header for a username and password
+        """
+        credentials = ':'.join(auth).encode('latin1')
+        return 'Basic ' + base64.b64encode(credentials).decode('ascii')
+
+    @staticmethod
+    def _client_timeout(timeout):
+        """
+        The :class:`aiohttp.ClientTimeout` for a requests timeout: a number,
+        a ``(connect, read)`` tuple or ``None``
+        """
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        connect, read = timeout
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+    async def _send(self, method, url, auth=None, headers=None, data=None, **kwargs):
+        """
+        Sends a request and returns the unread :class:`aiohttp.ClientResponse`
+        """
+        headers = dict(headers or {})
+        if auth:
+            headers['Authorization'] = self._authorization(auth)
+        if 'timeout' in kwargs:
+            kwargs['timeout'] = self._client_timeout(kwargs['timeout'])
+
+        return await self.client_session.request(
+            method, url, headers=headers, data=data, **kwargs)
+
+    @staticmethod
+    async def _read_response(aio_response):
+        """
+        Reads a response into a :class:`requests.Response`, so that errors
+        are raised exactly as they are by the blocking client.
+        """
+        async with aio_response:
+            response = requests.Response()
+            response.status_code = aio_response.status
+            response.reason = aio_response.reason
+            response.url = str(aio_response.url)
+            response.headers = requests.structures.CaseInsensitiveDict(aio_response.headers)
+            response._content = await aio_response.read()
+        return response
+
+    async def _timed(self, event, send, stream=False):
+        event.started = timeit.default_timer()
+        try:
+            result = await send()
+        except Exception as error:
+            event.error = error
+            self._finish(event)
+            raise
+        if not stream:
+            self._finish(event)
+        return result
+
+    async def _guarded(self, method, endpoint, retry, send, kwargs, read):
+        breaker = self.breaker
+        sent = []
+
+        def sending(**options):
+            sent.append(True)
+            return send(**options)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before(endpoint)
+            del sent[:]
+            try:
+                result = await self._route(sending, kwargs, read)
+            except Exception as error:
+                delay = self._failed(
+                    method, endpoint, retry, kwargs, attempt, self._as_requests_error(error),
+                    bool(sent))
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if breaker is not None:
+                breaker.record(endpoint)
+            return result
+
+    @staticmethod
+    def _as_requests_error(error):
+        """
+        The :mod:`requests` equivalent of an aiohttp or asyncio error, so
+        that retries and circuit breakers classify failures the same way for
+        both clients
+        """
+        if isinstance(error, aiohttp.ClientConnectionError):
+            return requests.ConnectionError(error)
+        if isinstance(error, asyncio.TimeoutError):
+            return requests.Timeout(error)
+        return error
+
+    async def _request(self, method, *args, **kwargs):
+        event = kwargs.pop('event', None)
+        accept_status = kwargs.pop('accept_status', ())
+        response = await self._read_response(await self._send(method, *args, **kwargs))
+        self._record(event, response)
+        if response.status_code not in accept_status:
+            response.raise_for_status()
+        return response
+
+    async def _get(self, *args, **kwargs):
+        """
+        With ``stream=True`` this returns an asynchronous iterator over the
+        items of the response, decoded as they arrive.
+        """
+        transform = kwargs.pop('transform', None)
+        if kwargs.pop('stream', False):
+            event = kwargs.pop('event', None)
+            aio_response = await self._send('GET', *args, **kwargs)
+            if aio_response.status >= 400:
+                response = await self._read_response(aio_response)
+                self._record(event, response)
+                response.raise_for_status()
+            if event is not None:
+                event.url = str(aio_response.url)
+                event.status = aio_response.status
+            return self._aiter_response(aio_response, event, transform)
+
+        response = await self._request('GET', *args, **kwargs)
+        result = self._decode(response, kwargs.get('event'))
+        return transform(result) if transform else result
+
+    async def _aiter_response(self, aio_response, event=None, transform=None):
+        array = JSONArrayDecoder(self.codec.loads)
+        try:
+            async for chunk in aio_response.content.iter_chunked(self.stream_chunk_size):
+                for item in self._feed(array.feed, chunk, event):
+                    yield transform(item) if transform else item
+            for item in self._feed(lambda chunk: array.close(), b'', event):
+                yield transform(item) if transform else item
+        finally:
+            aio_response.release()
+            if event is not None:
+                self._finish(event)
+
+    async def _put(self, *args, **kwargs):
+        if 'data' in kwargs:
+            kwargs['data'] = self.codec.dumps(kwargs['data'])
+        await self._request('PUT', *args, **kwargs)
+
+    async def _post(self, *args, **kwargs):
+        if 'data' in kwargs:
+            kwargs['data'] = self.codec.dumps(kwargs['data'])
+        await self._request('POST', *args, **kwargs)
+
+    async def _delete(self, *args, **kwargs):
+        await self._request('DELETE', *args, **kwargs)
+
+
+def _blocking_only(name):
+    def method(self, *args, **kwargs):
+        raise TypeError(
+            '{0}() is built on blocking calls and is only available on '
+            'rabbitmq_admin.api.AdminAPI'.format(name))
+    method.__name__ = name
+    method.__doc__ = 'Not available on the async client, see :class:`AsyncAdminAPI`'
+    return method
+
+
+for _name in AsyncAdminAPI.BLOCKING_ONLY:
+    setattr(AsyncAdminAPI, _name, _blocking_only(_name))
+
+
+_MISSING = object()
+
+
+class _TaskContext(object):
+    """
+    The caller, timeout, deadline and pinned node of the current task. It
+    stands in for the thread-local context of the blocking client, which
+    every task on an event loop would share. Changes are copied on write, so
+    they never reach other tasks.
+    """
+
+    __slots__ = ('_var',)
+
+    def __init__(self):
+        object.__setattr__(self, '_var', contextvars.ContextVar('rabbitmq_admin_context'))
+
+    @property
+    def __dict__(self):
+        return dict(self._var.get({}))
+
+    def __getattr__(self, name):
+        try:
+            return self._var.get({})[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        attributes = dict(self._var.get({}))
+        attributes[name] = value
+        self._var.set(attributes)
+
+    def __delattr__(self, name):
+        attributes = dict(self._var.get({}))
+        if attributes.pop(name, _MISSING) is _MISSING:
+            raise AttributeError(name)
+        self._var.set(attributes)
+
+    def replace(self, attributes):
+        return self._var.set(dict(attributes))
+
+    def reset(self, token):
+        self._var.reset(token)
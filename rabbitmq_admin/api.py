@@ -1,35 +1,120 @@
-from rabbitmq_admin.base import Resource
+from rabbitmq_admin.base import ApiPath, Resource
+from rabbitmq_admin.bulk import Operation, bulk_apply
+from rabbitmq_admin.cluster import NodePool
+from rabbitmq_admin.compression import ChunkWriter, read_chunks
+from rabbitmq_admin.definitions import diff_definitions, plan_definitions
+from rabbitmq_admin.filters import ConnectionFilter
+from rabbitmq_admin.health import CLUSTER_CHECKS, NODE_CHECKS, health_sweep
+from rabbitmq_admin.records import (
+    Binding, Channel, Connection, Consumer, Exchange, Queue, User, Vhost)
+from rabbitmq_admin.timeseries import compact_samples, history_params
+import six
 from six.moves import urllib
 
 
+def _stats_params(columns=None, disable_stats=False, enable_queue_totals=False, **params):
+    """
+    Query string parameters that trim down what the management API returns:
+    ``columns`` selects the fields to include and ``disable_stats`` leaves out
+    message rates and other statistics, except for the queue message counts
+    if ``enable_queue_totals`` is set.
+    """
+    if columns:
+        if not isinstance(columns, six.string_types):
+            columns = ','.join(columns)
+        params['columns'] = columns
+    if disable_stats:
+        params['disable_stats'] = True
+    if enable_queue_totals:
+        params['enable_queue_totals'] = True
+    return params
+
+
+def _series(history):
+    """
+    The transform of responses that include sampled history
+    """
+    return compact_samples if history else None
+
+
+def _records(record_type, as_records):
+    """
+    The transform of list responses requested ``as_records``
+    """
+    return record_type.convert if as_records else None
+
+
+def _destination_type_path(destination_type):
+    """
+    The path segment for a binding destination type
+    """
+    if destination_type not in ('queue', 'exchange'):
+        raise ValueError('destination_type must be "queue" or "exchange"')
+    return destination_type[0]
+
+
 class AdminAPI(Resource):
     """
     The entrypoint for interacting with the RabbitMQ Management HTTP API
+
+    Read methods share these keyword arguments, where they take them:
+
+    * ``columns``: only include these fields in the response, e.g.
+      ``['name', 'messages']``. Nested fields are named with dots, e.g.
+      ``message_stats.publish``.
+    * ``disable_stats``: set to ``True`` to leave out statistics such as
+      message rates, which is much cheaper for the server to produce.
+    * ``stream``: set to ``True`` to get an iterator that decodes items as
+      they arrive, instead of a list.
+    * ``as_records``: set to ``True`` to get compact records from
+      :mod:`rabbitmq_admin.records` instead of dicts, e.g.
+      :class:`rabbitmq_admin.records.Queue` from :meth:`list_queues`.
+    * ``history``: include sampled history as
+      :class:`rabbitmq_admin.timeseries.TimeSeries`: ``(age, increment)`` in
+      seconds, or ``{kind: (age, increment)}``, see
+      :func:`rabbitmq_admin.timeseries.history_params`.
+
+    The ``iter_*`` methods request one page at a time, and also take:
+
+    * ``use_regex``: set to ``True`` to match ``name`` as a regular
+      expression.
+    * ``prefetch``: set to ``True`` to request the next page while the
+      current one is being iterated over.
     """
 
-    def overview(self):
+    def overview(self, columns=None, disable_stats=False, history=None):
         """
         Various random bits of information that describe the whole system
+
+        Example ::
+
+            >>> overview = api.overview(history=(600, 10))
+            >>> overview['message_stats']['publish_details']['samples'].rates()
         """
-        return self._api_get('/api/overview')
+        return self._api_get(
+            '/api/overview',
+            params=_stats_params(columns, disable_stats, **history_params(history)),
+            transform=_series(history),
+        )
 
     def get_cluster_name(self):
         """
         Name identifying this RabbitMQ cluster.
         """
-        return self._get(
-            url=self.url + '/api/cluster-name',
-            headers=self.headers,
-            auth=self.auth
-        )
+        return self._api_get('/api/cluster-name')
 
-    def list_nodes(self):
+    def list_nodes(self, columns=None, disable_stats=False, stream=False):
         """
         A list of nodes in the RabbitMQ cluster.
         """
-        return self._api_get('/api/nodes')
+        return self._api_get(
+            '/api/nodes',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+        )
 
-    def get_node(self, name, memory=False, binary=False):
+    def get_node(self, name, memory=False, binary=False, columns=None, disable_stats=False,
+                 history=None):
         """
         An individual node in the RabbitMQ cluster. Set "memory=true" to get
         memory statistics, and "binary=true" to get a breakdown of binary
@@ -37,18 +122,72 @@ class AdminAPI(Resource):
         system).
         """
         return self._api_get(
-            url='/api/nodes/{0}'.format(name),
-            params=dict(
+            url=ApiPath('/api/nodes/{name}', name=name),
+            params=_stats_params(
+                columns,
+                disable_stats,
                 binary=binary,
                 memory=memory,
+                **history_params(history)
             ),
+            transform=_series(history),
         )
 
-    def list_extensions(self):
+    def discover_nodes(self, scheme=None, port=None):
+        """
+        Spreads the requests of this client over every running node of the
+        cluster, see :class:`rabbitmq_admin.cluster.NodePool`. Node urls are
+        built from the host in each node name (``rabbit@host``) and the
+        scheme, port and path of this client's url. The nodes the client
+        already uses are kept, and stay preferred for writes.
+
+        Example ::
+
+            >>> api = AdminAPI('http://rabbit-1:15672', auth)
+            >>> api.discover_nodes()
+            ['http://rabbit-1:15672', 'http://rabbit-2:15672', 'http://rabbit-3:15672']
+
+        This method is only usable on the blocking client.
+
+        :param scheme: The scheme of the node urls, if it differs from this
+            client's
+        :type scheme: str
+
+        :param port: The management port of the nodes, if it differs from
+            this client's
+        :type port: int
+
+        :returns: The urls of the nodes now in use
+        :rtype: list of str
+        """
+        base = urllib.parse.urlsplit(self.url)
+        port = port or base.port
+        urls = self.nodes.urls if self.nodes else [self.url]
+        for node in self.list_nodes(columns=['name', 'running']):
+            host = node['name'].partition('@')[2]
+            if not host or not node.get('running', True):
+                continue
+            netloc = '{0}:{1}'.format(host, port) if port else host
+            url = urllib.parse.urlunsplit((scheme or base.scheme, netloc, base.path, '', ''))
+            if url not in urls:
+                urls.append(url)
+
+        if self.nodes:
+            for url in urls:
+                self.nodes.add(url)
+        elif len(urls) > 1:
+            self.nodes = NodePool(urls)
+        return urls
+
+    def list_extensions(self, columns=None, disable_stats=False, stream=False):
         """
         A list of extensions to the management plugin.
         """
-        return self._api_get('/api/extensions')
+        return self._api_get(
+            '/api/extensions',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+        )
 
     def get_definitions(self):
         """
@@ -82,24 +221,144 @@ class AdminAPI(Resource):
         :param data: The definitions for a RabbitMQ server
         :type data: dict
         """
-        self._api_post('/api/definitions', data=data)
+        return self._api_post('/api/definitions', data=data)
 
-    def list_connections(self):
+    def export_definitions(self, path_or_fileobj, compress='gzip'):
+        """
+        Writes the server definitions, as returned by :meth:`get_definitions`,
+        to a file. The response is streamed to the file as it arrives and is
+        never decoded, so even very large definitions use little memory.
+        Like the ``iter_*`` helpers, this is only usable on :class:`AdminAPI`.
+
+        Example ::
+
+            >>> api.export_definitions('backup.json.gz')
+
+        :param path_or_fileobj: The path of the file to create, or a binary
+            file object to write to, which is left open
+        :type path_or_fileobj: str or file
+
+        :param compress: ``'gzip'``, ``'bz2'`` or ``None``
+        :type compress: str
+
+        :returns: The size of the definitions in bytes, before compression
+        :rtype: int
+        """
+        with ChunkWriter(path_or_fileobj, compress) as writer:
+            self._api_download('/api/definitions', writer.write)
+        return writer.size
+
+    def import_definitions(self, path_or_fileobj, compress='auto'):
+        """
+        Uploads definitions from a file, such as one written by
+        :meth:`export_definitions`, with the same merge semantics as
+        :meth:`post_definitions`. The file is streamed as the request body
+        and is never decoded. Like the ``iter_*`` helpers, this is only
+        usable on :class:`AdminAPI`.
+
+        :param path_or_fileobj: The path of the file, or a binary file object
+            to read from its current position, which is left open
+        :type path_or_fileobj: str or file
+
+        :param compress: ``'gzip'``, ``'bz2'`` or ``None``, or ``'auto'`` to
+            detect it from the contents of the file
+        :type compress: str
+        """
+        start = None
+        if not isinstance(path_or_fileobj, six.string_types):
+            start = path_or_fileobj.tell()
+
+        def body():
+            # Rewind for a retry on another node
+            if start is not None:
+                path_or_fileobj.seek(start)
+            return read_chunks(path_or_fileobj, compress, self.stream_chunk_size)
+
+        self._api_upload('/api/definitions', body)
+
+    def reconcile_definitions(self, desired, delete=False, recreate=False, dry_run=False,
+                              max_workers=8):
+        """
+        Makes the server match a set of definitions with individual calls,
+        instead of uploading the whole set with :meth:`post_definitions`.
+        The current definitions are fetched and compared with ``desired``,
+        and only the users, vhosts, permissions, policies, exchanges, queues
+        and bindings that differ are created, updated or deleted, concurrently
+        and in dependency order (see :meth:`bulk_apply`).
+
+        :param desired: The definitions the server should have, in the format
+            of :meth:`get_definitions`
+        :type desired: dict
+        :param delete: Set to ``True`` to also delete objects that are not in
+            ``desired``. By default they are left untouched, like
+            :meth:`post_definitions` does.
+        :type delete: bool
+        :param recreate: Set to ``True`` to delete and create again exchanges
+            and queues whose properties differ, which cannot be changed in
+            place. Recreating a queue loses its messages.
+        :type recreate: bool
+        :param dry_run: Set to ``True`` to only compute the difference
+        :type dry_run: bool
+        :param max_workers: The maximum number of concurrent requests
+        :type max_workers: int
+
+        :returns: The difference between the current and desired definitions.
+            Unless ``dry_run`` is set, its ``report`` holds the result of
+            every call that was made.
+        :rtype: rabbitmq_admin.definitions.DefinitionsDiff
+        """
+        diff = diff_definitions(self.get_definitions(), desired)
+        if not dry_run:
+            diff.report = self.bulk_apply(
+                plan_definitions(self, diff, desired, delete=delete, recreate=recreate),
+                max_workers=max_workers,
+            )
+        return diff
+
+    def list_connections(self, columns=None, disable_stats=False, stream=False,
+                         as_records=False):
         """
         A list of all open connections.
         """
-        return self._api_get('/api/connections')
+        return self._api_get(
+            '/api/connections',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Connection, as_records),
+        )
+
+    def iter_connections(self, page_size=100, name=None, use_regex=False, prefetch=False,
+                         columns=None, disable_stats=False):
+        """
+        Iterates over all open connections, requesting them one page at a
+        time instead of in a single response.
+
+        :param page_size: The number of connections to request at a time. The
+            management API allows at most 500.
+        :type page_size: int
+        :param name: Only include connections whose name contains this string,
+            or matches it as a regular expression if ``use_regex`` is set
+        :type name: str
+        """
+        return self._api_iter(
+            '/api/connections',
+            page_size=page_size,
+            prefetch=prefetch,
+            params=_stats_params(columns, disable_stats, name=name, use_regex=use_regex),
+        )
 
-    def get_connection(self, name):
+    def get_connection(self, name, columns=None, disable_stats=False, history=None):
         """
         An individual connection.
 
         :param name: The connection name
         :type name: str
         """
-        return self._api_get('/api/connections/{0}'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/connections/{name}', name=name),
+            params=_stats_params(columns, disable_stats, **history_params(history)),
+            transform=_series(history),
+        )
 
     def delete_connection(self, name, reason=None):
         """
@@ -113,76 +372,218 @@ class AdminAPI(Resource):
         """
         headers = {'X-Reason': reason} if reason else {}
 
-        self._api_delete(
-            '/api/connections/{0}'.format(
-                urllib.parse.quote_plus(name)
-            ),
+        return self._api_delete(
+            ApiPath('/api/connections/{name}', name=name),
             headers=headers,
         )
 
-    def list_connection_channels(self, name):
+    def select_connections(self, page_size=500, **criteria):
+        """
+        The connections matching every given criterion, with only their
+        ``name``, ``vhost`` and ``user`` and the fields the criteria need.
+        The criteria are those of :class:`rabbitmq_admin.filters.ConnectionFilter`.
+
+        Example ::
+
+            >>> api.select_connections(user='app', idle=True, connected_for=3600)
+
+        :param page_size: The number of connections to request at a time
+        :type page_size: int
+        """
+        selected = ConnectionFilter(**criteria)
+        connections = self.iter_connections(
+            page_size=page_size,
+            name=selected.name,
+            use_regex=selected.name is not None,
+            columns=selected.columns,
+            disable_stats=selected.disable_stats,
+        )
+        return [connection for connection in connections if selected(connection)]
+
+    def bulk_close_connections(self, reason=None, max_workers=8, max_rate=None, progress=None,
+                               **criteria):
+        """
+        Closes every connection chosen by :meth:`select_connections`,
+        concurrently. See :meth:`bulk_apply`.
+
+        Example ::
+
+            >>> report = api.bulk_close_connections(
+            ...     reason='leaked by deploy 1234', user='app', max_rate=200,
+            ...     client_properties={'connection_name': '^worker-'})
+            >>> report.summary()
+            {'succeeded': 1200, 'failed': 0, 'errors': {}}
+
+        :param reason: The reason given to the clients
+        :type reason: str
+        :param max_rate: The maximum number of connections to close per second
+        :type max_rate: float
+        :param progress: See :meth:`bulk_apply`
+        :type progress: callable
+        """
+        return self.bulk_apply(
+            [
+                Operation('delete_connection', connection['name'], reason=reason)
+                for connection in self.select_connections(**criteria)
+            ],
+            max_workers=max_workers,
+            max_rate=max_rate,
+            progress=progress,
+        )
+
+    def list_connection_channels(self, name, columns=None, disable_stats=False, stream=False,
+                                 as_records=False):
         """
         List of all channels for a given connection.
 
         :param name: The connection name
         :type name: str
         """
-        return self._api_get('/api/connections/{0}/channels'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/connections/{name}/channels', name=name),
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Channel, as_records),
+        )
 
-    def list_channels(self):
+    def list_channels(self, columns=None, disable_stats=False, stream=False,
+                      as_records=False):
         """
         A list of all open channels.
         """
-        return self._api_get('/api/channels')
+        return self._api_get(
+            '/api/channels',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Channel, as_records),
+        )
+
+    def iter_channels(self, page_size=100, name=None, use_regex=False, prefetch=False,
+                      columns=None, disable_stats=False):
+        """
+        Iterates over all open channels, requesting them one page at a
+        time instead of in a single response.
+
+        :param page_size: The number of channels to request at a time. The
+            management API allows at most 500.
+        :type page_size: int
+        :param name: Only include channels whose name contains this string,
+            or matches it as a regular expression if ``use_regex`` is set
+        :type name: str
+        """
+        return self._api_iter(
+            '/api/channels',
+            page_size=page_size,
+            prefetch=prefetch,
+            params=_stats_params(columns, disable_stats, name=name, use_regex=use_regex),
+        )
 
-    def get_channel(self, name):
+    def get_channel(self, name, columns=None, disable_stats=False, history=None):
         """
         Details about an individual channel.
 
         :param name: The channel name
         :type name: str
         """
-        return self._api_get('/api/channels/{0}'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/channels/{name}', name=name),
+            params=_stats_params(columns, disable_stats, **history_params(history)),
+            transform=_series(history),
+        )
 
-    def list_consumers(self):
+    def list_consumers(self, columns=None, disable_stats=False, stream=False,
+                       as_records=False):
         """
         A list of all consumers.
         """
-        return self._api_get('/api/consumers')
+        return self._api_get(
+            '/api/consumers',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Consumer, as_records),
+        )
 
-    def list_consumers_for_vhost(self, vhost):
+    def list_consumers_for_vhost(self, vhost, columns=None, disable_stats=False, stream=False,
+                                 as_records=False):
         """
         A list of all consumers in a given virtual host.
 
         :param vhost: The vhost name
         :type vhost: str
         """
-        return self._api_get('/api/consumers/{0}'.format(
-            urllib.parse.quote_plus(vhost)
-        ))
+        return self._api_get(
+            ApiPath('/api/consumers/{vhost}', vhost=vhost),
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Consumer, as_records),
+        )
 
-    def list_exchanges(self):
+    def iter_consumers(self, vhost=None, columns=None, disable_stats=False):
+        """
+        Iterates over all consumers, or the consumers of one virtual host.
+        The management API cannot paginate consumers, so they are fetched
+        in a single request, but decoded as they arrive.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        """
+        if vhost is None:
+            return self.list_consumers(columns, disable_stats, stream=True)
+        return self.list_consumers_for_vhost(vhost, columns, disable_stats, stream=True)
+
+    def list_exchanges(self, columns=None, disable_stats=False, stream=False,
+                       as_records=False):
         """
         A list of all exchanges.
         """
-        return self._api_get('/api/exchanges')
+        return self._api_get(
+            '/api/exchanges',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Exchange, as_records),
+        )
 
-    def list_exchanges_for_vhost(self, vhost):
+    def list_exchanges_for_vhost(self, vhost, columns=None, disable_stats=False, stream=False,
+                                 as_records=False):
         """
         A list of all exchanges in a given virtual host.
 
         :param vhost: The vhost name
         :type vhost: str
         """
-        return self._api_get('/api/exchanges/{0}'.format(
-            urllib.parse.quote_plus(vhost)
-        ))
+        return self._api_get(
+            ApiPath('/api/exchanges/{vhost}', vhost=vhost),
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Exchange, as_records),
+        )
+
+    def iter_exchanges(self, vhost=None, page_size=100, name=None, use_regex=False,
+                       prefetch=False, columns=None, disable_stats=False):
+        """
+        Iterates over all exchanges, or the exchanges of one virtual host,
+        requesting them one page at a time instead of in a single response.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        :param page_size: The number of exchanges to request at a time. The
+            management API allows at most 500.
+        :type page_size: int
+        :param name: Only include exchanges whose name contains this string,
+            or matches it as a regular expression if ``use_regex`` is set
+        :type name: str
+        """
+        url = '/api/exchanges'
+        if vhost is not None:
+            url = ApiPath('/api/exchanges/{vhost}', vhost=vhost)
+        return self._api_iter(
+            url,
+            page_size=page_size,
+            prefetch=prefetch,
+            params=_stats_params(columns, disable_stats, name=name, use_regex=use_regex),
+        )
 
-    def get_exchange_for_vhost(self, exchange, vhost):
+    def get_exchange_for_vhost(self, exchange, vhost, columns=None, disable_stats=False):
         """
         An individual exchange
 
@@ -192,10 +593,10 @@ class AdminAPI(Resource):
         :param vhost: The vhost name
         :type vhost: str
         """
-        return self._api_get('/api/exchanges/{0}/{1}'.format(
-            urllib.parse.quote_plus(vhost),
-            urllib.parse.quote_plus(exchange)
-        ))
+        return self._api_get(
+            ApiPath('/api/exchanges/{vhost}/{exchange}', vhost=vhost, exchange=exchange),
+            params=_stats_params(columns, disable_stats),
+        )
 
     def create_exchange_for_vhost(self, exchange, vhost, body):
         """
@@ -222,10 +623,8 @@ class AdminAPI(Resource):
         :param body: A body for the exchange.
         :type body: dict
         """
-        self._api_put(
-            '/api/exchanges/{0}/{1}'.format(
-                urllib.parse.quote_plus(vhost),
-                urllib.parse.quote_plus(exchange)),
+        return self._api_put(
+            ApiPath('/api/exchanges/{vhost}/{exchange}', vhost=vhost, exchange=exchange),
             data=body
         )
 
@@ -244,48 +643,394 @@ class AdminAPI(Resource):
         :param if_unused: Set to ``True`` to only delete if it is unused
         :type if_unused: bool
         """
-        self._api_delete(
-            '/api/exchanges/{0}/{1}'.format(
-                urllib.parse.quote_plus(vhost),
-                urllib.parse.quote_plus(exchange)),
+        return self._api_delete(
+            ApiPath('/api/exchanges/{vhost}/{exchange}', vhost=vhost, exchange=exchange),
             params={
                 'if-unused': if_unused
             },
         )
 
-    def list_bindings(self):
+    def list_queues(self, columns=None, disable_stats=False, enable_queue_totals=False,
+                    stream=False, as_records=False):
+        """
+        A list of all queues.
+
+        :param enable_queue_totals: Set to ``True`` to keep the message counts
+            of each queue when ``disable_stats`` is set
+        :type enable_queue_totals: bool
+        """
+        return self._api_get(
+            '/api/queues',
+            params=_stats_params(columns, disable_stats, enable_queue_totals),
+            stream=stream,
+            transform=_records(Queue, as_records),
+        )
+
+    def list_queues_for_vhost(self, vhost, columns=None, disable_stats=False,
+                              enable_queue_totals=False, stream=False, as_records=False):
+        """
+        A list of all queues in a given virtual host.
+
+        :param vhost: The vhost name
+        :type vhost: str
+
+        :param enable_queue_totals: Set to ``True`` to keep the message counts
+            of each queue when ``disable_stats`` is set
+        :type enable_queue_totals: bool
+        """
+        return self._api_get(
+            ApiPath('/api/queues/{vhost}', vhost=vhost),
+            params=_stats_params(columns, disable_stats, enable_queue_totals),
+            stream=stream,
+            transform=_records(Queue, as_records),
+        )
+
+    def iter_queues(self, vhost=None, page_size=100, name=None, use_regex=False,
+                    prefetch=False, columns=None, disable_stats=False,
+                    enable_queue_totals=False):
+        """
+        Iterates over all queues, or the queues of one virtual host,
+        requesting them one page at a time instead of in a single response.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        :param page_size: The number of queues to request at a time. The
+            management API allows at most 500.
+        :type page_size: int
+        :param name: Only include queues whose name contains this string,
+            or matches it as a regular expression if ``use_regex`` is set
+        :type name: str
+        :param enable_queue_totals: Set to ``True`` to keep the message counts
+            of each queue when ``disable_stats`` is set
+        :type enable_queue_totals: bool
+        """
+        url = '/api/queues'
+        if vhost is not None:
+            url = ApiPath('/api/queues/{vhost}', vhost=vhost)
+        return self._api_iter(
+            url,
+            page_size=page_size,
+            prefetch=prefetch,
+            params=_stats_params(
+                columns,
+                disable_stats,
+                enable_queue_totals,
+                name=name,
+                use_regex=use_regex,
+            ),
+        )
+
+    def get_queue_for_vhost(self, queue, vhost, columns=None, disable_stats=False, history=None):
+        """
+        An individual queue
+
+        :param queue: The queue name
+        :type queue: str
+
+        :param vhost: The vhost name
+        :type vhost: str
+        """
+        return self._api_get(
+            ApiPath('/api/queues/{vhost}/{queue}', vhost=vhost, queue=queue),
+            params=_stats_params(columns, disable_stats, **history_params(history)),
+            transform=_series(history),
+        )
+
+    def create_queue_for_vhost(self, queue, vhost, body=None):
+        """
+        Create an individual queue.
+        The body should look like:
+        ::
+
+            {
+                "auto_delete": false,
+                "durable": true,
+                "arguments": {},
+                "node": "rabbit@rabbit1"
+            }
+
+        All keys are optional.
+
+        :param queue: The queue name
+        :type queue: str
+
+        :param vhost: The vhost name
+        :type vhost: str
+
+        :param body: A body for the queue.
+        :type body: dict
+        """
+        return self._api_put(
+            ApiPath('/api/queues/{vhost}/{queue}', vhost=vhost, queue=queue),
+            data=body or {},
+        )
+
+    def delete_queue_for_vhost(self, queue, vhost, if_unused=False, if_empty=False):
+        """
+        Delete an individual queue. You can add the parameters
+        ``if_unused=True`` and ``if_empty=True``. These prevent the delete from
+        succeeding if the queue has consumers or contains messages
+        respectively.
+
+        :param queue: The queue name
+        :type queue: str
+
+        :param vhost: The vhost name
+        :type vhost: str
+
+        :param if_unused: Set to ``True`` to only delete if it has no consumers
+        :type if_unused: bool
+
+        :param if_empty: Set to ``True`` to only delete if it has no messages
+        :type if_empty: bool
+        """
+        return self._api_delete(
+            ApiPath('/api/queues/{vhost}/{queue}', vhost=vhost, queue=queue),
+            params={
+                'if-unused': if_unused,
+                'if-empty': if_empty,
+            },
+        )
+
+    def purge_queue_for_vhost(self, queue, vhost):
+        """
+        Delete every message in an individual queue.
+
+        :param queue: The queue name
+        :type queue: str
+
+        :param vhost: The vhost name
+        :type vhost: str
+        """
+        return self._api_delete(
+            ApiPath('/api/queues/{vhost}/{queue}/contents', vhost=vhost, queue=queue),
+        )
+
+    def select_queues(self, pattern=None, vhost=None, min_messages=None, page_size=500):
+        """
+        The queues matching every given criterion, with only their ``name``,
+        ``vhost`` and ``messages`` fields.
+
+        :param pattern: A regular expression the queue name must contain a
+            match of. It is matched by the server, so only matching queues
+            are sent.
+        :type pattern: str
+        :param vhost: Only select queues in this vhost
+        :type vhost: str
+        :param min_messages: Only select queues with at least this many
+            messages
+        :type min_messages: int
+        :param page_size: The number of queues to request at a time
+        :type page_size: int
+        """
+        queues = self.iter_queues(
+            vhost=vhost,
+            page_size=page_size,
+            name=pattern,
+            use_regex=pattern is not None,
+            columns=['name', 'vhost', 'messages'],
+            disable_stats=True,
+            enable_queue_totals=True,
+        )
+        if min_messages is not None:
+            queues = (queue for queue in queues if (queue.get('messages') or 0) >= min_messages)
+        return list(queues)
+
+    def bulk_purge_queues(self, pattern=None, vhost=None, min_messages=None,
+                          max_workers=8, max_rate=None, progress=None):
+        """
+        Purges every queue chosen by :meth:`select_queues`, concurrently.
+        See :meth:`bulk_apply`.
+
+        :param max_rate: The maximum number of queues to purge per second
+        :type max_rate: float
+        :param progress: See :meth:`bulk_apply`
+        :type progress: callable
+        """
+        return self.bulk_apply(
+            [
+                Operation('purge_queue_for_vhost', queue['name'], queue['vhost'])
+                for queue in self.select_queues(pattern, vhost, min_messages)
+            ],
+            max_workers=max_workers,
+            max_rate=max_rate,
+            progress=progress,
+        )
+
+    def bulk_delete_queues(self, pattern=None, vhost=None, min_messages=None,
+                           if_unused=False, if_empty=False, max_workers=8, max_rate=None,
+                           progress=None):
+        """
+        Deletes every queue chosen by :meth:`select_queues`, concurrently.
+        See :meth:`bulk_apply` and :meth:`delete_queue_for_vhost`.
+
+        :param max_rate: The maximum number of queues to delete per second
+        :type max_rate: float
+        :param progress: See :meth:`bulk_apply`
+        :type progress: callable
+        """
+        return self.bulk_apply(
+            [
+                Operation(
+                    'delete_queue_for_vhost', queue['name'], queue['vhost'],
+                    if_unused=if_unused, if_empty=if_empty)
+                for queue in self.select_queues(pattern, vhost, min_messages)
+            ],
+            max_workers=max_workers,
+            max_rate=max_rate,
+            progress=progress,
+        )
+
+    def list_bindings(self, columns=None, disable_stats=False, stream=False,
+                      as_records=False):
         """
         A list of all bindings.
         """
-        return self._api_get('/api/bindings')
+        return self._api_get(
+            '/api/bindings',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Binding, as_records),
+        )
 
-    def list_bindings_for_vhost(self, vhost):
+    def list_bindings_for_vhost(self, vhost, columns=None, disable_stats=False, stream=False,
+                                as_records=False):
         """
         A list of all bindings in a given virtual host.
 
         :param vhost: The vhost name
         :type vhost: str
         """
-        return self._api_get('/api/bindings/{}'.format(
-            urllib.parse.quote_plus(vhost)
-        ))
+        return self._api_get(
+            ApiPath('/api/bindings/{vhost}', vhost=vhost),
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Binding, as_records),
+        )
 
-    def list_vhosts(self):
+    def iter_bindings(self, vhost=None, columns=None, disable_stats=False):
+        """
+        Iterates over all bindings, or the bindings of one virtual host.
+        The management API cannot paginate bindings, so they are fetched in
+        a single request, but decoded as they arrive.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        """
+        if vhost is None:
+            return self.list_bindings(columns, disable_stats, stream=True)
+        return self.list_bindings_for_vhost(vhost, columns, disable_stats, stream=True)
+
+    def list_bindings_between(self, vhost, source, destination, destination_type='queue',
+                              columns=None):
+        """
+        A list of all bindings from an exchange to a queue or another
+        exchange.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        :param source: The name of the source exchange
+        :type source: str
+        :param destination: The name of the destination queue or exchange
+        :type destination: str
+        :param destination_type: ``"queue"`` or ``"exchange"``
+        :type destination_type: str
+        """
+        return self._api_get(
+            ApiPath(
+                '/api/bindings/{vhost}/e/{source}/{destination_type}/{destination}',
+                vhost=vhost,
+                source=source,
+                destination_type=_destination_type_path(destination_type),
+                destination=destination,
+            ),
+            params=_stats_params(columns),
+        )
+
+    def create_binding(self, vhost, source, destination, destination_type='queue',
+                       routing_key='', arguments=None):
+        """
+        Bind a queue or exchange to an exchange.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        :param source: The name of the source exchange
+        :type source: str
+        :param destination: The name of the destination queue or exchange
+        :type destination: str
+        :param destination_type: ``"queue"`` or ``"exchange"``
+        :type destination_type: str
+        :param routing_key: The routing key of the binding
+        :type routing_key: str
+        :param arguments: The arguments of the binding, e.g. for a headers
+            exchange
+        :type arguments: dict
+        """
+        return self._api_post(
+            ApiPath(
+                '/api/bindings/{vhost}/e/{source}/{destination_type}/{destination}',
+                vhost=vhost,
+                source=source,
+                destination_type=_destination_type_path(destination_type),
+                destination=destination,
+            ),
+            data={
+                'routing_key': routing_key,
+                'arguments': arguments or {},
+            },
+        )
+
+    def delete_binding(self, vhost, source, destination, properties_key,
+                       destination_type='queue'):
+        """
+        Delete an individual binding.
+
+        :param vhost: The vhost name
+        :type vhost: str
+        :param source: The name of the source exchange
+        :type source: str
+        :param destination: The name of the destination queue or exchange
+        :type destination: str
+        :param properties_key: The ``properties_key`` of the binding, as
+            listed by :meth:`list_bindings_between`
+        :type properties_key: str
+        :param destination_type: ``"queue"`` or ``"exchange"``
+        :type destination_type: str
+        """
+        return self._api_delete(
+            ApiPath(
+                '/api/bindings/{vhost}/e/{source}/{destination_type}/{destination}/{props}',
+                vhost=vhost,
+                source=source,
+                destination_type=_destination_type_path(destination_type),
+                destination=destination,
+                props=properties_key,
+            ),
+        )
+
+    def list_vhosts(self, columns=None, disable_stats=False, stream=False,
+                    as_records=False):
         """
         A list of all vhosts.
         """
-        return self._api_get('/api/vhosts')
+        return self._api_get(
+            '/api/vhosts',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(Vhost, as_records),
+        )
 
-    def get_vhost(self, name):
+    def get_vhost(self, name, columns=None, disable_stats=False):
         """
         Details about an individual vhost.
 
         :param name: The vhost name
         :type name: str
         """
-        return self._api_get('/api/vhosts/{0}'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/vhosts/{name}', name=name),
+            params=_stats_params(columns, disable_stats),
+        )
 
     def delete_vhost(self, name):
         """
@@ -294,9 +1039,7 @@ class AdminAPI(Resource):
         :param name: The vhost name
         :type name: str
         """
-        self._api_delete('/api/vhosts/{0}'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_delete(ApiPath('/api/vhosts/{name}', name=name))
 
     def create_vhost(self, name, tracing=False):
         """
@@ -309,27 +1052,34 @@ class AdminAPI(Resource):
         :type tracing: bool
         """
         data = {'tracing': True} if tracing else {}
-        self._api_put(
-            '/api/vhosts/{0}'.format(urllib.parse.quote_plus(name)),
+        return self._api_put(
+            ApiPath('/api/vhosts/{name}', name=name),
             data=data,
         )
 
-    def list_users(self):
+    def list_users(self, columns=None, disable_stats=False, stream=False,
+                   as_records=False):
         """
         A list of all users.
         """
-        return self._api_get('/api/users')
+        return self._api_get(
+            '/api/users',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+            transform=_records(User, as_records),
+        )
 
-    def get_user(self, name):
+    def get_user(self, name, columns=None, disable_stats=False):
         """
         Details about an individual user.
 
         :param name: The user's name
         :type name: str
         """
-        return self._api_get('/api/users/{0}'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/users/{name}', name=name),
+            params=_stats_params(columns, disable_stats),
+        )
 
     def delete_user(self, name):
         """
@@ -338,11 +1088,10 @@ class AdminAPI(Resource):
         :param name: The user's name
         :type name: str
         """
-        self._api_delete('/api/users/{0}'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_delete(ApiPath('/api/users/{name}', name=name))
 
-    def create_user(self, name, password, password_hash=None, tags=None):
+    def create_user(self, name, password, password_hash=None, tags=None,
+                    hashing_algorithm=None):
         """
         Create a user
 
@@ -357,6 +1106,9 @@ class AdminAPI(Resource):
             "administrator", "monitoring" and "management". If no tags are
             supplied, the user will have no permissions.
         :type tags: list of str
+        :param hashing_algorithm: The algorithm ``password_hash`` was made
+            with, e.g. ``rabbit_password_hashing_sha256``
+        :type hashing_algorithm: str
         """
         data = {
             'tags': ', '.join(tags or [])
@@ -367,22 +1119,26 @@ class AdminAPI(Resource):
             data['password_hash'] = password_hash
         else:
             data['password_hash'] = ""
+        if hashing_algorithm:
+            data['hashing_algorithm'] = hashing_algorithm
 
-        self._api_put(
-            '/api/users/{0}'.format(urllib.parse.quote_plus(name)),
+        return self._api_put(
+            ApiPath('/api/users/{name}', name=name),
             data=data,
         )
 
-    def list_user_permissions(self, name):
+    def list_user_permissions(self, name, columns=None, disable_stats=False, stream=False):
         """
         A list of all permissions for a given user.
 
         :param name: The user's name
         :type name: str
         """
-        return self._api_get('/api/users/{0}/permissions'.format(
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/users/{name}/permissions', name=name),
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+        )
 
     def whoami(self):
         """
@@ -390,13 +1146,17 @@ class AdminAPI(Resource):
         """
         return self._api_get('/api/whoami')
 
-    def list_permissions(self):
+    def list_permissions(self, columns=None, disable_stats=False, stream=False):
         """
         A list of all permissions for all users.
         """
-        return self._api_get('/api/permissions')
+        return self._api_get(
+            '/api/permissions',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+        )
 
-    def get_user_permission(self, vhost, name):
+    def get_user_permission(self, vhost, name, columns=None, disable_stats=False):
         """
         An individual permission of a user and virtual host.
 
@@ -406,10 +1166,10 @@ class AdminAPI(Resource):
         :param name: The user's name
         :type name: str
         """
-        return self._api_get('/api/permissions/{0}/{1}'.format(
-            urllib.parse.quote_plus(vhost),
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_get(
+            ApiPath('/api/permissions/{vhost}/{name}', vhost=vhost, name=name),
+            params=_stats_params(columns, disable_stats),
+        )
 
     def delete_user_permission(self, name, vhost):
         """
@@ -421,10 +1181,7 @@ class AdminAPI(Resource):
         :param vhost: The vhost name
         :type vhost: str
         """
-        self._api_delete('/api/permissions/{0}/{1}'.format(
-            urllib.parse.quote_plus(vhost),
-            urllib.parse.quote_plus(name)
-        ))
+        return self._api_delete(ApiPath('/api/permissions/{vhost}/{name}', vhost=vhost, name=name))
 
     def create_user_permission(self,
                                name,
@@ -439,41 +1196,47 @@ class AdminAPI(Resource):
         :param vhost: The vhost to assign the permission to
         :type vhost: str
 
-        :param configure: A regex for the user permission. Default is ``.*``
+        :param configure: A regex for the user permission. Default is ``.*``,
+            use ``""`` to grant nothing
         :type configure: str
-        :param write: A regex for the user permission. Default is ``.*``
+        :param write: A regex for the user permission. Default is ``.*``,
+            use ``""`` to grant nothing
         :type write: str
-        :param read: A regex for the user permission. Default is ``.*``
+        :param read: A regex for the user permission. Default is ``.*``,
+            use ``""`` to grant nothing
         :type read: str
         """
         data = {
-            'configure': configure or '.*',
-            'write': write or '.*',
-            'read': read or '.*',
+            'configure': '.*' if configure is None else configure,
+            'write': '.*' if write is None else write,
+            'read': '.*' if read is None else read,
         }
-        self._api_put(
-            '/api/permissions/{0}/{1}'.format(
-                urllib.parse.quote_plus(vhost),
-                urllib.parse.quote_plus(name)
-            ),
+        return self._api_put(
+            ApiPath('/api/permissions/{vhost}/{name}', vhost=vhost, name=name),
             data=data
         )
 
-    def list_policies(self):
+    def list_policies(self, columns=None, disable_stats=False, stream=False):
         """
         A list of all policies
         """
-        return self._api_get('/api/policies')
+        return self._api_get(
+            '/api/policies',
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+        )
 
-    def list_policies_for_vhost(self, vhost):
+    def list_policies_for_vhost(self, vhost, columns=None, disable_stats=False, stream=False):
         """
         A list of all policies for a vhost.
         """
-        return self._api_get('/api/policies/{0}'.format(
-            urllib.parse.quote_plus(vhost)
-        ))
+        return self._api_get(
+            ApiPath('/api/policies/{vhost}', vhost=vhost),
+            params=_stats_params(columns, disable_stats),
+            stream=stream,
+        )
 
-    def get_policy_for_vhost(self, vhost, name):
+    def get_policy_for_vhost(self, vhost, name, columns=None, disable_stats=False):
         """
         Get a specific policy for a vhost.
 
@@ -482,10 +1245,10 @@ class AdminAPI(Resource):
         :param name: The name of the policy
         :type name: str
         """
-        return self._api_get('/api/policies/{0}/{1}'.format(
-            urllib.parse.quote_plus(vhost),
-            urllib.parse.quote_plus(name),
-        ))
+        return self._api_get(
+            ApiPath('/api/policies/{vhost}/{name}', vhost=vhost, name=name),
+            params=_stats_params(columns, disable_stats),
+        )
 
     def create_policy_for_vhost(
             self, vhost, name,
@@ -520,7 +1283,6 @@ class AdminAPI(Resource):
             ... definition={"ha-mode": "all"},
             ... pattern="",
             ... apply_to="all")
-
         """
         data = {
             "pattern": pattern,
@@ -528,11 +1290,8 @@ class AdminAPI(Resource):
             "priority": priority,
             "apply-to": apply_to
         }
-        self._api_put(
-            '/api/policies/{0}/{1}'.format(
-                urllib.parse.quote_plus(vhost),
-                urllib.parse.quote_plus(name),
-            ),
+        return self._api_put(
+            ApiPath('/api/policies/{vhost}/{name}', vhost=vhost, name=name),
             data=data,
         )
 
@@ -545,10 +1304,7 @@ class AdminAPI(Resource):
         :param name: The name of the policy
         :type name: str
         """
-        self._api_delete('/api/policies/{0}/{1}/'.format(
-            urllib.parse.quote_plus(vhost),
-            urllib.parse.quote_plus(name),
-        ))
+        return self._api_delete(ApiPath('/api/policies/{vhost}/{name}/', vhost=vhost, name=name))
 
     def is_vhost_alive(self, vhost):
         """
@@ -558,6 +1314,187 @@ class AdminAPI(Resource):
         :param vhost: The vhost name to check
         :type vhost: str
         """
-        return self._api_get('/api/aliveness-test/{0}'.format(
-            urllib.parse.quote_plus(vhost)
-        ))
+        return self._api_get(ApiPath('/api/aliveness-test/{vhost}', vhost=vhost))
+
+    def _health_check(self, path):
+        """
+        Runs a health check. A failed check is answered with a 503, which is
+        returned rather than raised, so that it is neither retried nor taken
+        for a node failure.
+        """
+        return self._api_get(path, accept_status=(503,))
+
+    def check_alarms(self):
+        """
+        Checks that no resource alarm is in effect anywhere in the cluster.
+        Health checks return ``{'status': 'ok'}``, or ``{'status': 'failed',
+        'reason': ...}`` when they fail. They need RabbitMQ 3.8.10 or later.
+        """
+        return self._health_check(ApiPath('/api/health/checks/alarms'))
+
+    def check_local_alarms(self):
+        """
+        Checks that no resource alarm is in effect on the node that answers.
+        See :meth:`pinned` to choose the node.
+        """
+        return self._health_check(ApiPath('/api/health/checks/local-alarms'))
+
+    def check_certificate_expiration(self, within=1, unit='months'):
+        """
+        Checks that none of the TLS certificates of the node that answers
+        expire within the given period
+
+        :param within: The length of the period
+        :type within: int
+        :param unit: ``'days'``, ``'weeks'``, ``'months'`` or ``'years'``
+        :type unit: str
+        """
+        return self._health_check(ApiPath(
+            '/api/health/checks/certificate-expiration/{within}/{unit}',
+            within=str(within), unit=unit))
+
+    def check_port_listener(self, port):
+        """
+        Checks that the node that answers has a listener on ``port``
+
+        :param port: The port number, e.g. ``5672``
+        :type port: int
+        """
+        return self._health_check(
+            ApiPath('/api/health/checks/port-listener/{port}', port=str(port)))
+
+    def check_protocol_listener(self, protocol):
+        """
+        Checks that the node that answers has a listener for ``protocol``
+
+        :param protocol: e.g. ``'amqp'``, ``'amqp/ssl'``, ``'mqtt'`` or
+            ``'http'``
+        :type protocol: str
+        """
+        return self._health_check(
+            ApiPath('/api/health/checks/protocol-listener/{protocol}', protocol=protocol))
+
+    def check_virtual_hosts(self):
+        """
+        Checks that every vhost is running on the node that answers
+        """
+        return self._health_check(ApiPath('/api/health/checks/virtual-hosts'))
+
+    def check_node_is_quorum_critical(self):
+        """
+        Checks that stopping the node that answers would not leave a quorum
+        queue without a majority of its replicas online
+        """
+        return self._health_check(ApiPath('/api/health/checks/node-is-quorum-critical'))
+
+    def health_sweep(self, vhosts=None, nodes=None, cluster_checks=CLUSTER_CHECKS,
+                     node_checks=NODE_CHECKS, max_workers=16, timeout=10):
+        """
+        Runs the aliveness test of every vhost and the health checks of the
+        cluster and of every node concurrently, and gathers them into one
+        report. See :func:`rabbitmq_admin.health.health_sweep` for the
+        parameters.
+
+        :rtype: rabbitmq_admin.health.HealthReport
+
+        Example ::
+
+            >>> report = api.health_sweep(
+            ...     node_checks=NODE_CHECKS + (Operation('check_port_listener', 5672),))
+            >>> [(result.target, result.check, result.reason) for result in report.failed]
+            [('http://rabbit-2:15672', 'local_alarms', 'resource alarm(s) in effect')]
+        """
+        return health_sweep(
+            self, vhosts=vhosts, nodes=nodes, cluster_checks=cluster_checks,
+            node_checks=node_checks, max_workers=max_workers, timeout=timeout)
+
+    def bulk_apply(self, operations, max_workers=8, max_rate=None, progress=None):
+        """
+        Runs many calls concurrently, in at most ``max_workers`` threads.
+        Calls that depend on each other are kept in order: a permission,
+        policy or exchange waits for the creation of its vhost and user if
+        those are part of the same batch, and a vhost or user is only deleted
+        after the deletions inside it. A failure does not stop the other calls,
+        but the calls that depend on it are not run.
+
+        :param operations: The calls to make
+        :type operations: list of :class:`rabbitmq_admin.bulk.Operation`
+        :param max_workers: The maximum number of concurrent requests. Keep
+            this no higher than the client's ``pool_maxsize``.
+        :type max_workers: int
+        :param max_rate: The maximum number of calls to start per second
+        :type max_rate: float
+        :param progress: Called with each
+            :class:`rabbitmq_admin.bulk.OperationResult`, the number of calls
+            done and the total, as each call completes
+        :type progress: callable
+
+        :returns: A result or error for every operation, in order
+        :rtype: rabbitmq_admin.bulk.BulkReport
+
+        Example ::
+
+            >>> report = api.bulk_apply([
+            ...     Operation('create_vhost', 'tenant'),
+            ...     Operation('create_user', 'tenant-app', 'secret'),
+            ...     Operation('create_user_permission', 'tenant-app', 'tenant'),
+            ... ])
+            >>> [result.error for result in report.failed]
+            []
+        """
+        return bulk_apply(
+            self, operations, max_workers=max_workers, max_rate=max_rate, progress=progress)
+
+    def bulk_create_vhosts(self, names, tracing=False, max_workers=8):
+        """
+        Creates many vhosts concurrently. See :meth:`bulk_apply`.
+
+        :param names: The vhost names
+        :type names: list of str
+        :param tracing: Set to ``True`` to enable tracing
+        :type tracing: bool
+        """
+        return self.bulk_apply(
+            [Operation('create_vhost', name, tracing=tracing) for name in names],
+            max_workers=max_workers,
+        )
+
+    def bulk_create_users(self, users, max_workers=8):
+        """
+        Creates many users concurrently. See :meth:`bulk_apply`.
+
+        :param users: The keyword arguments of :meth:`create_user` for every
+            user, e.g. ``{'name': 'bob', 'password': 'secret'}``
+        :type users: list of dict
+        """
+        return self.bulk_apply(
+            [Operation('create_user', **user) for user in users],
+            max_workers=max_workers,
+        )
+
+    def bulk_create_user_permissions(self, permissions, max_workers=8):
+        """
+        Creates many user permissions concurrently. See :meth:`bulk_apply`.
+
+        :param permissions: The keyword arguments of
+            :meth:`create_user_permission` for every permission, e.g.
+            ``{'name': 'bob', 'vhost': 'my-vhost'}``
+        :type permissions: list of dict
+        """
+        return self.bulk_apply(
+            [Operation('create_user_permission', **permission) for permission in permissions],
+            max_workers=max_workers,
+        )
+
+    def bulk_create_policies(self, policies, max_workers=8):
+        """
+        Creates many policies concurrently. See :meth:`bulk_apply`.
+
+        :param policies: The keyword arguments of
+            :meth:`create_policy_for_vhost` for every policy
+        :type policies: list of dict
+        """
+        return self.bulk_apply(
+            [Operation('create_policy_for_vhost', **policy) for policy in policies],
+            max_workers=max_workers,
+        )
@@ -1,6 +1,49 @@
-import json
+import contextlib
+import functools
+import threading
+import timeit
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from copy import deepcopy
+from requests.adapters import HTTPAdapter
+from requests.sessions import merge_setting
+from requests.structures import CaseInsensitiveDict
+from requests.utils import check_header_validity
+
+from rabbitmq_admin.cluster import NodePool, PartialResponseError
+from rabbitmq_admin.codec import default_codec
+from rabbitmq_admin.deadline import Deadline
+from rabbitmq_admin.metrics import RequestEvent, emit
+from rabbitmq_admin.streaming import JSONArrayDecoder
+import six
+from six.moves import urllib
+
+
+_UNSET = object()
+
+
+class ApiPath(str):
+    """
+    An API path that remembers the template it was built from, so that
+    requests can be grouped by endpoint rather than by object ::
+
+        >>> path = ApiPath('/api/exchanges/{vhost}/{name}', vhost='/', name='logs')
+        >>> path
+        '/api/exchanges/%2F/logs'
+        >>> path.template
+        '/api/exchanges/{vhost}/{name}'
+
+    Every parameter is quoted to be used as a single path segment.
+    """
+
+    def __new__(cls, template, **params):
+        path = super(ApiPath, cls).__new__(cls, template.format(**dict(
+            (name, urllib.parse.quote_plus(value)) for name, value in params.items()
+        )))
+        path.template = template
+        return path
 
 
 class Resource(object):
@@ -8,14 +51,25 @@ class Resource(object):
     A base class for API resources
     """
 
+    #: The number of bytes read from the socket at a time when streaming
+    stream_chunk_size = 64 * 1024
+
+    #: The default ``(connect, read)`` timeout of every request, in seconds
+    DEFAULT_TIMEOUT = (10, 60)
+
     # """List of allowed methods, allowed values are
     # ```['GET', 'PUT', 'POST', 'DELETE']``"""
     # ALLOWED_METHODS = []
 
-    def __init__(self, url, auth):
+    def __init__(self, url, auth, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, keep_alive=True, cache=None, hooks=None,
+                 codec=None, retry=None, breaker=None, timeout=DEFAULT_TIMEOUT,
+                 governor=None):
         """
         :param url: The RabbitMQ API url to connect to. This should include the
-            protocol and port number.
+            protocol and port number. Pass a list of urls, preferred node
+            first, or a :class:`rabbitmq_admin.cluster.NodePool`, to spread
+            requests over the nodes of a cluster.
         :type url: str
 
         :param auth: The authentication to pass to the request. See
@@ -24,53 +78,683 @@ class Resource(object):
             ``('username', 'password')``
         :type auth: Requests auth
 
+        :param pool_connections: The number of host pools to cache
+        :type pool_connections: int
+
+        :param pool_maxsize: The maximum number of connections kept open to
+            the API. Threads sharing this client reuse these connections.
+        :type pool_maxsize: int
+
+        :param pool_block: Set to ``True`` to make threads wait for a free
+            connection instead of opening extra, short-lived ones once
+            ``pool_maxsize`` connections are in use
+        :type pool_block: bool
+
+        :param keep_alive: Set to ``False`` to close the connection after
+            every request
+        :type keep_alive: bool
+
+        :param cache: An optional cache for the responses of slow-changing
+            endpoints. Writes through this client invalidate it.
+        :type cache: rabbitmq_admin.cache.ResponseCache
+
+        :param hooks: Functions called with a
+            :class:`rabbitmq_admin.metrics.RequestEvent` after every request,
+            such as a :class:`rabbitmq_admin.metrics.MetricsCollector`
+        :type hooks: list of callable
+
+        :param codec: The JSON codec for request and response bodies. Defaults
+            to :func:`rabbitmq_admin.codec.default_codec`.
+        :type codec: rabbitmq_admin.codec.JSONCodec
+
+        :param retry: Retries requests that failed for a transient reason
+        :type retry: rabbitmq_admin.retry.RetryPolicy
+
+        :param breaker: Fails requests fast while their endpoint keeps
+            failing
+        :type breaker: rabbitmq_admin.retry.CircuitBreaker
+
+        :param timeout: How long to wait for a connection and then between
+            bytes of the response, in seconds: a number for both, or a
+            ``(connect, read)`` tuple. ``None`` waits forever. See
+            :meth:`call_timeout` and :meth:`deadline` to change it for some
+            calls.
+        :type timeout: float or tuple
+
+        :param governor: Caps the requests in flight, and optionally their
+            rate, across the threads sharing this client, letting urgent
+            requests go first. See :meth:`priority`.
+        :type governor: rabbitmq_admin.ratelimit.Governor
+
         .. _Requests' authentication: http://docs.python-requests.org/en/latest/user/authentication/
         """
-        self.url = url.rstrip('/')
+        nodes = url if isinstance(url, NodePool) else None
+        if nodes is None and not isinstance(url, six.string_types):
+            nodes = NodePool(url) if len(url) > 1 else None
+            url = url[0]
+
+        #: The cluster nodes requests are spread over, or ``None`` when the
+        #: client talks to a single url
+        self.nodes = nodes
+        self.url = (nodes.urls[0] if nodes else url).rstrip('/')
         self.auth = auth
 
         self.headers = {
             'Content-type': 'application/json',
         }
+        self.keep_alive = keep_alive
+        self.cache = cache
+        self.hooks = list(hooks or [])
+        self.codec = codec or default_codec()
+        self.retry = retry
+        self.breaker = breaker
+        self.timeout = timeout
+        self.governor = governor
+        self._context = threading.local()
+
+        # The adapter owns the (thread-safe) urllib3 connection pool and is
+        # shared by one session per thread, so connections are reused across
+        # threads without sharing any session state between them.
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._local = threading.local()
+        # The session of every thread, for close(). A session is only kept
+        # alive by its thread, so it goes away when the thread exits.
+        self._sessions = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextlib.contextmanager
+    def caller(self, name):
+        """
+        Attributes the requests sent by the current thread within the block to
+        ``name`` in the events passed to :attr:`hooks` ::
+
+            >>> with api.caller('billing'):
+            ...     api.list_queues()
+        """
+        with self._scoped('caller', name):
+            yield
+
+    @contextlib.contextmanager
+    def call_timeout(self, timeout):
+        """
+        Uses ``timeout`` instead of :attr:`timeout` for the requests sent by
+        the current thread within the block ::
+
+            >>> with api.call_timeout((2, 5)):
+            ...     api.overview()
+        """
+        with self._scoped('timeout', timeout):
+            yield
+
+    @contextlib.contextmanager
+    def deadline(self, seconds):
+        """
+        Gives the requests sent by the current thread within the block, and
+        by the workers of the bulk helpers it calls, ``seconds`` to complete
+        in all ::
+
+            >>> with api.deadline(30):
+            ...     report = api.bulk_create_vhosts(names)
+
+        The timeout of each request is shortened to the time left, and once
+        it has run out requests raise
+        :class:`rabbitmq_admin.deadline.DeadlineExceeded` without being sent.
+        A deadline within another one never extends it.
+
+        :rtype: rabbitmq_admin.deadline.Deadline
+        """
+        deadline = Deadline(seconds)
+        current = getattr(self._context, 'deadline', None)
+        if current is not None and current.expires_at < deadline.expires_at:
+            deadline = current
+        with self._scoped('deadline', deadline):
+            yield deadline
+
+    @contextlib.contextmanager
+    def priority(self, level):
+        """
+        Queues the requests sent by the current thread within the block with
+        priority ``level`` while they wait for the :attr:`governor`, instead
+        of the one it gives their endpoint ::
+
+            >>> from rabbitmq_admin.ratelimit import HIGH
+            >>> with api.priority(HIGH):
+            ...     api.get_queue('/', 'orders')
+        """
+        with self._scoped('priority', level):
+            yield
+
+    @contextlib.contextmanager
+    def pinned(self, url):
+        """
+        Sends the requests of the current thread within the block to the node
+        at ``url``, without failing over to another node. Use it for checks
+        that look at the node that answers them ::
+
+            >>> with api.pinned('http://rabbit-2:15672'):
+            ...     api.check_local_alarms()
+        """
+        with self._scoped('node', url.rstrip('/')):
+            yield
+
+    def capture_context(self):
+        """
+        The caller, timeout, deadline, priority and pinned node set for the current thread, to be
+        applied in another thread with :meth:`restore_context`
+        """
+        return dict(vars(self._context))
+
+    @contextlib.contextmanager
+    def restore_context(self, context):
+        """
+        Applies a context returned by :meth:`capture_context` to the current
+        thread within the block
+        """
+        attributes = vars(self._context)
+        previous = dict(attributes)
+        attributes.clear()
+        attributes.update(context)
+        try:
+            yield
+        finally:
+            attributes.clear()
+            attributes.update(previous)
+
+    @contextlib.contextmanager
+    def _scoped(self, name, value):
+        """
+        Sets a context attribute of the current thread within the block
+        """
+        previous = getattr(self._context, name, _UNSET)
+        setattr(self._context, name, value)
+        try:
+            yield
+        finally:
+            if previous is _UNSET:
+                delattr(self._context, name)
+            else:
+                setattr(self._context, name, previous)
+
+    @property
+    def headers(self):
+        """
+        The headers sent with every request. Assign a new dict to change
+        them; changing them in place is deprecated.
+        """
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers):
+        self._headers = _DefaultHeaders(headers)
+
+    @property
+    def session(self):
+        """
+        The :class:`requests.Session` used by the calling thread. Every
+        session sends its requests through this client's connection pool.
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._create_session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.add(session)
+        return session
+
+    def _create_session(self):
+        """
+        Builds a session mounted on the shared connection pool
+        """
+        session = _Session()
+        session.mount('http://', self._adapter)
+        session.mount('https://', self._adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self):
+        """
+        Closes every pooled connection. The client can still be used
+        afterwards; it will simply open new connections.
+        """
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+        self._local = threading.local()
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+
+    def _api_kwargs(self, url, kwargs):
+        """
+        Builds the keyword arguments shared by every API request: the full
+        url, auth, default headers and query string parameters. Transports
+        (see :class:`rabbitmq_admin.aio.AsyncAdminAPI`) only have to send
+        what this returns.
+        """
+        kwargs['url'] = self.url + url
+        kwargs['auth'] = self.auth
+
+        # The default headers are shared by every request; a new dict is
+        # only built when a call adds headers of its own
+        headers = kwargs.get('headers')
+        if headers:
+            merged = dict(self.headers)
+            merged.update(headers)
+            headers = merged
+        kwargs['headers'] = headers or self.headers
+
+        if kwargs.get('params'):
+            kwargs['params'] = self._encode_params(kwargs['params'])
+        return kwargs
+
+    @staticmethod
+    def _encode_params(params):
+        """
+        Renders query string parameters the way the management API expects
+        them. Booleans become ``true``/``false`` and ``None`` values are
+        dropped.
+        """
+        encoded = {}
+        for key, value in params.items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            encoded[key] = value
+        return encoded
 
     def _api_get(self, url, **kwargs):
         """
         A convenience wrapper for _get. Adds headers, auth and base url by
         default
         """
-        kwargs['url'] = self.url + url
-        kwargs['auth'] = self.auth
+        kwargs = self._api_kwargs(url, kwargs)
+        if self.cache is not None and not kwargs.get('stream'):
+            return self._cached_get(url, kwargs)
+        return self._call('GET', url, self._get, kwargs)
+
+    def _cached_get(self, url, kwargs):
+        """
+        Serves a GET from the cache when the endpoint has a TTL
+        """
+        ttl = self.cache.ttl_for(url)
+        if not ttl:
+            return self._call('GET', url, self._get, kwargs)
 
-        headers = deepcopy(self.headers)
-        headers.update(kwargs.get('headers', {}))
-        kwargs['headers'] = headers
-        return self._get(**kwargs)
+        key = self.cache.key(kwargs['url'], kwargs.get('params'), kwargs.get('transform'))
+        hit, response = self.cache.get(key)
+        if not hit:
+            generation = self.cache.generation
+            response = self._call('GET', url, self._get, kwargs)
+            self.cache.set(key, response, ttl, generation=generation)
+        return response
+
+    def _call(self, method, url, send, kwargs, read=True, retriable=True):
+        """
+        Sends a request with :meth:`_route`, through :attr:`breaker`,
+        :attr:`retry` and :attr:`governor` if they are set. When there are
+        :attr:`hooks`, the request is described by an event that the
+        transport fills in.
+        """
+        retrying = self.retry is not None and retriable
+        guarded = retrying or self.breaker is not None or self.governor is not None
+        if not self.hooks and not guarded:
+            return self._route(send, kwargs, read)
+
+        path = url.split('?', 1)[0]
+        endpoint = getattr(url, 'template', path)
+        if guarded:
+            retry = self.retry if retriable else None
+            call = functools.partial(self._guarded, method, endpoint, retry, send, kwargs, read)
+        else:
+            call = functools.partial(self._route, send, kwargs, read)
+        if not self.hooks:
+            return call()
+
+        event = RequestEvent(
+            method, endpoint, path, caller=getattr(self._context, 'caller', None))
+        kwargs['event'] = event
+        return self._timed(event, call, kwargs.get('stream'))
+
+    def _guarded(self, method, endpoint, retry, send, kwargs, read):
+        """
+        Sends a request with :meth:`_route` unless the circuit of its
+        endpoint is open, and sends it again for as long as ``retry`` allows
+        """
+        breaker = self.breaker
+        sent = []
+
+        def sending(**options):
+            sent.append(True)
+            return send(**options)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before(endpoint)
+            del sent[:]
+            try:
+                result = self._governed(method, endpoint, sending, kwargs, read)
+            except Exception as error:
+                delay = self._failed(method, endpoint, retry, kwargs, attempt, error, bool(sent))
+                if delay is None:
+                    raise
+                retry.sleep(delay)
+                continue
+            if breaker is not None:
+                breaker.record(endpoint)
+            return result
+
+    def _governed(self, method, endpoint, send, kwargs, read):
+        """
+        Sends a request with :meth:`_route` once the :attr:`governor` has a
+        slot for it. The slot is held until the response has been read, or
+        for a streamed response until its headers have arrived.
+        """
+        governor = self.governor
+        if governor is None:
+            return self._route(send, kwargs, read)
+
+        context = self._context
+        level = getattr(context, 'priority', None)
+        if level is None:
+            level = governor.classify(method, endpoint)
+        waited = governor.acquire(level, getattr(context, 'deadline', None))
+        event = kwargs.get('event')
+        if event is not None:
+            event.queue_wait = (event.queue_wait or 0.0) + waited
+        try:
+            return self._route(send, kwargs, read)
+        finally:
+            governor.release()
+
+    def _failed(self, method, endpoint, retry, kwargs, attempt, error, sent=True):
+        """
+        Records a failed attempt, and returns how long to wait before the
+        next one, or ``None`` to give up. An attempt that failed before it
+        was ``sent``, such as one past its deadline, says nothing about the
+        endpoint and leaves its circuit as it was.
+        """
+        if self.breaker is not None:
+            if sent:
+                self.breaker.record(endpoint, error)
+            else:
+                self.breaker.release(endpoint)
+        if retry is None:
+            return None
+        delay = retry.next_delay(method, endpoint, error, attempt)
+        deadline = getattr(self._context, 'deadline', None)
+        if delay is None or (deadline is not None and delay >= deadline.remaining()):
+            return None
+        if kwargs.get('event') is not None:
+            kwargs['event'].retries += 1
+        return delay
+
+    def _timed(self, event, send, stream=False):
+        """
+        Times ``send``. The event of a streamed response is finished by the
+        stream once it has been read.
+        """
+        event.started = timeit.default_timer()
+        try:
+            result = send()
+        except Exception as error:
+            event.error = error
+            self._finish(event)
+            raise
+        if not stream:
+            self._finish(event)
+        return result
+
+    def _finish(self, event):
+        event.latency = timeit.default_timer() - event.started
+        emit(self.hooks, event)
+
+    @staticmethod
+    def _record(event, response, stream=False):
+        """
+        Copies the url, status and, unless it is streamed, the size of
+        ``response`` into ``event``
+        """
+        if event is not None:
+            event.url = response.url
+            event.status = response.status_code
+            if not stream:
+                event.bytes = len(response.content or b'')
+
+    def _decode(self, response, event):
+        """
+        Decodes the raw bytes of a JSON response with :attr:`codec`, timing it
+        for ``event``
+        """
+        if event is None:
+            return self.codec.loads(response.content)
+        start = timeit.default_timer()
+        try:
+            return self.codec.loads(response.content)
+        finally:
+            event.decode_time += timeit.default_timer() - start
+
+    def _route(self, send, kwargs, read=True):
+        """
+        Sends a request with ``send``. When the client has several
+        :attr:`nodes`, the request goes to the node they pick and fails over
+        to another one if that node is down. A :meth:`pinned` request goes
+        to its node only.
+        """
+        nodes = self.nodes
+        node = getattr(self._context, 'node', None)
+        if node is None and nodes is None:
+            return send(**self._with_timeout(kwargs))
+
+        path = kwargs['url'][len(self.url):]
+        if node is not None:
+            return send(**dict(self._with_timeout(kwargs), url=node + path))
+        return nodes.call(
+            lambda node: send(**dict(self._with_timeout(kwargs), url=node.url + path)), read=read)
+
+    def _with_timeout(self, kwargs):
+        """
+        ``kwargs`` with the timeout of a request sent now: the one set by
+        :meth:`call_timeout`, or :attr:`timeout`, shortened to the time left
+        before the :meth:`deadline`
+        """
+        context = self._context
+        timeout = getattr(context, 'timeout', self.timeout)
+        deadline = getattr(context, 'deadline', None)
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        return dict(kwargs, timeout=timeout)
+
+    def _invalidate(self, url):
+        """
+        Drops the cached responses that a write to ``url`` may have changed
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self.url, url)
+
+    def _api_iter(self, url, page_size=100, prefetch=False, **kwargs):
+        """
+        Iterates over a collection that the management API can paginate,
+        requesting it one page at a time. Only one page is held in memory,
+        or two with ``prefetch``, in which case the next page is requested in
+        a background thread while the caller works through the current one.
+
+        Pages are computed by the server on every request, so objects created
+        or deleted while iterating can shift items between pages.
+        """
+        params = dict(kwargs.pop('params', None) or {})
+        params.update(pagination=True, page_size=page_size)
+        context = self.capture_context()
+
+        def fetch(page):
+            # Prefetched pages are requested from another thread
+            with self.restore_context(context):
+                return self._api_get(url, params=dict(params, page=page), **kwargs)
+
+        # One worker requests the next page of this iterator while the
+        # caller works through the current one
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 1
+            response = fetch(page)
+            while True:
+                next_response = None
+                if executor is not None and page < response['page_count']:
+                    next_response = executor.submit(fetch, page + 1)
+
+                for item in response['items']:
+                    yield item
+
+                if page >= response['page_count']:
+                    return
+                page += 1
+                response = next_response.result() if next_response else fetch(page)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
 
     def _get(self, *args, **kwargs):
         """
-        A wrapper for getting things
+        A wrapper for getting things. With ``stream=True`` the response must
+        be a JSON array, and an iterator over its items is returned. Items
+        are decoded as they arrive, without reading the whole body first.
+        The decoded response, or each streamed item, is passed through
+        ``transform`` if it is given.
+        Error statuses in ``accept_status`` are decoded like successful
+        responses instead of raising.
 
         :returns: The response of your get
         :rtype: dict
         """
-        response = requests.get(*args, **kwargs)
+        event = kwargs.pop('event', None)
+        transform = kwargs.pop('transform', None)
+        accept_status = kwargs.pop('accept_status', ())
+        response = self.session.get(*args, **kwargs)
+        self._record(event, response, stream=kwargs.get('stream'))
 
-        response.raise_for_status()
+        if kwargs.get('stream'):
+            try:
+                response.raise_for_status()
+            except Exception:
+                response.close()
+                raise
+            return self._iter_response(response, event, transform)
+
+        if response.status_code not in accept_status:
+            response.raise_for_status()
+
+        result = self._decode(response, event)
+        return transform(result) if transform else result
+
+    def _iter_response(self, response, event=None, transform=None):
+        """
+        Yields the items of a JSON array response as they are decoded. The
+        connection goes back to the pool once the array has been read, or
+        when the iterator is closed or garbage collected.
+        """
+        decoder = JSONArrayDecoder(self.codec.loads)
+        try:
+            for chunk in response.iter_content(self.stream_chunk_size):
+                for item in self._feed(decoder.feed, chunk, event):
+                    yield transform(item) if transform else item
+            for item in self._feed(lambda chunk: decoder.close(), b'', event):
+                yield transform(item) if transform else item
+        finally:
+            response.close()
+            if event is not None:
+                self._finish(event)
+
+    @staticmethod
+    def _feed(decode, chunk, event):
+        if event is None:
+            return decode(chunk)
+        event.bytes += len(chunk)
+        start = timeit.default_timer()
+        try:
+            return decode(chunk)
+        finally:
+            event.decode_time += timeit.default_timer() - start
 
-        return response.json()
+    def _api_download(self, url, write, **kwargs):
+        """
+        GETs ``url`` and passes the raw response body to ``write`` chunk by
+        chunk, without decoding or holding it in memory.
+
+        :returns: The number of bytes received
+        :rtype: int
+        """
+        kwargs = self._api_kwargs(url, kwargs)
+        kwargs['write'] = write
+        # Only failures before any of the body was written are retried on
+        # another node, and the retry policy does not apply.
+        return self._call('GET', url, self._download, kwargs, read=False, retriable=False)
+
+    def _download(self, *args, **kwargs):
+        event = kwargs.pop('event', None)
+        write = kwargs.pop('write')
+        response = self.session.get(*args, stream=True, **kwargs)
+        self._record(event, response, stream=True)
+        size = 0
+        try:
+            response.raise_for_status()
+            for chunk in response.iter_content(self.stream_chunk_size):
+                write(chunk)
+                size += len(chunk)
+        except requests.RequestException as error:
+            if not size:
+                raise
+            six.raise_from(PartialResponseError(
+                'The connection failed after {0} bytes: {1}'.format(size, error),
+                response=response), error)
+        finally:
+            response.close()
+            if event is not None:
+                event.bytes = size
+        return size
+
+    def _api_upload(self, url, body, **kwargs):
+        """
+        POSTs the chunks returned by ``body()`` as the request body, as they
+        are produced. ``body`` is called again if the request is retried on
+        another node.
+        """
+        kwargs = self._api_kwargs(url, kwargs)
+        kwargs['body'] = body
+        try:
+            return self._call('POST', url, self._upload, kwargs, read=False)
+        finally:
+            self._invalidate(url)
+
+    def _upload(self, *args, **kwargs):
+        event = kwargs.pop('event', None)
+        kwargs['data'] = kwargs.pop('body')()
+        response = self.session.post(*args, **kwargs)
+        self._record(event, response)
+        response.raise_for_status()
 
     def _api_put(self, url, **kwargs):
         """
         A convenience wrapper for _put. Adds headers, auth and base url by
         default
         """
-        kwargs['url'] = self.url + url
-        kwargs['auth'] = self.auth
-
-        headers = deepcopy(self.headers)
-        headers.update(kwargs.get('headers', {}))
-        kwargs['headers'] = headers
-        self._put(**kwargs)
+        kwargs = self._api_kwargs(url, kwargs)
+        try:
+            return self._call('PUT', url, self._put, kwargs, read=False)
+        finally:
+            self._invalidate(url)
 
     def _put(self, *args, **kwargs):
         """
@@ -79,9 +763,11 @@ class Resource(object):
         :returns: The response of your put
         :rtype: dict
         """
+        event = kwargs.pop('event', None)
         if 'data' in kwargs:
-            kwargs['data'] = json.dumps(kwargs['data'])
-        response = requests.put(*args, **kwargs)
+            kwargs['data'] = self.codec.dumps(kwargs['data'])
+        response = self.session.put(*args, **kwargs)
+        self._record(event, response)
         response.raise_for_status()
 
     def _api_post(self, url, **kwargs):
@@ -89,13 +775,11 @@ class Resource(object):
         A convenience wrapper for _post. Adds headers, auth and base url by
         default
         """
-        kwargs['url'] = self.url + url
-        kwargs['auth'] = self.auth
-
-        headers = deepcopy(self.headers)
-        headers.update(kwargs.get('headers', {}))
-        kwargs['headers'] = headers
-        self._post(**kwargs)
+        kwargs = self._api_kwargs(url, kwargs)
+        try:
+            return self._call('POST', url, self._post, kwargs, read=False)
+        finally:
+            self._invalidate(url)
 
     def _post(self, *args, **kwargs):
         """
@@ -104,9 +788,11 @@ class Resource(object):
         :returns: The response of your post
         :rtype: dict
         """
+        event = kwargs.pop('event', None)
         if 'data' in kwargs:
-            kwargs['data'] = json.dumps(kwargs['data'])
-        response = requests.post(*args, **kwargs)
+            kwargs['data'] = self.codec.dumps(kwargs['data'])
+        response = self.session.post(*args, **kwargs)
+        self._record(event, response)
         response.raise_for_status()
 
     def _api_delete(self, url, **kwargs):
@@ -114,13 +800,11 @@ class Resource(object):
         A convenience wrapper for _delete. Adds headers, auth and base url by
         default
         """
-        kwargs['url'] = self.url + url
-        kwargs['auth'] = self.auth
-
-        headers = deepcopy(self.headers)
-        headers.update(kwargs.get('headers', {}))
-        kwargs['headers'] = headers
-        self._delete(**kwargs)
+        kwargs = self._api_kwargs(url, kwargs)
+        try:
+            return self._call('DELETE', url, self._delete, kwargs, read=False)
+        finally:
+            self._invalidate(url)
 
     def _delete(self, *args, **kwargs):
         """
@@ -129,5 +813,137 @@ class Resource(object):
         :returns: The response of your delete
         :rtype: dict
         """
-        response = requests.delete(*args, **kwargs)
+        event = kwargs.pop('event', None)
+        response = self.session.delete(*args, **kwargs)
+        self._record(event, response)
         response.raise_for_status()
+
+
+def _deprecated_mutation(name):
+    method = getattr(dict, name)
+
+    def mutate(self, *args, **kwargs):
+        warnings.warn(
+            'Changing the default headers in place is deprecated; assign a new dict instead',
+            DeprecationWarning, stacklevel=2)
+        result = method(self, *args, **kwargs)
+        self.key = frozenset(self.items())
+        return result
+    return mutate
+
+
+class _DefaultHeaders(dict):
+    """
+    The default headers, shared by every request. :attr:`key` identifies
+    their contents, to look up prepared request templates.
+
+    Changing them in place still works, but is deprecated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_DefaultHeaders, self).__init__(*args, **kwargs)
+        self.key = frozenset(self.items())
+
+    __setitem__ = _deprecated_mutation('__setitem__')
+    __delitem__ = _deprecated_mutation('__delitem__')
+    clear = _deprecated_mutation('clear')
+    pop = _deprecated_mutation('pop')
+    popitem = _deprecated_mutation('popitem')
+    setdefault = _deprecated_mutation('setdefault')
+    update = _deprecated_mutation('update')
+
+
+class _Session(requests.Session):
+    """
+    A session that prepares requests from a template. Merging the session
+    and default headers, and encoding basic auth, is done once per set of
+    default headers and credentials rather than on every request. Environment
+    settings, such as proxies and the CA bundle, are looked up once per host.
+    Both are built again when the session's headers, auth, proxies, hooks,
+    ``verify``, ``cert`` or ``trust_env`` change.
+
+    Requests with options other than those used by :class:`Resource`, or
+    with auth other than a ``(username, password)`` tuple, are prepared the
+    usual way.
+    """
+
+    def __init__(self):
+        super(_Session, self).__init__()
+        self._templates = {}
+        self._environments = {}
+        self._settings = None
+
+    def request(self, method, url, params=None, data=None, headers=None, auth=None,
+                stream=None, timeout=None, allow_redirects=True, **kwargs):
+        if kwargs or not isinstance(auth, tuple):
+            return super(_Session, self).request(
+                method, url, params=params, data=data, headers=headers, auth=auth,
+                stream=stream, timeout=timeout, allow_redirects=allow_redirects, **kwargs)
+
+        self._check_settings()
+        defaults = headers if isinstance(headers, _DefaultHeaders) else None
+        prepared = self._template(defaults, auth).copy()
+        prepared.method = method.upper()
+        prepared.prepare_url(url, params)
+        if headers and defaults is None:
+            for header in headers.items():
+                check_header_validity(header)
+                prepared.headers[header[0]] = header[1]
+        if self.cookies:
+            prepared.prepare_cookies(self.cookies)
+        prepared.prepare_body(data, None)
+
+        send_kwargs = dict(
+            self._environment(prepared.url), timeout=timeout, allow_redirects=allow_redirects)
+        if stream is not None:
+            send_kwargs['stream'] = stream
+        return self.send(prepared, **send_kwargs)
+
+    def _check_settings(self):
+        """
+        Drops the templates and environments built from settings that have
+        changed since
+        """
+        settings = (
+            tuple(self.headers.items()),
+            self.auth,
+            tuple(sorted(self.proxies.items())),
+            tuple((event, tuple(hooks)) for event, hooks in sorted(self.hooks.items())),
+            self.verify,
+            self.cert,
+            self.trust_env,
+        )
+        if settings != self._settings:
+            self._templates.clear()
+            self._environments.clear()
+            self._settings = settings
+
+    def _template(self, headers, auth):
+        """
+        A prepared request carrying the session headers, ``headers`` and
+        ``auth``, to be copied for every request
+        """
+        key = (headers.key if headers is not None else None, auth)
+        template = self._templates.get(key)
+        if template is None:
+            template = requests.PreparedRequest()
+            template.method = 'GET'
+            template.prepare_headers(
+                merge_setting(headers, self.headers, dict_class=CaseInsensitiveDict))
+            template.prepare_auth(auth)
+            template.prepare_hooks(self.hooks)
+            self._templates[key] = template
+        return template
+
+    def _environment(self, url):
+        """
+        The proxies, verify, cert and stream settings for ``url``, taken from
+        the session and the environment
+        """
+        parsed = requests.utils.urlparse(url)
+        key = (parsed.scheme, parsed.netloc)
+        environment = self._environments.get(key)
+        if environment is None:
+            environment = self.merge_environment_settings(url, {}, None, None, None)
+            self._environments[key] = environment
+        return environment
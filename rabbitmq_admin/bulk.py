@@ -0,0 +1,359 @@
+"""
+Runs many :class:`rabbitmq_admin.api.AdminAPI` calls concurrently over a
+bounded pool of worker threads, while keeping the calls that depend on each
+other in order.
+"""
+import inspect
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rabbitmq_admin.ratelimit import RateLimiter
+
+
+class DependencyError(Exception):
+    """
+    Raised in place of an operation that was not run because an operation it
+    depends on failed
+    """
+
+    def __init__(self, dependency):
+        super(DependencyError, self).__init__(
+            'Not run because {0!r} failed'.format(dependency))
+        self.dependency = dependency
+
+
+class Operation(object):
+    """
+    A single call of an :class:`rabbitmq_admin.api.AdminAPI` method ::
+
+        >>> Operation('create_user_permission', 'bob', 'my-vhost', read='.*')
+    """
+
+    #: The resources each method creates or removes, as functions of its
+    #: arguments
+    PROVIDES = {
+        'create_vhost': lambda a: [('vhost', a['name'])],
+        'create_user': lambda a: [('user', a['name'])],
+        'create_exchange_for_vhost': lambda a: [('exchange', a['vhost'], a['exchange'])],
+        'create_queue_for_vhost': lambda a: [('queue', a['vhost'], a['queue'])],
+        'delete_user_permission': lambda a: [
+            ('vhost contents', a['vhost']), ('user contents', a['name'])],
+        'delete_policy_for_vhost': lambda a: [('vhost contents', a['vhost'])],
+        'delete_exchange_for_vhost': lambda a: [
+            ('vhost contents', a['vhost']), ('exchange deleted', a['vhost'], a['exchange'])],
+        'delete_queue_for_vhost': lambda a: [
+            ('vhost contents', a['vhost']), ('queue deleted', a['vhost'], a['queue'])],
+        'delete_binding': lambda a: [
+            ('vhost contents', a['vhost']),
+            ('exchange bindings', a['vhost'], a['source']),
+            (a['destination_type'] + ' bindings', a['vhost'], a['destination']),
+        ],
+    }
+
+    #: The resources each method needs to have been created first. If their
+    #: creation fails, the method is not called.
+    REQUIRES = {
+        'create_user_permission': lambda a: [('vhost', a['vhost']), ('user', a['name'])],
+        'create_policy_for_vhost': lambda a: [('vhost', a['vhost'])],
+        'create_exchange_for_vhost': lambda a: [('vhost', a['vhost'])],
+        'create_queue_for_vhost': lambda a: [('vhost', a['vhost'])],
+        'create_binding': lambda a: [
+            ('vhost', a['vhost']),
+            ('exchange', a['vhost'], a['source']),
+            (a['destination_type'], a['vhost'], a['destination']),
+        ],
+    }
+
+    #: The operations each method runs after, whether they succeed or not
+    AFTER = {
+        'delete_vhost': lambda a: [('vhost contents', a['name'])],
+        'delete_user': lambda a: [('user contents', a['name'])],
+        'delete_exchange_for_vhost': lambda a: [('exchange bindings', a['vhost'], a['exchange'])],
+        'delete_queue_for_vhost': lambda a: [('queue bindings', a['vhost'], a['queue'])],
+        'create_exchange_for_vhost': lambda a: [('exchange deleted', a['vhost'], a['exchange'])],
+        'create_queue_for_vhost': lambda a: [('queue deleted', a['vhost'], a['queue'])],
+    }
+
+    #: The resources each method creates or removes as a whole. Operations
+    #: on the same resource run one after another, in the order given,
+    #: whether they succeed or not.
+    SERIAL = {
+        'create_vhost': lambda a: [('vhost', a['name'])],
+        'delete_vhost': lambda a: [('vhost', a['name'])],
+    }
+
+    def __init__(self, method, *args, **kwargs):
+        """
+        :param method: The name of the :class:`rabbitmq_admin.api.AdminAPI`
+            method to call
+        :type method: str
+
+        Any other arguments are passed to the method.
+        """
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        arguments = [repr(arg) for arg in self.args] + [
+            '{0}={1!r}'.format(key, value) for key, value in sorted(self.kwargs.items())]
+        return '{0}({1})'.format(self.method, ', '.join(arguments))
+
+    def call_args(self, api):
+        """
+        The arguments of this call, by name
+
+        :raises TypeError: If the arguments do not fit the method
+        """
+        return inspect.getcallargs(getattr(api, self.method), *self.args, **self.kwargs)
+
+    def provides(self, api):
+        rule = self.PROVIDES.get(self.method)
+        return rule(self.call_args(api)) if rule else []
+
+    def requires(self, api):
+        rule = self.REQUIRES.get(self.method)
+        return rule(self.call_args(api)) if rule else []
+
+    def after(self, api):
+        rule = self.AFTER.get(self.method)
+        return rule(self.call_args(api)) if rule else []
+
+    def serial(self, api):
+        rule = self.SERIAL.get(self.method)
+        return rule(self.call_args(api)) if rule else []
+
+    def __call__(self, api):
+        return getattr(api, self.method)(*self.args, **self.kwargs)
+
+
+class OperationResult(object):
+    """
+    The outcome of one :class:`Operation`. Exactly one of ``result`` and
+    ``error`` is meaningful, depending on :attr:`ok`.
+    """
+
+    def __init__(self, operation, result=None, error=None):
+        self.operation = operation
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = 'ok' if self.ok else 'error={0!r}'.format(self.error)
+        return '<OperationResult {0!r} {1}>'.format(self.operation, outcome)
+
+
+class BulkReport(object):
+    """
+    The results of a bulk apply, in the same order as its operations
+    """
+
+    def __init__(self, results):
+        self.results = results
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    @property
+    def ok(self):
+        """
+        ``True`` if every operation succeeded
+        """
+        return all(result.ok for result in self.results)
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self):
+        """
+        The results of operations that raised, or were not run because an
+        operation they depend on raised
+        """
+        return [result for result in self.results if not result.ok]
+
+    def summary(self):
+        """
+        :returns: The number of operations that succeeded and failed, and the
+            number of failures by error type
+        :rtype: dict
+        """
+        failed = self.failed
+        return {
+            'succeeded': len(self.results) - len(failed),
+            'failed': len(failed),
+            'errors': dict(Counter(type(result.error).__name__ for result in failed)),
+        }
+
+
+class _BulkRun(object):
+    """
+    Schedules operations as the operations they depend on complete
+    """
+
+    def __init__(self, api, operations, limiter=None, progress=None):
+        self.api = api
+        self.operations = operations
+        self.limiter = limiter
+        self.progress = progress
+        # Workers send their requests with the caller, timeout and deadline
+        # of the calling thread
+        self.context = api.capture_context()
+        self.done = 0
+        self.results = [None] * len(operations)
+        self.waiting_on = [0] * len(operations)
+        self.running = {}
+        # Operations that do not fit their method fail at once, without
+        # holding up the others
+        self.invalid = {}
+        self.link(self.rules())
+
+    def rules(self):
+        """
+        The keys each operation provides, requires, runs after and runs in
+        order on
+        """
+        rules = []
+        for index, operation in enumerate(self.operations):
+            try:
+                rules.append((operation.provides(self.api), operation.requires(self.api),
+                              operation.after(self.api), operation.serial(self.api)))
+            except (AttributeError, TypeError) as error:
+                self.invalid[index] = error
+                rules.append(([], [], [], []))
+        return rules
+
+    def link(self, rules):
+        providers = defaultdict(list)
+        for index, (provides, _, _, _) in enumerate(rules):
+            for key in provides:
+                providers[key].append(index)
+
+        def find(keys, index):
+            return set(
+                provider
+                for key in keys
+                for provider in providers.get(key, ())
+                if provider != index
+            )
+
+        # Operations that need another one to succeed, and operations that
+        # only need it to have finished
+        self.dependents = defaultdict(list)
+        self.followers = defaultdict(list)
+        previous = {}
+        for index, (_, requires, after, serial) in enumerate(rules):
+            required = find(requires, index)
+            for dependency in required:
+                self.dependents[dependency].append(index)
+            after = find(after, index)
+            for key in serial:
+                if key in previous:
+                    after.add(previous[key])
+                previous[key] = index
+            after -= required
+            for dependency in after:
+                self.followers[dependency].append(index)
+            self.waiting_on[index] = len(required) + len(after)
+
+    def run(self, executor):
+        for index, error in sorted(self.invalid.items()):
+            self.record(index, OperationResult(self.operations[index], error=error))
+        for index, count in enumerate(self.waiting_on):
+            if count == 0 and self.results[index] is None:
+                self.submit(executor, index)
+
+        while self.running:
+            done, _ = wait(self.running, return_when=FIRST_COMPLETED)
+            for future in done:
+                self.complete(executor, self.running.pop(future), future)
+        return BulkReport(self.results)
+
+    def submit(self, executor, index):
+        self.running[executor.submit(self.call, index)] = index
+
+    def call(self, index):
+        with self.api.restore_context(self.context):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            return self.operations[index](self.api)
+
+    def complete(self, executor, index, future):
+        error = future.exception()
+        if error is None:
+            self.record(index, OperationResult(self.operations[index], result=future.result()))
+            self.release(executor, self.dependents[index])
+        else:
+            self.record(index, OperationResult(self.operations[index], error=error))
+            self.skip_dependents(executor, index)
+        self.release(executor, self.followers[index])
+
+    def record(self, index, result):
+        self.results[index] = result
+        self.done += 1
+        if self.progress is not None:
+            self.progress(result, self.done, len(self.operations))
+
+    def release(self, executor, indexes):
+        for index in indexes:
+            self.waiting_on[index] -= 1
+            if self.waiting_on[index] == 0 and self.results[index] is None:
+                self.submit(executor, index)
+
+    def skip_dependents(self, executor, failed):
+        error = DependencyError(self.operations[failed])
+        stack = list(self.dependents[failed])
+        while stack:
+            index = stack.pop()
+            if self.results[index] is None:
+                self.record(index, OperationResult(self.operations[index], error=error))
+                stack.extend(self.dependents[index])
+                self.release(executor, self.followers[index])
+
+
+def bulk_apply(api, operations, max_workers=8, max_rate=None, progress=None):
+    """
+    Runs ``operations`` on ``api`` with at most ``max_workers`` running at once.
+    An operation only starts once the operations it depends on, such as the
+    creation of its vhost or user, have succeeded. Failures do not stop the
+    other operations, and neither do operations whose arguments do not fit
+    their method, which fail with the ``TypeError``.
+
+    :param api: The client to run the operations with
+    :type api: rabbitmq_admin.api.AdminAPI
+
+    :param operations: The operations to run
+    :type operations: iterable of :class:`Operation`
+
+    :param max_workers: The maximum number of concurrent requests
+    :type max_workers: int
+
+    :param max_rate: The maximum number of operations to start per second
+    :type max_rate: float
+
+    :param progress: Called with the :class:`OperationResult`, the number of
+        operations done and the total, as each operation completes. It is
+        called from the calling thread.
+    :type progress: callable
+
+    :returns: A result or error for every operation
+    :rtype: BulkReport
+    """
+    limiter = RateLimiter(max_rate) if max_rate else None
+    bulk_run = _BulkRun(api, list(operations), limiter, progress)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        return bulk_run.run(executor)
+    finally:
+        executor.shutdown(wait=True)
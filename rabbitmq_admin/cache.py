@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache(object):
+    """
+    A thread-safe, size-bounded LRU cache of GET responses with a time to live
+    per endpoint. Pass one to a client to serve repeated reads of slow-changing
+    endpoints without a round trip to the broker ::
+
+        >>> api = AdminAPI(url, auth, cache=ResponseCache())
+        >>> api.overview()   # fetched from the broker
+        >>> api.overview()   # served from the cache for the next 5 seconds
+
+    Only endpoints with a TTL are cached; see :attr:`DEFAULT_TTLS`. Every
+    PUT, POST or DELETE sent through the client invalidates the cached
+    responses it may have changed, so a read following a write never returns
+    stale data.
+
+    Cached responses are shared between callers and must not be modified.
+    """
+
+    #: Seconds to cache each endpoint for. An endpoint also covers the paths
+    #: below it, so ``/api/vhosts`` covers ``/api/vhosts/my-vhost`` too.
+    DEFAULT_TTLS = {
+        '/api/overview': 5,
+        '/api/cluster-name': 300,
+        '/api/nodes': 5,
+        '/api/extensions': 300,
+        '/api/whoami': 60,
+        '/api/vhosts': 30,
+    }
+
+    #: The collections whose cached responses are invalidated by a write to
+    #: a collection, in addition to the collection itself. ``None`` clears
+    #: everything.
+    RELATED_COLLECTIONS = {
+        'vhosts': None,
+        'definitions': None,
+        'users': ('permissions', 'whoami'),
+        'permissions': ('users', 'vhosts'),
+        'policies': ('queues', 'exchanges'),
+        'connections': ('channels', 'consumers'),
+        'exchanges': ('bindings',),
+        'queues': ('bindings', 'consumers'),
+        'bindings': ('exchanges', 'queues'),
+    }
+
+    #: Collections that summarise the others, invalidated by every write
+    SUMMARY_COLLECTIONS = ('overview', 'definitions')
+
+    def __init__(self, maxsize=256, ttls=None, clock=time.time):
+        """
+        :param maxsize: The maximum number of responses to keep. The least
+            recently used response is evicted to make room for a new one.
+        :type maxsize: int
+
+        :param ttls: Seconds to cache each endpoint for. These are merged
+            over :attr:`DEFAULT_TTLS`; set an endpoint to ``0`` or ``None`` to
+            stop caching it.
+        :type ttls: dict
+
+        :param clock: A function returning the current time in seconds
+        """
+        self.maxsize = maxsize
+        self.ttls = dict(self.DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl_for(self, path):
+        """
+        The number of seconds to cache the response of ``path`` for, or
+        ``None`` if it should not be cached.
+
+        :param path: The API path, e.g. ``/api/vhosts/my-vhost``
+        :type path: str
+        """
+        path = path.rstrip('/')
+        while path:
+            if path in self.ttls:
+                return self.ttls[path] or None
+            path = path.rpartition('/')[0]
+        return None
+
+    @staticmethod
+    def key(url, params=None, transform=None):
+        """
+        The cache key for a request to ``url`` with query string ``params``.
+        Responses are cached after ``transform`` has been applied to them, so
+        the same request with another transform, such as records instead of
+        dicts, is cached separately.
+        """
+        return url, tuple(sorted((params or {}).items())), transform
+
+    @property
+    def generation(self):
+        """
+        A number that changes every time responses are invalidated. Take it
+        before fetching a response and pass it to :meth:`set`, so that a
+        response fetched before a write is not stored after it.
+        """
+        return self._generation
+
+    def get(self, key):
+        """
+        :returns: A tuple of whether ``key`` was found, and its response
+        :rtype: tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+
+            self._entries[key] = self._entries.pop(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key, response, ttl, generation=None):
+        """
+        Stores ``response`` under ``key`` for ``ttl`` seconds, unless responses
+        were invalidated since ``generation`` was taken.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + ttl, response)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, url, path):
+        """
+        Drops every cached response that a write to ``path`` may have changed.
+
+        :param url: The base url of the API that was written to
+        :type url: str
+
+        :param path: The API path that was written to, e.g.
+            ``/api/vhosts/my-vhost``
+        :type path: str
+        """
+        collection = _collection(path)
+        related = self.RELATED_COLLECTIONS.get(collection, ())
+        if related is None:
+            collections = None
+        else:
+            collections = set(related)
+            collections.add(collection)
+            collections.update(self.SUMMARY_COLLECTIONS)
+
+        base = url.rstrip('/') + '/'
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                if not key[0].startswith(base):
+                    continue
+                if collections is None or _collection(key[0][len(base) - 1:]) in collections:
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def clear(self):
+        """
+        Drops every cached response
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """
+        :returns: The number of hits, misses, evictions and invalidations so
+            far, and the current number of cached responses
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+            }
+
+
+def _collection(path):
+    """
+    The collection a path belongs to, e.g. ``vhosts`` for
+    ``/api/vhosts/my-vhost``
+    """
+    parts = path.split('?', 1)[0].split('/')
+    return parts[2] if len(parts) > 2 and parts[1] == 'api' else ''
@@ -0,0 +1,233 @@
+"""
+The ``rabbitmq-admin`` command. Every subcommand is an
+:class:`rabbitmq_admin.api.AdminAPI` method, named with dashes ::
+
+    $ rabbitmq-admin list-queues --columns name,messages
+    $ rabbitmq-admin list-queues --vhost a --vhost b --parallel 4
+    $ rabbitmq-admin get-queue-for-vhost orders /
+    $ rabbitmq-admin create-vhost tenant tracing=true
+    $ rabbitmq-admin is-vhost-alive --all-vhosts --parallel 16
+
+Positional arguments are passed to the method as strings, and
+``name=value`` arguments as keyword arguments, decoded as JSON when they
+are valid JSON. Results are written as JSON lines: one line per item of a
+list, written as soon as the item has been decoded, or one line for any
+other result.
+
+The client and :mod:`requests` are only imported once the arguments have
+been parsed, so that ``--help`` and usage errors return at once.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+
+#: The method name prefixes that can be run as subcommands
+COMMAND_PREFIXES = ('list_', 'get_', 'create_', 'delete_', 'purge_', 'check_', 'is_')
+
+#: Methods without one of :data:`COMMAND_PREFIXES` that can be run too
+COMMANDS = ('overview', 'whoami')
+
+_KEYWORD = re.compile(r'^([A-Za-z_]\w*)=(.*)$', re.DOTALL)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='rabbitmq-admin',
+        description='Call the RabbitMQ management HTTP API and write the results as JSON lines.',
+        epilog='Commands are AdminAPI methods named with dashes, e.g. list-queues, '
+               'get-vhost, create-user or check-alarms.')
+    parser.add_argument(
+        '--url', action='append',
+        help='The management API url. Repeat it for the nodes of a cluster. '
+             'Defaults to $RABBITMQ_ADMIN_URL or http://localhost:15672.')
+    parser.add_argument(
+        '--user', default=os.environ.get('RABBITMQ_ADMIN_USER', 'guest'),
+        help='Defaults to $RABBITMQ_ADMIN_USER or guest')
+    parser.add_argument(
+        '--password', default=os.environ.get('RABBITMQ_ADMIN_PASSWORD', 'guest'),
+        help='Defaults to $RABBITMQ_ADMIN_PASSWORD or guest')
+    parser.add_argument(
+        '--timeout', type=float, help='Seconds to wait for a connection and for each read')
+    parser.add_argument(
+        '--columns', help='Only include these comma-separated fields, e.g. name,messages')
+    parser.add_argument(
+        '--vhost', action='append', dest='vhosts',
+        help='Run the command for this vhost. Repeat it to run it for several vhosts; '
+             'list commands use their *_for_vhost variant.')
+    parser.add_argument(
+        '--all-vhosts', action='store_true', help='Run the command for every vhost')
+    parser.add_argument(
+        '--parallel', type=int, default=1,
+        help='The number of vhosts to run the command for at once (default 1)')
+    parser.add_argument('command', help='e.g. list-queues')
+    parser.add_argument('arguments', nargs='*', help='Arguments, positional or name=value')
+    return parser
+
+
+def _parse_arguments(arguments):
+    """
+    Splits command line arguments into positional arguments and keyword
+    arguments
+    """
+    args = []
+    kwargs = {}
+    for argument in arguments:
+        match = _KEYWORD.match(argument)
+        if match is None:
+            args.append(argument)
+            continue
+        name, value = match.groups()
+        try:
+            kwargs[name] = json.loads(value)
+        except ValueError:
+            kwargs[name] = value
+    return args, kwargs
+
+
+def _parameters(method):
+    """
+    The names of the parameters of a method, without ``self``
+    """
+    code = method.__code__
+    return code.co_varnames[1:code.co_argcount]
+
+
+class _Writer(object):
+    """
+    Writes JSON lines to a binary stream from any thread, flushing each
+    one so that it is read as soon as it is written
+    """
+
+    def __init__(self, stream, dumps):
+        self.stream = stream
+        self.dumps = dumps
+        self.lock = threading.Lock()
+
+    def write(self, item):
+        line = self.dumps(item)
+        if not isinstance(line, bytes):
+            line = line.encode('utf-8')
+        with self.lock:
+            self.stream.write(line + b'\n')
+            self.stream.flush()
+
+
+class _Command(object):
+    """
+    An :class:`rabbitmq_admin.api.AdminAPI` method with its arguments,
+    looked up on the class so that it can be checked before a client is
+    created
+    """
+
+    def __init__(self, cls, name, args, kwargs, columns=None):
+        self.name = name
+        self.method = getattr(cls, name)
+        parameters = _parameters(self.method)
+        self.streams = 'stream' in parameters
+        self.args = args
+        self.kwargs = dict(kwargs)
+        if columns and 'columns' in parameters:
+            self.kwargs['columns'] = columns.split(',')
+        if self.streams:
+            self.kwargs['stream'] = True
+
+        # list_queues --vhost a runs list_queues_for_vhost('a')
+        self.for_vhost = getattr(cls, name + '_for_vhost', None)
+        if self.for_vhost is None and 'vhost' in parameters:
+            self.for_vhost = self.method
+
+    def run(self, api, write, vhost=None):
+        if vhost is None:
+            result = self.method(api, *self.args, **self.kwargs)
+        else:
+            result = self.for_vhost(api, *self.args, vhost=vhost, **self.kwargs)
+            if not self.streams and result is not None:
+                result = {'vhost': vhost, 'result': result}
+        if self.streams:
+            for item in result:
+                write(item)
+        elif result is not None:
+            write(result)
+
+
+def _run_for_vhosts(command, api, vhosts, parallel, write, error):
+    """
+    Runs ``command`` for every vhost, ``parallel`` at a time, and returns
+    the number of vhosts it failed for
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(vhost):
+        try:
+            command.run(api, write, vhost)
+        except Exception as exception:
+            error('{0} failed for vhost {1}: {2}'.format(command.name, vhost, exception))
+            return 1
+        return 0
+
+    executor = ThreadPoolExecutor(max_workers=max(parallel, 1))
+    try:
+        return sum(executor.map(run, vhosts))
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _client(options):
+    from rabbitmq_admin.api import AdminAPI
+
+    urls = options.url or [os.environ.get('RABBITMQ_ADMIN_URL', 'http://localhost:15672')]
+    kwargs = {'pool_maxsize': max(options.parallel, 10)}
+    if options.timeout is not None:
+        kwargs['timeout'] = options.timeout
+    return AdminAPI(urls if len(urls) > 1 else urls[0], (options.user, options.password), **kwargs)
+
+
+def main(argv=None):
+    """
+    Runs the ``rabbitmq-admin`` command
+
+    :param argv: The command line arguments, without the program name.
+        Defaults to :data:`sys.argv`.
+    :type argv: list of str
+
+    :returns: The exit status: 0 on success, or 1 if a call failed. Usage
+        errors exit with status 2.
+    :rtype: int
+    """
+    parser = _parser()
+    options = parser.parse_args(argv)
+    name = options.command.replace('-', '_')
+    if not (name.startswith(COMMAND_PREFIXES) or name in COMMANDS):
+        parser.error('unknown command {0!r}'.format(options.command))
+
+    from rabbitmq_admin.api import AdminAPI
+
+    if not hasattr(AdminAPI, name):
+        parser.error('unknown command {0!r}'.format(options.command))
+    args, kwargs = _parse_arguments(options.arguments)
+    command = _Command(AdminAPI, name, args, kwargs, options.columns)
+    if (options.vhosts or options.all_vhosts) and command.for_vhost is None:
+        parser.error('{0} does not take a vhost'.format(options.command))
+
+    def error(message):
+        sys.stderr.write('rabbitmq-admin: {0}\n'.format(message))
+
+    api = _client(options)
+    writer = _Writer(getattr(sys.stdout, 'buffer', sys.stdout), api.codec.dumps)
+    try:
+        if options.all_vhosts:
+            options.vhosts = [vhost['name'] for vhost in api.list_vhosts(columns=['name'])]
+        if options.vhosts:
+            return 1 if _run_for_vhosts(
+                command, api, options.vhosts, options.parallel, writer.write, error) else 0
+        command.run(api, writer.write)
+    except Exception as exception:
+        error('{0} failed: {1}'.format(options.command, exception))
+        return 1
+    finally:
+        sys.stdout.flush()
+        api.close()
+    return 0
@@ -0,0 +1,231 @@
+"""
+Spreads a client's requests over the nodes of a RabbitMQ cluster. Any node
+serves the whole management API, so reads go to whichever healthy node has
+the fewest requests in flight, while writes stay on one preferred node.
+"""
+import threading
+import time
+
+import requests
+
+from rabbitmq_admin.deadline import DeadlineExceeded
+
+
+class Node(object):
+    """
+    One management API endpoint of the cluster, and its health
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        #: The number of requests currently in flight
+        self.outstanding = 0
+        #: The number of consecutive failed requests
+        self.failures = 0
+        #: When an ejected node may be tried again, or ``None`` while healthy
+        self.ejected_until = None
+
+    def __repr__(self):
+        return '<Node {0}>'.format(self.url)
+
+    def ejected(self, now):
+        """
+        ``True`` while the node is out of rotation
+        """
+        return self.ejected_until is not None and now < self.ejected_until
+
+    def usable(self, now):
+        """
+        ``True`` if the node can take a request. A node whose ejection has
+        expired is probed with a single request before it takes more.
+        """
+        if self.ejected_until is None:
+            return True
+        return not self.ejected(now) and self.outstanding == 0
+
+
+class PartialResponseError(requests.ConnectionError):
+    """
+    Raised when the connection fails after part of a response body has
+    been handed on, such as to the file of
+    :meth:`rabbitmq_admin.api.AdminAPI.export_definitions`. Sending the
+    request again would repeat that part, so it is never retried on another
+    node.
+    """
+
+
+def _node_failed(error):
+    """
+    ``True`` if ``error`` means the node itself is unhealthy: it could not be
+    reached, timed out or answered with a server error
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    if isinstance(error, DeadlineExceeded):
+        return False
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def _can_retry(error, read):
+    """
+    ``True`` if the request can be sent again to another node. Reads are
+    retried after any node failure, writes only when the connection failed,
+    as a timed out or failed write may still have been applied.
+    """
+    if isinstance(error, PartialResponseError):
+        return False
+    if read:
+        return _node_failed(error)
+    return isinstance(error, requests.ConnectionError)
+
+
+class NodePool(object):
+    """
+    A thread-safe set of cluster nodes with least-outstanding-requests
+    balancing and health-based failover ::
+
+        >>> api = AdminAPI(['http://rabbit-1:15672', 'http://rabbit-2:15672'], auth)
+
+    Nodes that time out, cannot be reached or answer with a 5xx status are
+    ejected for ``eject_for`` seconds, doubling with every consecutive
+    failure up to ``max_eject_for``. Once that time is up the node is probed
+    with a single request and rejoins the rotation if it succeeds. A request
+    that failed because of its node is sent again to another one.
+
+    Writes always go to the first healthy node in the order given, so that
+    they are applied in the order they were sent.
+    """
+
+    def __init__(self, urls, eject_for=5, max_eject_for=60, clock=time.time):
+        """
+        :param urls: The management API urls of the nodes, preferred node
+            first
+        :type urls: list of str
+
+        :param eject_for: The number of seconds a failed node is left out
+        :type eject_for: float
+
+        :param max_eject_for: The longest a node is left out after repeated
+            failures
+        :type max_eject_for: float
+
+        :param clock: A function returning the current time in seconds
+        """
+        if not urls:
+            raise ValueError('At least one node url is required')
+        self.nodes = [Node(url) for url in urls]
+        self.eject_for = eject_for
+        self.max_eject_for = max_eject_for
+        self._clock = clock
+        self._turn = 0
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self):
+        return [node.url for node in self.nodes]
+
+    def add(self, url):
+        """
+        Adds a node to the end of the pool, unless it is already in it
+        """
+        url = url.rstrip('/')
+        with self._lock:
+            if url not in [node.url for node in self.nodes]:
+                self.nodes = self.nodes + [Node(url)]
+
+    def acquire(self, read=True, exclude=()):
+        """
+        Picks the node for the next request and counts it as in flight until
+        :meth:`release` is called. If every node is ejected, the one that
+        will be back soonest is returned rather than failing without trying.
+
+        :param read: ``False`` to get the preferred node for a write
+        :type read: bool
+
+        :param exclude: Nodes that already failed this request
+        :type exclude: collection of :class:`Node`
+
+        :rtype: Node
+        """
+        with self._lock:
+            now = self._clock()
+            remaining = [node for node in self.nodes if node not in exclude]
+            candidates = [node for node in remaining if node.usable(now)]
+            if not candidates:
+                node = min(remaining, key=lambda node: node.ejected_until)
+            elif read:
+                node = self._least_outstanding(candidates)
+            else:
+                node = candidates[0]
+            node.outstanding += 1
+            return node
+
+    def _least_outstanding(self, candidates):
+        # Start at a different node every time, so that idle nodes share the
+        # load in turn instead of the first one taking it all
+        self._turn = (self._turn + 1) % len(self.nodes)
+        start = self._turn % len(candidates)
+        ordered = candidates[start:] + candidates[:start]
+        return min(ordered, key=lambda node: node.outstanding)
+
+    def release(self, node, failed=False):
+        """
+        Records the outcome of a request sent to ``node``.
+
+        :param failed: ``True`` if the node failed the request, which ejects
+            it
+        :type failed: bool
+        """
+        with self._lock:
+            now = self._clock()
+            node.outstanding -= 1
+            if failed:
+                node.failures += 1
+                backoff = self.eject_for * 2 ** (node.failures - 1)
+                node.ejected_until = now + min(backoff, self.max_eject_for)
+            elif not node.ejected(now):
+                node.failures = 0
+                node.ejected_until = None
+
+    def call(self, func, read=True):
+        """
+        Calls ``func(node)`` on a node picked by :meth:`acquire`, moving on
+        to the next node when the request can be retried.
+
+        :param func: Sends the request to the given node
+        :type func: callable
+
+        :param read: ``False`` for a write
+        :type read: bool
+        """
+        tried = []
+        while True:
+            node = self.acquire(read=read, exclude=tried)
+            try:
+                result = func(node)
+            except Exception as error:
+                self.release(node, failed=_node_failed(error))
+                tried.append(node)
+                if len(tried) == len(self.nodes) or not _can_retry(error, read):
+                    raise
+                continue
+            self.release(node)
+            return result
+
+    def stats(self):
+        """
+        :returns: The url, requests in flight, consecutive failures and
+            whether it is ejected, for every node
+        :rtype: list of dict
+        """
+        with self._lock:
+            now = self._clock()
+            return [
+                {
+                    'url': node.url,
+                    'outstanding': node.outstanding,
+                    'failures': node.failures,
+                    'ejected': node.ejected(now),
+                }
+                for node in self.nodes
+            ]
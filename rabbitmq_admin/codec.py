@@ -0,0 +1,71 @@
+"""
+JSON codecs for request and response bodies. :func:`default_codec` picks
+`orjson`_ when it is installed, which decodes large responses such as
+``list_bindings`` or ``get_definitions`` several times faster than the
+standard library, and falls back to :mod:`json` otherwise.
+
+A codec is any object with ``dumps(obj)``, returning ``str`` or ``bytes``,
+and ``loads(data)``, accepting the raw ``bytes`` of a response body. Pass one
+to a client with ``codec=`` to override the default.
+
+.. _orjson: https://github.com/ijl/orjson
+"""
+import json
+import sys
+
+import six
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# json.loads only accepts bytes from Python 3.6 on
+_DECODE_BYTES = six.PY3 and sys.version_info < (3, 6)
+
+
+class JSONCodec(object):
+    """
+    The standard library :mod:`json` module
+    """
+
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj)
+
+    def loads(self, data):
+        if _DECODE_BYTES and isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class OrjsonCodec(object):
+    """
+    `orjson`_, which encodes straight to UTF-8 ``bytes`` and decodes from
+    ``bytes`` without an intermediate ``str``
+
+    .. _orjson: https://github.com/ijl/orjson
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('orjson is not installed')
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def default_codec():
+    """
+    :returns: An :class:`OrjsonCodec` if orjson is installed, otherwise a
+        :class:`JSONCodec`
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    return JSONCodec()
@@ -0,0 +1,191 @@
+"""
+Streams byte chunks to and from optionally compressed files, a chunk at a
+time, so that documents such as a cluster's definitions never have to be held
+in memory as a whole.
+"""
+import bz2
+import contextlib
+import os
+import sys
+import tempfile
+import zlib
+
+import six
+
+#: The supported values of ``compress``
+COMPRESSIONS = (None, 'gzip', 'bz2')
+
+# The leading bytes of each compressed format
+_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'))
+
+# zlib window bits for the gzip container
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class _Identity(object):
+
+    eof = True
+
+    def compress(self, data):
+        return data
+
+    decompress = compress
+
+    def flush(self):
+        return b''
+
+
+def _check(compress):
+    if compress not in COMPRESSIONS:
+        raise ValueError('compress must be one of {0}, not {1!r}'.format(
+            ', '.join(repr(name) for name in COMPRESSIONS), compress))
+
+
+def compressor(compress):
+    """
+    :returns: An object with ``compress(data)`` and ``flush()`` for the
+        format ``compress``
+    """
+    _check(compress)
+    if compress == 'gzip':
+        return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, _GZIP_WBITS)
+    if compress == 'bz2':
+        return bz2.BZ2Compressor()
+    return _Identity()
+
+
+def decompressor(compress):
+    """
+    :returns: An object with ``decompress(data)`` for the format ``compress``
+    """
+    _check(compress)
+    if compress == 'gzip':
+        return zlib.decompressobj(_GZIP_WBITS)
+    if compress == 'bz2':
+        return bz2.BZ2Decompressor()
+    return _Identity()
+
+
+def detect(head):
+    """
+    :returns: The compression of a file starting with the bytes ``head``, or
+        ``None`` if it is not compressed
+    """
+    for magic, compress in _MAGIC:
+        if head.startswith(magic):
+            return compress
+    return None
+
+
+@contextlib.contextmanager
+def _opened(path_or_fileobj, mode):
+    """
+    Opens a path, or uses a file object as is. Only files opened here are
+    closed.
+    """
+    if isinstance(path_or_fileobj, six.string_types):
+        with open(path_or_fileobj, mode) as fileobj:
+            yield fileobj
+    else:
+        yield path_or_fileobj
+
+
+# os.replace only exists from Python 3.3 on
+_replace = getattr(os, 'replace', os.rename)
+
+
+@contextlib.contextmanager
+def _replaced(path):
+    """
+    Opens a temporary file next to ``path``, which replaces ``path`` only
+    once the block succeeds, so that a failure never leaves a partial file
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as fileobj:
+            yield fileobj
+        _replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+class ChunkWriter(object):
+    """
+    Compresses chunks and writes them to a file ::
+
+        >>> with ChunkWriter('definitions.json.gz', 'gzip') as writer:
+        ...     for chunk in chunks:
+        ...         writer.write(chunk)
+    """
+
+    def __init__(self, path_or_fileobj, compress=None):
+        """
+        :param path_or_fileobj: The path of the file to create, or a binary
+            file object to write to, which is left open. A path is only
+            written to if the block succeeds.
+        :type path_or_fileobj: str or file
+
+        :param compress: ``'gzip'``, ``'bz2'`` or ``None``
+        :type compress: str
+        """
+        self._compressor = compressor(compress)
+        if isinstance(path_or_fileobj, six.string_types):
+            self._opened = _replaced(path_or_fileobj)
+        else:
+            self._opened = _opened(path_or_fileobj, 'wb')
+        self._file = None
+        #: The number of bytes written, before compression
+        self.size = 0
+
+    def __enter__(self):
+        self._file = self._opened.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            try:
+                self._file.write(self._compressor.flush())
+                self._file.flush()
+            except BaseException:
+                # A file that could not be finished is not kept either
+                if not self._opened.__exit__(*sys.exc_info()):
+                    raise
+                return
+        self._opened.__exit__(exc_type, exc_value, traceback)
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        data = self._compressor.compress(chunk)
+        if data:
+            self._file.write(data)
+
+
+def read_chunks(path_or_fileobj, compress='auto', chunk_size=64 * 1024):
+    """
+    Yields the decompressed contents of a file in chunks.
+
+    :param path_or_fileobj: The path of the file, or a binary file object to
+        read from its current position, which is left open
+    :type path_or_fileobj: str or file
+
+    :param compress: ``'gzip'``, ``'bz2'`` or ``None``, or ``'auto'`` to
+        detect it from the first bytes of the file
+    :type compress: str
+
+    :param chunk_size: The number of bytes read at a time
+    :type chunk_size: int
+    """
+    with _opened(path_or_fileobj, 'rb') as fileobj:
+        chunk = fileobj.read(chunk_size)
+        if compress == 'auto':
+            compress = detect(chunk)
+        decompress = decompressor(compress)
+        while chunk:
+            data = decompress.decompress(chunk)
+            if data:
+                yield data
+            chunk = fileobj.read(chunk_size)
+        if not getattr(decompress, 'eof', True):
+            raise ValueError('The {0} file is truncated'.format(compress))
@@ -0,0 +1,68 @@
+"""
+Time budgets that span several requests. See
+:meth:`rabbitmq_admin.base.Resource.deadline`.
+"""
+import timeit
+
+import requests
+
+
+class DeadlineExceeded(requests.Timeout):
+    """
+    Raised instead of sending a request once the deadline it runs under has
+    passed
+    """
+
+
+class Deadline(object):
+    """
+    A point in time that requests must complete by
+    """
+
+    def __init__(self, seconds, clock=timeit.default_timer):
+        """
+        :param seconds: The time budget, from now
+        :type seconds: float
+        """
+        self.seconds = seconds
+        self._clock = clock
+        #: When the deadline passes, on the ``clock`` timeline
+        self.expires_at = clock() + seconds
+
+    def __repr__(self):
+        return '<Deadline {0:.3f}s left>'.format(self.remaining())
+
+    def remaining(self):
+        """
+        The seconds left, which are negative once the deadline has passed
+        """
+        return self.expires_at - self._clock()
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        """
+        :returns: The seconds left
+        :raises DeadlineExceeded: If the deadline has passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(
+                'Deadline of {0}s exceeded by {1:.3f}s'.format(self.seconds, -remaining))
+        return remaining
+
+    def cap(self, timeout):
+        """
+        Shortens a requests ``timeout``, a number or a ``(connect, read)``
+        tuple, so that no wait outlasts the deadline
+
+        :raises DeadlineExceeded: If the deadline has passed
+        """
+        remaining = self.check()
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
@@ -0,0 +1,333 @@
+"""
+Compares two sets of server definitions, as returned by
+:meth:`rabbitmq_admin.api.AdminAPI.get_definitions`, and turns the difference
+into the individual calls that make the server match the desired set.
+"""
+import json
+
+from rabbitmq_admin.bulk import Operation
+
+
+def _tags(user):
+    tags = user.get('tags') or []
+    if not isinstance(tags, list):
+        tags = tags.split(',')
+    return sorted(tag.strip() for tag in tags if tag.strip())
+
+
+def _arguments(item):
+    return json.dumps(item.get('arguments') or {}, sort_keys=True)
+
+
+class Kind(object):
+    """
+    How one kind of definition is identified and compared
+    """
+
+    def __init__(self, name, key, fields, defaults=None):
+        self.name = name
+        self.key = key
+        self.fields = fields
+        self.defaults = defaults or {}
+
+    def value(self, item, field):
+        if field == 'tags':
+            return _tags(item)
+        return item.get(field, self.defaults.get(field))
+
+    def differs(self, current, desired):
+        """
+        ``True`` if ``desired`` sets a field to something else than
+        ``current``. Fields without a default that ``desired`` leaves out,
+        such as a user's password hash, are kept as they are.
+        """
+        return any(
+            self.value(current, field) != self.value(desired, field)
+            for field in self.fields
+            if field in desired or field in self.defaults
+        )
+
+    def index(self, items):
+        return dict((self.key(item), item) for item in items if not self.builtin(item))
+
+    def builtin(self, item):
+        """
+        ``True`` for objects the server creates itself, which are never
+        created or deleted
+        """
+        if self.name == 'exchanges':
+            return item['name'] == '' or item['name'].startswith('amq.')
+        if self.name == 'bindings':
+            return item['source'] == ''
+        return False
+
+
+#: The kinds of definitions that are reconciled, in the order they are created
+KINDS = (
+    Kind('vhosts', lambda v: v['name'], ('tracing',), {'tracing': False}),
+    Kind('users', lambda u: u['name'], ('password_hash', 'tags')),
+    Kind('permissions', lambda p: (p['vhost'], p['user']), ('configure', 'write', 'read')),
+    Kind('policies', lambda p: (p['vhost'], p['name']),
+         ('pattern', 'definition', 'priority', 'apply-to'), {'priority': 0, 'apply-to': 'all'}),
+    Kind('exchanges', lambda e: (e['vhost'], e['name']),
+         ('type', 'durable', 'auto_delete', 'internal', 'arguments'),
+         {'durable': True, 'auto_delete': False, 'internal': False, 'arguments': {}}),
+    Kind('queues', lambda q: (q['vhost'], q['name']),
+         ('durable', 'auto_delete', 'arguments'),
+         {'durable': True, 'auto_delete': False, 'arguments': {}}),
+    Kind('bindings', lambda b: (
+        b['vhost'], b['source'], b['destination'], b['destination_type'],
+        b.get('routing_key', ''), _arguments(b)), ()),
+)
+
+KINDS_BY_NAME = dict((kind.name, kind) for kind in KINDS)
+
+#: Kinds that cannot be changed in place, only deleted and created again
+IMMUTABLE_KINDS = ('exchanges', 'queues')
+
+
+class DefinitionsDiff(object):
+    """
+    The difference between the current and the desired definitions. For each
+    kind (``vhosts``, ``users``, ``permissions``, ``policies``, ``exchanges``,
+    ``queues`` and ``bindings``) it lists the definitions to add, the ones to
+    remove and the ``(current, desired)`` pairs that differ.
+    """
+
+    def __init__(self):
+        self.added = dict((kind.name, []) for kind in KINDS)
+        self.removed = dict((kind.name, []) for kind in KINDS)
+        self.changed = dict((kind.name, []) for kind in KINDS)
+        #: The results of applying the diff, once it has been applied
+        self.report = None
+
+    def __bool__(self):
+        return any(
+            self.added[kind.name] or self.removed[kind.name] or self.changed[kind.name]
+            for kind in KINDS
+        )
+
+    __nonzero__ = __bool__
+
+    def summary(self):
+        """
+        :returns: The number of definitions added, removed and changed per kind
+        :rtype: dict
+        """
+        return dict(
+            (kind.name, {
+                'added': len(self.added[kind.name]),
+                'removed': len(self.removed[kind.name]),
+                'changed': len(self.changed[kind.name]),
+            })
+            for kind in KINDS
+        )
+
+
+def diff_definitions(current, desired):
+    """
+    Compares two sets of definitions. Objects that only exist in ``current``
+    are listed as removed. Other kinds of definitions, such as parameters,
+    are not compared.
+
+    :param current: The definitions on the server
+    :type current: dict
+
+    :param desired: The definitions the server should have
+    :type desired: dict
+
+    :rtype: DefinitionsDiff
+    """
+    diff = DefinitionsDiff()
+    for kind in KINDS:
+        existing = kind.index(current.get(kind.name) or [])
+        wanted = kind.index(desired.get(kind.name) or [])
+        for key in sorted(wanted, key=repr):
+            if key not in existing:
+                diff.added[kind.name].append(wanted[key])
+            elif kind.differs(existing[key], wanted[key]):
+                diff.changed[kind.name].append((existing[key], wanted[key]))
+        for key in sorted(existing, key=repr):
+            if key not in wanted:
+                diff.removed[kind.name].append(existing[key])
+    return diff
+
+
+def _body(kind, item):
+    return dict((field, item[field]) for field in KINDS_BY_NAME[kind].fields if field in item)
+
+
+def _binds(binding, kind, item):
+    """
+    ``True`` if ``binding`` has the exchange or queue ``item`` as its source
+    or destination
+    """
+    if binding['vhost'] != item['vhost'] or binding['source'] == '':
+        return False
+    if kind == 'exchanges' and binding['source'] == item['name']:
+        return True
+    return binding['destination_type'] == kind[:-1] and binding['destination'] == item['name']
+
+
+def _create(kind, item):
+    if kind == 'vhosts':
+        return Operation('create_vhost', item['name'], tracing=bool(item.get('tracing')))
+    if kind == 'users':
+        kwargs = {'password_hash': item.get('password_hash', ''), 'tags': _tags(item)}
+        if item.get('hashing_algorithm'):
+            kwargs['hashing_algorithm'] = item['hashing_algorithm']
+        return Operation('create_user', item['name'], '', **kwargs)
+    if kind == 'permissions':
+        return Operation(
+            'create_user_permission', item['user'], item['vhost'],
+            configure=item['configure'], write=item['write'], read=item['read'])
+    if kind == 'policies':
+        return Operation(
+            'create_policy_for_vhost', item['vhost'], item['name'], item['definition'],
+            pattern=item['pattern'], priority=item.get('priority', 0),
+            apply_to=item.get('apply-to', 'all'))
+    if kind in IMMUTABLE_KINDS:
+        method = 'create_exchange_for_vhost' if kind == 'exchanges' else 'create_queue_for_vhost'
+        return Operation(method, item['name'], item['vhost'], _body(kind, item))
+    return Operation(
+        'create_binding', item['vhost'], item['source'], item['destination'],
+        destination_type=item['destination_type'],
+        routing_key=item.get('routing_key', ''), arguments=item.get('arguments'))
+
+
+def _merge(kind, current, desired):
+    """
+    The object to write to change ``current`` into ``desired``. Objects are
+    written whole, so fields that ``desired`` leaves out and that have no
+    default, such as a user's password hash, are kept from ``current``.
+    """
+    defaults = KINDS_BY_NAME[kind].defaults
+    item = dict(
+        (field, value) for field, value in current.items() if field not in defaults)
+    item.update(desired)
+    return item
+
+
+def _delete(kind, item):
+    if kind == 'vhosts':
+        return Operation('delete_vhost', item['name'])
+    if kind == 'users':
+        return Operation('delete_user', item['name'])
+    if kind == 'permissions':
+        return Operation('delete_user_permission', item['user'], item['vhost'])
+    if kind == 'policies':
+        return Operation('delete_policy_for_vhost', item['vhost'], item['name'])
+    if kind == 'exchanges':
+        return Operation('delete_exchange_for_vhost', item['name'], item['vhost'])
+    if kind == 'queues':
+        return Operation('delete_queue_for_vhost', item['name'], item['vhost'])
+    return Operation(
+        'delete_binding', item['vhost'], item['source'], item['destination'],
+        item['properties_key'], destination_type=item['destination_type'])
+
+
+class _Planner(object):
+    """
+    Turns a diff into the smallest list of calls that applies it
+    """
+
+    def __init__(self, api, diff, desired, delete, recreate):
+        self.api = api
+        self.diff = diff
+        self.desired = desired
+        self.delete = delete
+        self.recreate = recreate
+        self._properties_keys = {}
+
+        # Objects that are deleted along with a vhost, user, exchange or queue
+        # that is being deleted need no call of their own
+        self.removed_parents = set()
+        if delete:
+            self.removed_parents.update(
+                ('vhost', item['name']) for item in diff.removed['vhosts'])
+            self.removed_parents.update(
+                ('user', item['name']) for item in diff.removed['users'])
+            self.removed_parents.update(
+                ('exchange', item['vhost'], item['name']) for item in diff.removed['exchanges'])
+            self.removed_parents.update(
+                ('queue', item['vhost'], item['name']) for item in diff.removed['queues'])
+
+    def operations(self):
+        operations = []
+        for kind in KINDS:
+            for item in self.diff.added[kind.name]:
+                operations.append(_create(kind.name, item))
+            for current, desired in self.diff.changed[kind.name]:
+                operations.extend(self.change(kind.name, current, desired))
+            if self.delete:
+                for item in self.diff.removed[kind.name]:
+                    if not self.removed_with_parent(item):
+                        operations.extend(self.remove(kind.name, item))
+        return operations
+
+    def change(self, kind, current, desired):
+        if kind not in IMMUTABLE_KINDS:
+            return [_create(kind, _merge(kind, current, desired))]
+        if not self.recreate:
+            return []
+
+        # Deleting the object also deletes its bindings, which have to be
+        # created again along with it
+        bindings = [
+            binding for binding in self.desired.get('bindings') or []
+            if _binds(binding, kind, desired)
+        ]
+        return [_delete(kind, current), _create(kind, desired)] + [
+            _create('bindings', binding) for binding in bindings]
+
+    def removed_with_parent(self, item):
+        """
+        ``True`` if ``item`` goes away anyway with an object that is being
+        deleted
+        """
+        parents = [('vhost', item.get('vhost')), ('user', item.get('user'))]
+        if 'destination_type' in item:
+            parents.append(('exchange', item['vhost'], item['source']))
+            parents.append((item['destination_type'], item['vhost'], item['destination']))
+        return any(parent in self.removed_parents for parent in parents)
+
+    def remove(self, kind, item):
+        if kind == 'bindings':
+            properties_key = self.properties_key(item)
+            if properties_key is None:
+                return []
+            item = dict(item, properties_key=properties_key)
+        return [_delete(kind, item)]
+
+    def properties_key(self, binding):
+        """
+        Bindings are deleted by their ``properties_key``, which definitions
+        do not include, so it is looked up in the bindings of the vhost.
+        ``None`` if the binding has been deleted since the definitions were
+        exported.
+        """
+        vhost = binding['vhost']
+        if vhost not in self._properties_keys:
+            self._properties_keys[vhost] = dict(
+                (KINDS_BY_NAME['bindings'].key(item), item['properties_key'])
+                for item in self.api.list_bindings_for_vhost(vhost)
+            )
+        return self._properties_keys[vhost].get(KINDS_BY_NAME['bindings'].key(binding))
+
+
+def plan_definitions(api, diff, desired, delete=False, recreate=False):
+    """
+    The calls that apply ``diff``, for :meth:`rabbitmq_admin.api.AdminAPI.bulk_apply`,
+    which keeps them in dependency order.
+
+    :param delete: Set to ``True`` to delete objects that are not in the
+        desired definitions
+    :type delete: bool
+
+    :param recreate: Set to ``True`` to delete and create again exchanges and
+        queues whose properties changed. Recreating a queue loses its messages.
+    :type recreate: bool
+
+    :rtype: list of :class:`rabbitmq_admin.bulk.Operation`
+    """
+    return _Planner(api, diff, desired, delete, recreate).operations()
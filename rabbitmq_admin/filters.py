@@ -0,0 +1,128 @@
+"""
+Criteria for selecting objects, compiled once into a predicate and the list
+of columns the predicate needs, so that the server only sends those fields.
+"""
+import re
+import time
+
+import six
+
+
+def _dotted(item, column):
+    """
+    The value of a column such as ``recv_oct_details.rate`` in an item
+    """
+    for key in column.split('.'):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def _one_of(values):
+    if isinstance(values, six.string_types):
+        return frozenset([values])
+    return frozenset(values)
+
+
+class ConnectionFilter(object):
+    """
+    Selects connections matching every given criterion ::
+
+        >>> selected = ConnectionFilter(user='app', client_properties={'product': 'pika'})
+        >>> [connection for connection in api.iter_connections(columns=selected.columns)
+        ...  if selected(connection)]
+
+    The criteria are compiled once into a list of checks, and :attr:`columns`
+    lists only the fields those checks read.
+    """
+
+    #: Always requested, to identify the connections
+    BASE_COLUMNS = ('name', 'vhost', 'user')
+
+    def __init__(self, user=None, vhost=None, name=None, client_properties=None, idle=False,
+                 connected_for=None, min_channels=None, max_channels=None, clock=time.time):
+        """
+        :param user: Only select connections of this user, or of any of
+            these users
+        :type user: str or list of str
+
+        :param vhost: Only select connections to this vhost, or to any of
+            these vhosts
+        :type vhost: str or list of str
+
+        :param name: A regular expression the connection name must contain a
+            match of
+        :type name: str
+
+        :param client_properties: Regular expressions that client properties
+            must contain a match of, by property, e.g.
+            ``{'connection_name': '^billing-'}``
+        :type client_properties: dict
+
+        :param idle: Set to ``True`` to only select connections that sent and
+            received nothing over the server's rate sampling window. The
+            management API does not report how long a connection has been
+            idle, so combine this with ``connected_for``.
+        :type idle: bool
+
+        :param connected_for: Only select connections that have been open for
+            at least this many seconds
+        :type connected_for: float
+
+        :param min_channels: Only select connections with at least this many
+            channels
+        :type min_channels: int
+
+        :param max_channels: Only select connections with at most this many
+            channels
+        :type max_channels: int
+        """
+        self.name = name
+        columns = list(self.BASE_COLUMNS)
+        checks = []
+
+        if user is not None:
+            users = _one_of(user)
+            checks.append(lambda item: item.get('user') in users)
+        if vhost is not None:
+            vhosts = _one_of(vhost)
+            checks.append(lambda item: item.get('vhost') in vhosts)
+        if name is not None:
+            checks.append(self._matches('name', re.compile(name)))
+        for key, pattern in sorted((client_properties or {}).items()):
+            column = 'client_properties.' + key
+            columns.append(column)
+            checks.append(self._matches(column, re.compile(pattern)))
+        if idle:
+            rates = ['recv_oct_details.rate', 'send_oct_details.rate']
+            columns.extend(rates)
+            checks.append(lambda item: not any(_dotted(item, rate) for rate in rates))
+        if connected_for is not None:
+            columns.append('connected_at')
+            checks.append(
+                lambda item: (item.get('connected_at') or 0) <= (clock() - connected_for) * 1000)
+        if min_channels is not None or max_channels is not None:
+            columns.append('channels')
+            low = min_channels if min_channels is not None else 0
+            high = max_channels if max_channels is not None else float('inf')
+            checks.append(lambda item: low <= (item.get('channels') or 0) <= high)
+
+        #: The fields the checks read
+        self.columns = columns
+        #: ``False`` when a check needs message statistics such as rates
+        self.disable_stats = not idle
+        self._checks = checks
+
+    @staticmethod
+    def _matches(column, regex):
+        def check(item):
+            value = _dotted(item, column)
+            return isinstance(value, six.string_types) and regex.search(value) is not None
+        return check
+
+    def __call__(self, connection):
+        for check in self._checks:
+            if not check(connection):
+                return False
+        return True
@@ -0,0 +1,220 @@
+"""
+Checks the health of a whole cluster at once: the aliveness of every vhost
+and the health checks of every node, run concurrently over a bounded pool
+of worker threads.
+"""
+import timeit
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from rabbitmq_admin.bulk import Operation
+
+#: Checks that look at the whole cluster, run once
+CLUSTER_CHECKS = (
+    Operation('check_alarms'),
+)
+
+#: Checks that look at the node that answers them, run on every node
+NODE_CHECKS = (
+    Operation('check_local_alarms'),
+    Operation('check_certificate_expiration', 1, 'months'),
+    Operation('check_node_is_quorum_critical'),
+    Operation('check_virtual_hosts'),
+)
+
+
+def _check_name(operation):
+    """
+    The name of a check in a report, e.g. ``port_listener/5672``
+    """
+    name = operation.method
+    if name.startswith('check_'):
+        name = name[len('check_'):]
+    return '/'.join([name] + [str(arg) for arg in operation.args])
+
+
+class HealthCheckResult(object):
+    """
+    The outcome of one health check
+    """
+
+    def __init__(self, scope, target, check, ok, reason=None, error=None, latency=None):
+        #: ``'vhost'``, ``'node'`` or ``'cluster'``
+        self.scope = scope
+        #: The vhost name or node url checked, or the client url for checks
+        #: of the whole cluster
+        self.target = target
+        #: The name of the check, e.g. ``aliveness`` or ``local_alarms``
+        self.check = check
+        #: ``True`` if the check passed
+        self.ok = ok
+        #: Why the check failed, as given by the server or by the error
+        self.reason = reason
+        #: The exception raised if the check could not be run
+        self.error = error
+        #: Seconds the check took
+        self.latency = latency
+
+    def __repr__(self):
+        outcome = 'ok' if self.ok else 'failed: {0}'.format(self.reason)
+        return '<HealthCheckResult {0} {1} {2} {3}>'.format(
+            self.scope, self.target, self.check, outcome)
+
+    def as_dict(self):
+        return {
+            'ok': self.ok,
+            'reason': self.reason,
+            'latency': self.latency,
+        }
+
+
+class HealthReport(object):
+    """
+    The results of a health sweep, vhosts first, then cluster checks, then
+    node checks
+    """
+
+    def __init__(self, results, elapsed=None):
+        self.results = results
+        #: Seconds the whole sweep took
+        self.elapsed = elapsed
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    @property
+    def ok(self):
+        """
+        ``True`` if every check passed
+        """
+        return all(result.ok for result in self.results)
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+    def summary(self):
+        """
+        :returns: The number of checks that passed and failed, and the
+            number of failures by check
+        :rtype: dict
+        """
+        failed = self.failed
+        return {
+            'passed': len(self.results) - len(failed),
+            'failed': len(failed),
+            'checks': dict(Counter(result.check for result in failed)),
+        }
+
+    def as_dict(self):
+        """
+        :returns: The whole report, with results grouped by scope, target
+            and check ::
+
+                {'ok': False, 'elapsed': 0.2,
+                 'vhosts': {'/': {'aliveness': {'ok': True, ...}}},
+                 'cluster': {'alarms': {'ok': True, ...}},
+                 'nodes': {'http://rabbit-1:15672': {'local_alarms': {...}}}}
+        :rtype: dict
+        """
+        report = {'ok': self.ok, 'elapsed': self.elapsed, 'vhosts': {}, 'cluster': {}, 'nodes': {}}
+        for result in self.results:
+            if result.scope == 'cluster':
+                checks = report['cluster']
+            else:
+                checks = report[result.scope + 's'].setdefault(result.target, {})
+            checks[result.check] = result.as_dict()
+        return report
+
+
+class _Sweep(object):
+
+    def __init__(self, api, timeout):
+        self.api = api
+        self.timeout = timeout
+        # Workers send their requests with the caller, timeout and deadline
+        # of the calling thread
+        self.context = api.capture_context()
+
+    def check(self, scope, target, name, operation, node=None):
+        api = self.api
+        start = timeit.default_timer()
+        try:
+            with api.restore_context(self.context), api.deadline(self.timeout):
+                if node is None:
+                    response = operation(api)
+                else:
+                    with api.pinned(node):
+                        response = operation(api)
+        except Exception as error:
+            return HealthCheckResult(
+                scope, target, name, False, reason=str(error) or type(error).__name__,
+                error=error, latency=timeit.default_timer() - start)
+        ok = response.get('status') == 'ok'
+        return HealthCheckResult(
+            scope, target, name, ok, reason=None if ok else response.get('reason'),
+            latency=timeit.default_timer() - start)
+
+
+def health_sweep(api, vhosts=None, nodes=None, cluster_checks=CLUSTER_CHECKS,
+                 node_checks=NODE_CHECKS, max_workers=16, timeout=10):
+    """
+    Runs the aliveness test of every vhost, ``cluster_checks`` once and
+    ``node_checks`` on every node, with at most ``max_workers`` running at
+    once. Each check is given ``timeout`` seconds, retries included, so a
+    sweep takes about as long as its slowest check when there are enough
+    workers.
+
+    :param api: The client to run the checks with
+    :type api: rabbitmq_admin.api.AdminAPI
+
+    :param vhosts: The vhosts to test. Defaults to every vhost; pass an empty
+        list to test none.
+    :type vhosts: list of str
+
+    :param nodes: The management API urls of the nodes to check. Defaults to
+        the client's :attr:`rabbitmq_admin.base.Resource.nodes`, or its url.
+    :type nodes: list of str
+
+    :param cluster_checks: The checks of the whole cluster
+    :type cluster_checks: list of :class:`rabbitmq_admin.bulk.Operation`
+
+    :param node_checks: The checks run on every node, e.g. add
+        ``Operation('check_port_listener', 5672)``
+    :type node_checks: list of :class:`rabbitmq_admin.bulk.Operation`
+
+    :param max_workers: The maximum number of concurrent checks
+    :type max_workers: int
+
+    :param timeout: The seconds each check may take
+    :type timeout: float
+
+    :rtype: HealthReport
+    """
+    start = timeit.default_timer()
+    if vhosts is None:
+        vhosts = [vhost['name'] for vhost in api.list_vhosts(columns=['name'])]
+    if nodes is None:
+        nodes = api.nodes.urls if api.nodes is not None else [api.url]
+
+    checks = [('vhost', vhost, 'aliveness', Operation('is_vhost_alive', vhost), None)
+              for vhost in vhosts]
+    checks.extend(('cluster', api.url, _check_name(operation), operation, None)
+                  for operation in cluster_checks)
+    checks.extend(('node', node, _check_name(operation), operation, node)
+                  for node in nodes for operation in node_checks)
+
+    sweep = _Sweep(api, timeout)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(sweep.check, *check) for check in checks]
+        results = [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True)
+    return HealthReport(results, elapsed=timeit.default_timer() - start)
@@ -0,0 +1,264 @@
+"""
+Request instrumentation. Every request sent by a client with ``hooks`` is
+described by a :class:`RequestEvent` that is passed to each hook once the
+response has been read. :class:`MetricsCollector` is a ready-made hook that
+aggregates events into Prometheus metrics.
+"""
+import bisect
+import logging
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+class RequestEvent(object):
+    """
+    One request to the management API
+    """
+
+    def __init__(self, method, endpoint, path, caller=None):
+        #: The HTTP method
+        self.method = method
+        #: The endpoint template, e.g. ``/api/exchanges/{vhost}/{exchange}``
+        self.endpoint = endpoint
+        #: The path that was requested, without the query string
+        self.path = path
+        #: The caller the request is attributed to, see
+        #: :meth:`rabbitmq_admin.base.Resource.caller`
+        self.caller = caller
+        #: The url the request was last sent to
+        self.url = None
+        #: The response status, or ``None`` if no response was received
+        self.status = None
+        #: The number of bytes in the response body
+        self.bytes = 0
+        #: Seconds from sending the request until the response was read and
+        #: decoded; for streamed responses, until the stream was exhausted
+        self.latency = None
+        #: Seconds spent decoding the response body
+        self.decode_time = 0.0
+        #: The exception the request raised, if any
+        self.error = None
+        #: The number of times the request was sent again, see
+        #: :class:`rabbitmq_admin.retry.RetryPolicy`
+        self.retries = 0
+        #: Seconds spent waiting for the
+        #: :class:`rabbitmq_admin.ratelimit.Governor`, or ``None`` if the
+        #: client has none
+        self.queue_wait = None
+
+    def __repr__(self):
+        return '<RequestEvent {0} {1} {2}>'.format(self.method, self.endpoint, self.status)
+
+    @property
+    def outcome(self):
+        """
+        The response status as a string, or the name of the exception raised
+        when no response was received
+        """
+        if self.status is not None:
+            return str(self.status)
+        if self.error is not None:
+            return type(self.error).__name__
+        return ''
+
+
+def emit(hooks, event):
+    """
+    Passes ``event`` to every hook. A failing hook is logged and does not
+    affect the request or the other hooks.
+    """
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            logger.exception('Request hook %r failed', hook)
+
+
+class _Histogram(object):
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, buckets, value):
+        self.counts[bisect.bisect_left(buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    return '{' + ','.join('{0}="{1}"'.format(name, _escape(value)) for name, value in pairs) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class MetricsCollector(object):
+    """
+    A request hook that keeps per-endpoint request counts, and histograms of
+    latency and response size, and renders them in the Prometheus text
+    exposition format ::
+
+        >>> metrics = MetricsCollector()
+        >>> api = AdminAPI(url, auth, hooks=[metrics])
+        >>> with api.caller('billing'):
+        ...     api.list_queues()
+        >>> print(metrics.render())
+
+    Metrics are labelled with the method, endpoint template and caller, and
+    request counts also with the response status.
+    """
+
+    #: Latency histogram buckets, in seconds
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    #: Response size histogram buckets, in bytes
+    SIZE_BUCKETS = tuple(256 * 4 ** power for power in range(10))
+
+    LABELS = ('method', 'endpoint', 'caller')
+
+    def __init__(self, prefix='rabbitmq_admin', latency_buckets=None, size_buckets=None):
+        """
+        :param prefix: The prefix of every metric name
+        :type prefix: str
+
+        :param latency_buckets: The upper bounds of the latency histogram
+            buckets, in seconds
+        :type latency_buckets: tuple of float
+
+        :param size_buckets: The upper bounds of the response size histogram
+            buckets, in bytes
+        :type size_buckets: tuple of int
+        """
+        self.prefix = prefix
+        self.latency_buckets = tuple(sorted(latency_buckets or self.LATENCY_BUCKETS))
+        self.size_buckets = tuple(sorted(size_buckets or self.SIZE_BUCKETS))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears every metric
+        """
+        with self._lock:
+            self._requests = defaultdict(int)
+            self._decode_time = defaultdict(float)
+            self._retries = defaultdict(int)
+            self._latency = {}
+            self._size = {}
+            self._queue_wait = {}
+
+    def __call__(self, event):
+        key = (event.method, event.endpoint, event.caller or '')
+        with self._lock:
+            self._requests[key + (event.outcome,)] += 1
+            self._decode_time[key] += event.decode_time
+            if event.retries:
+                self._retries[key] += event.retries
+            if key not in self._latency:
+                self._latency[key] = _Histogram(self.latency_buckets)
+                self._size[key] = _Histogram(self.size_buckets)
+            self._latency[key].observe(self.latency_buckets, event.latency or 0.0)
+            self._size[key].observe(self.size_buckets, event.bytes)
+            if event.queue_wait is not None:
+                if key not in self._queue_wait:
+                    self._queue_wait[key] = _Histogram(self.latency_buckets)
+                self._queue_wait[key].observe(self.latency_buckets, event.queue_wait)
+
+    def snapshot(self):
+        """
+        :returns: Per ``(method, endpoint, caller)``, the number of requests,
+            and their total latency, decode time, retries, response bytes and
+            seconds spent waiting for the governor
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(
+                (key, {
+                    'requests': self._latency[key].count,
+                    'latency': self._latency[key].sum,
+                    'decode_time': self._decode_time[key],
+                    'retries': self._retries.get(key, 0),
+                    'bytes': int(self._size[key].sum),
+                    'queue_wait': (
+                        self._queue_wait[key].sum if key in self._queue_wait else 0.0),
+                })
+                for key in self._latency
+            )
+
+    def render(self):
+        """
+        :returns: Every metric in the Prometheus text exposition format
+        :rtype: str
+        """
+        name = self._name
+        with self._lock:
+            lines = [
+                '# HELP {0} Requests sent to the management API.'.format(name('requests_total')),
+                '# TYPE {0} counter'.format(name('requests_total')),
+            ]
+            for key, count in sorted(self._requests.items()):
+                lines.append('{0}{1} {2}'.format(
+                    name('requests_total'), _labels(self.LABELS + ('status',), key), count))
+
+            lines.extend([
+                '# HELP {0} Seconds spent decoding responses.'.format(
+                    name('decode_seconds_total')),
+                '# TYPE {0} counter'.format(name('decode_seconds_total')),
+            ])
+            for key, seconds in sorted(self._decode_time.items()):
+                lines.append('{0}{1} {2!r}'.format(
+                    name('decode_seconds_total'), _labels(self.LABELS, key), seconds))
+
+            lines.extend([
+                '# HELP {0} Requests sent again after a transient failure.'.format(
+                    name('retries_total')),
+                '# TYPE {0} counter'.format(name('retries_total')),
+            ])
+            for key, count in sorted(self._retries.items()):
+                lines.append('{0}{1} {2}'.format(
+                    name('retries_total'), _labels(self.LABELS, key), count))
+
+            lines.extend(self._render_histogram(
+                name('request_duration_seconds'), 'Request latency in seconds.',
+                self._latency, self.latency_buckets))
+            lines.extend(self._render_histogram(
+                name('response_size_bytes'), 'Response body size in bytes.',
+                self._size, self.size_buckets))
+            if self._queue_wait:
+                lines.extend(self._render_histogram(
+                    name('queue_wait_seconds'),
+                    'Seconds requests waited for the concurrency and rate limits.',
+                    self._queue_wait, self.latency_buckets))
+        return '\n'.join(lines) + '\n'
+
+    def _name(self, metric):
+        return '{0}_{1}'.format(self.prefix, metric)
+
+    def _render_histogram(self, name, help_text, histograms, buckets):
+        lines = [
+            '# HELP {0} {1}'.format(name, help_text),
+            '# TYPE {0} histogram'.format(name),
+        ]
+        for key, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                lines.append('{0}_bucket{1} {2}'.format(
+                    name, _labels(self.LABELS, key, [('le', _format_bound(bound))]), cumulative))
+            lines.append('{0}_sum{1} {2!r}'.format(
+                name, _labels(self.LABELS, key), float(histogram.sum)))
+            lines.append('{0}_count{1} {2}'.format(
+                name, _labels(self.LABELS, key), cumulative))
+        return lines
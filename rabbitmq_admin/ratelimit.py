@@ -0,0 +1,200 @@
+"""
+Limits on how fast and how many requests a client sends. :class:`Governor`
+shares them across every thread using a client, and lets urgent requests
+such as health checks go ahead of listings and writes.
+"""
+import heapq
+import threading
+import time
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket. Every :meth:`acquire` takes one token, waiting
+    until one is available; tokens are added at ``rate`` per second, and up to
+    ``burst`` of them can be saved up while the limiter is idle.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.time, sleep=time.sleep):
+        """
+        :param rate: The number of tokens added per second
+        :type rate: float
+
+        :param burst: The maximum number of tokens that can be saved up
+        :type burst: int
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Takes a token, possibly ahead of time, and returns how long to wait
+        before using it
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """
+        Waits until a token is available and takes it.
+
+        :returns: The number of seconds spent waiting
+        :rtype: float
+        """
+        delay = self._reserve()
+        if delay:
+            self._sleep(delay)
+        return delay
+
+
+#: Priority classes, most urgent first
+HIGH, NORMAL, LOW = 0, 1, 2
+
+#: Endpoints that answer whether the broker is healthy
+HEALTH_ENDPOINTS = frozenset([
+    '/api/overview',
+    '/api/aliveness-test/{vhost}',
+    '/api/whoami',
+    '/api/cluster-name',
+])
+
+#: Endpoints that list whole collections, which are the most expensive for
+#: the server
+LIST_ENDPOINTS = frozenset([
+    '/api/bindings', '/api/bindings/{vhost}', '/api/channels', '/api/connections',
+    '/api/connections/{name}/channels', '/api/consumers', '/api/consumers/{vhost}',
+    '/api/definitions', '/api/exchanges', '/api/exchanges/{vhost}', '/api/extensions',
+    '/api/nodes', '/api/permissions', '/api/policies', '/api/policies/{vhost}', '/api/queues',
+    '/api/queues/{vhost}', '/api/users', '/api/users/{name}/permissions', '/api/vhosts',
+])
+
+
+def classify(method, endpoint):
+    """
+    The default priority of a request: :data:`HIGH` for health checks,
+    :data:`LOW` for listings and writes, and :data:`NORMAL` for reads of
+    single objects
+    """
+    if endpoint in HEALTH_ENDPOINTS or endpoint.startswith('/api/health/'):
+        return HIGH
+    if method != 'GET' or endpoint in LIST_ENDPOINTS:
+        return LOW
+    return NORMAL
+
+
+class Governor(object):
+    """
+    Caps the requests a client has in flight at once, and optionally their
+    rate, across every thread that shares the client ::
+
+        >>> api = AdminAPI(url, auth, governor=Governor(max_concurrent=4, rate=20))
+
+    Requests wait for a free slot in order of priority, then of arrival, so
+    that health checks go ahead of listings and writes that are queued
+    before them. See :func:`classify`, and
+    :meth:`rabbitmq_admin.base.Resource.priority` to set the priority of
+    some calls.
+    """
+
+    def __init__(self, max_concurrent=4, rate=None, burst=1, classify=classify,
+                 clock=time.time, sleep=time.sleep):
+        """
+        :param max_concurrent: The most requests in flight at once
+        :type max_concurrent: int
+
+        :param rate: The most requests sent per second, or ``None`` for no
+            limit
+        :type rate: float
+
+        :param burst: The requests that can be sent at once after the
+            client has been idle, see :class:`RateLimiter`
+        :type burst: int
+
+        :param classify: Returns the priority of a request from its method
+            and endpoint template
+        :type classify: callable
+        """
+        if max_concurrent < 1:
+            raise ValueError('max_concurrent must be at least 1')
+        self.max_concurrent = max_concurrent
+        self.classify = classify
+        self.limiter = RateLimiter(rate, burst, clock=clock, sleep=sleep) if rate else None
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._arrivals = 0
+        self._active = 0
+        self._granted = 0
+        self._waited = 0.0
+
+    def acquire(self, priority=NORMAL, deadline=None):
+        """
+        Waits for a slot, and a token if the rate is limited. Every call
+        must be followed by :meth:`release`.
+
+        :param deadline: Stop waiting once it passes
+        :type deadline: rabbitmq_admin.deadline.Deadline
+
+        :returns: The seconds spent waiting
+        :rtype: float
+
+        :raises rabbitmq_admin.deadline.DeadlineExceeded: If the deadline
+            passed while waiting, in which case no slot is held
+        """
+        start = self._clock()
+        with self._condition:
+            self._arrivals += 1
+            ticket = (priority, self._arrivals)
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while self._waiting[0] != ticket or self._active >= self.max_concurrent:
+                    self._condition.wait(deadline.check() if deadline is not None else None)
+            except Exception:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self._active += 1
+            # The next waiter may fit in another free slot
+            self._condition.notify_all()
+        if self.limiter is not None:
+            self.limiter.acquire()
+        waited = self._clock() - start
+        with self._condition:
+            self._granted += 1
+            self._waited += waited
+        return waited
+
+    def release(self):
+        """
+        Frees the slot taken by :meth:`acquire`
+        """
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        :returns: The requests in flight and waiting, and the number of
+            slots granted and the total seconds waited for them
+        :rtype: dict
+        """
+        with self._condition:
+            return {
+                'active': self._active,
+                'waiting': len(self._waiting),
+                'granted': self._granted,
+                'waited': self._waited,
+            }
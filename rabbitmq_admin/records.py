@@ -0,0 +1,190 @@
+"""
+Compact record types for the items of large list results, returned by the
+``list_*`` methods when they are called with ``as_records=True``.
+
+A record keeps the scalar fields that are used most, such as ``name`` or
+``state``, in ``__slots__``. Every other field, including nested structures
+such as ``message_stats`` or ``client_properties``, is kept as a single
+encoded JSON string and only decoded the first time one of them is read.
+This typically takes a fraction of the memory of the equivalent dict.
+
+Example ::
+
+    >>> channels = api.list_channels(as_records=True)
+    >>> channels[0].name, channels[0].prefetch_count
+    >>> channels[0].connection_details['peer_host']  # decoded on first access
+"""
+from rabbitmq_admin.codec import default_codec
+
+_codec = default_codec()
+
+_MISSING = object()
+
+
+def _slot(record, field):
+    """
+    The value of an unpacked field, without falling back to the other fields
+    """
+    try:
+        return object.__getattribute__(record, field)
+    except AttributeError:
+        return _MISSING
+
+
+def _pack(fields):
+    """
+    Encodes fields to text. orjson over-allocates the ``bytes`` it returns,
+    so they are copied to a string of the exact size.
+    """
+    packed = _codec.dumps(fields)
+    if isinstance(packed, bytes):
+        packed = packed.decode('utf-8')
+    return packed
+
+
+class Record(object):
+    """
+    The base class of records. Fields can be read as attributes or, like a
+    dict, by key.
+    """
+
+    __slots__ = ('_extra', '_decoded')
+
+    #: The scalar fields kept unpacked, each in a slot
+    FIELDS = ()
+    _fields = frozenset()
+
+    def __init__(self, item):
+        """
+        :param item: An item of a list result
+        :type item: dict
+        """
+        extra = {}
+        fields = self._fields
+        for key, value in item.items():
+            if key in fields and not isinstance(value, (dict, list)):
+                setattr(self, key, value)
+            else:
+                extra[key] = value
+        self._extra = _pack(extra) if extra else None
+        self._decoded = None
+
+    @classmethod
+    def convert(cls, document):
+        """
+        Converts a list result, or a single item of one, to records
+        """
+        if isinstance(document, list):
+            return [cls(item) for item in document]
+        return cls(document)
+
+    @property
+    def extra(self):
+        """
+        The fields that are not unpacked, decoded on first access
+        """
+        if self._decoded is None:
+            self._decoded = _codec.loads(self._extra) if self._extra is not None else {}
+            self._extra = None
+        return self._decoded
+
+    def __getattr__(self, name):
+        # Only called for fields that are not set in a slot
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.extra[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def get(self, key, default=None):
+        if key in self._fields:
+            value = _slot(self, key)
+            if value is not _MISSING:
+                return value
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def as_dict(self):
+        """
+        The item as a plain dict, as it would be returned without
+        ``as_records``
+        """
+        item = dict(self.extra)
+        for field in self.FIELDS:
+            value = _slot(self, field)
+            if value is not _MISSING:
+                item[field] = value
+        return item
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(type(self).__name__, self.get('name'))
+
+
+def _record_type(name, fields, doc):
+    """
+    Creates a :class:`Record` subclass with a slot for every field
+    """
+    fields = tuple(fields)
+    return type(name, (Record,), {
+        '__doc__': doc,
+        '__slots__': fields,
+        'FIELDS': fields,
+        '_fields': frozenset(fields),
+    })
+
+
+Connection = _record_type('Connection', (
+    'name', 'vhost', 'user', 'node', 'state', 'type', 'protocol', 'channels', 'channel_max',
+    'frame_max', 'timeout', 'host', 'port', 'peer_host', 'peer_port', 'ssl', 'auth_mechanism',
+    'connected_at', 'recv_oct', 'recv_cnt', 'send_oct', 'send_cnt', 'send_pend',
+), 'A connection, see :meth:`rabbitmq_admin.api.AdminAPI.list_connections`')
+
+Channel = _record_type('Channel', (
+    'name', 'number', 'vhost', 'user', 'node', 'state', 'consumer_count', 'prefetch_count',
+    'global_prefetch_count', 'messages_unacknowledged', 'messages_unconfirmed',
+    'messages_uncommitted', 'acks_uncommitted', 'confirm', 'transactional', 'idle_since',
+), 'A channel, see :meth:`rabbitmq_admin.api.AdminAPI.list_channels`')
+
+Exchange = _record_type('Exchange', (
+    'name', 'vhost', 'type', 'durable', 'auto_delete', 'internal', 'user_who_performed_action',
+), 'An exchange, see :meth:`rabbitmq_admin.api.AdminAPI.list_exchanges`')
+
+Queue = _record_type('Queue', (
+    'name', 'vhost', 'type', 'node', 'state', 'durable', 'auto_delete', 'exclusive',
+    'consumers', 'messages', 'messages_ready', 'messages_unacknowledged', 'memory',
+    'idle_since', 'policy',
+), 'A queue, see :meth:`rabbitmq_admin.api.AdminAPI.list_queues`')
+
+Binding = _record_type('Binding', (
+    'source', 'vhost', 'destination', 'destination_type', 'routing_key', 'properties_key',
+), 'A binding, see :meth:`rabbitmq_admin.api.AdminAPI.list_bindings`')
+
+Consumer = _record_type('Consumer', (
+    'consumer_tag', 'exclusive', 'ack_required', 'prefetch_count', 'active', 'activity_status',
+), 'A consumer, see :meth:`rabbitmq_admin.api.AdminAPI.list_consumers`')
+
+User = _record_type('User', (
+    'name', 'password_hash', 'hashing_algorithm', 'tags',
+), 'A user, see :meth:`rabbitmq_admin.api.AdminAPI.list_users`')
+
+Vhost = _record_type('Vhost', (
+    'name', 'tracing', 'description', 'default_queue_type', 'messages', 'messages_ready',
+    'messages_unacknowledged', 'recv_oct', 'send_oct',
+), 'A vhost, see :meth:`rabbitmq_admin.api.AdminAPI.list_vhosts`')
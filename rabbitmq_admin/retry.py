@@ -0,0 +1,234 @@
+"""
+Retries of requests that failed for a transient reason, and per-endpoint
+circuit breakers that stop sending requests to a broker that keeps failing.
+Pass them to a client with ``retry`` and ``breaker`` ::
+
+    >>> api = AdminAPI(url, auth, retry=RetryPolicy(), breaker=CircuitBreaker())
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from rabbitmq_admin.cluster import _node_failed
+from rabbitmq_admin.deadline import DeadlineExceeded
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of sending a request while the circuit of its endpoint is
+    open
+    """
+
+    def __init__(self, endpoint, retry_after):
+        super(CircuitOpenError, self).__init__(
+            'Circuit open for {0}, retry in {1:.1f}s'.format(endpoint, retry_after))
+        #: The endpoint template whose circuit is open
+        self.endpoint = endpoint
+        #: Seconds until a request will be let through again
+        self.retry_after = retry_after
+
+
+def _transient_status(response, messages):
+    """
+    ``True`` if an error response says the server is only briefly unable to
+    answer, such as a management plugin whose stats database is not ready
+    """
+    if response.status_code in (502, 503, 504):
+        return True
+    if response.status_code != 500 or not messages:
+        return False
+    text = (response.content or b'').decode('utf-8', 'replace').lower()
+    return any(message in text for message in messages)
+
+
+class RetryPolicy(object):
+    """
+    Retries requests that could not connect, timed out, or were answered
+    with a 502, 503 or 504, or a 500 that says the server is not ready.
+
+    Only idempotent methods are retried by default. Waits grow exponentially
+    from ``backoff`` up to ``max_backoff`` seconds, and each is picked at
+    random below that bound ("full jitter"), so that clients failing at the
+    same time do not all retry at the same time.
+    """
+
+    #: Substrings of 500 responses that mean the server is not ready yet
+    NOT_READY_MESSAGES = ('not ready', 'not_ready', 'stats_not_available')
+
+    def __init__(self, attempts=3, backoff=0.5, max_backoff=10.0,
+                 methods=('GET', 'PUT', 'DELETE'), not_ready_messages=NOT_READY_MESSAGES,
+                 random=random.random, sleep=time.sleep):
+        """
+        :param attempts: The most times a request is sent, including the
+            first one
+        :type attempts: int
+
+        :param backoff: The longest wait before the first retry, in seconds
+        :type backoff: float
+
+        :param max_backoff: The longest wait before any retry, in seconds
+        :type max_backoff: float
+
+        :param methods: The methods that are retried. Add ``'POST'`` to
+            retry requests that may not be idempotent.
+        :type methods: collection of str
+
+        :param not_ready_messages: Substrings of the body of 500 responses
+            that are retried
+        :type not_ready_messages: collection of str
+        """
+        if attempts < 1:
+            raise ValueError('attempts must be at least 1')
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.methods = frozenset(method.upper() for method in methods)
+        self.not_ready_messages = tuple(message.lower() for message in not_ready_messages)
+        self.random = random
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._retries = defaultdict(int)
+        self._exhausted = defaultdict(int)
+
+    def retryable(self, method, error):
+        """
+        ``True`` if a request that raised ``error`` can be sent again
+        """
+        if method not in self.methods or isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+            return False
+        if isinstance(error, requests.HTTPError):
+            return error.response is not None and _transient_status(
+                error.response, self.not_ready_messages)
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+    def delay(self, attempt):
+        """
+        The seconds to wait after ``attempt`` failed, counting from 1
+        """
+        bound = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return self.random() * bound
+
+    def next_delay(self, method, endpoint, error, attempt):
+        """
+        Counts the failure of ``attempt`` and returns how long to wait before
+        the next one, or ``None`` if the error should be raised
+        """
+        if not self.retryable(method, error):
+            return None
+        with self._lock:
+            if attempt >= self.attempts:
+                self._exhausted[(method, endpoint)] += 1
+                return None
+            self._retries[(method, endpoint)] += 1
+        return self.delay(attempt)
+
+    def counters(self):
+        """
+        :returns: Per ``(method, endpoint)``, the number of retries and of
+            requests that still failed after the last attempt
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(
+                (key, {'retries': self._retries[key], 'exhausted': self._exhausted[key]})
+                for key in set(self._retries) | set(self._exhausted)
+            )
+
+
+class _Circuit(object):
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_until = None
+        self.probing = False
+        self.trips = 0
+        self.rejected = 0
+
+
+class CircuitBreaker(object):
+    """
+    A thread-safe circuit per endpoint template. After ``threshold``
+    consecutive failures the circuit opens and requests to the endpoint
+    raise :class:`CircuitOpenError` without being sent, for ``reset_after``
+    seconds. Then a single request is let through: if it succeeds the
+    circuit closes, otherwise it opens again.
+
+    Failures are the same as those that eject a cluster node: the server
+    could not be reached, timed out or answered with a 5xx status.
+    """
+
+    def __init__(self, threshold=5, reset_after=30.0, clock=time.time):
+        """
+        :param threshold: The consecutive failures that open a circuit
+        :type threshold: int
+
+        :param reset_after: The seconds a circuit stays open
+        :type reset_after: float
+
+        :param clock: A function returning the current time in seconds
+        """
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._circuits = defaultdict(_Circuit)
+
+    def before(self, endpoint):
+        """
+        Lets a request to ``endpoint`` through, or raises
+        :class:`CircuitOpenError`
+        """
+        with self._lock:
+            circuit = self._circuits[endpoint]
+            if circuit.opened_until is None:
+                return
+            now = self._clock()
+            if now < circuit.opened_until or circuit.probing:
+                circuit.rejected += 1
+                raise CircuitOpenError(endpoint, max(circuit.opened_until - now, 0.0))
+            circuit.probing = True
+
+    def record(self, endpoint, error=None):
+        """
+        Records the outcome of a request that :meth:`before` let through
+        """
+        failed = error is not None and _node_failed(error)
+        with self._lock:
+            circuit = self._circuits[endpoint]
+            circuit.probing = False
+            if not failed:
+                circuit.failures = 0
+                circuit.opened_until = None
+                return
+            circuit.failures += 1
+            if circuit.opened_until is not None or circuit.failures >= self.threshold:
+                circuit.trips += 1
+                circuit.opened_until = self._clock() + self.reset_after
+
+    def release(self, endpoint):
+        """
+        Gives back a request that :meth:`before` let through but that was
+        never sent, without changing the circuit of ``endpoint``
+        """
+        with self._lock:
+            self._circuits[endpoint].probing = False
+
+    def counters(self):
+        """
+        :returns: Per endpoint, how many times its circuit opened, how many
+            requests it rejected, and whether it is open now
+        :rtype: dict
+        """
+        with self._lock:
+            now = self._clock()
+            return dict(
+                (endpoint, {
+                    'trips': circuit.trips,
+                    'rejected': circuit.rejected,
+                    'open': circuit.opened_until is not None and now < circuit.opened_until,
+                })
+                for endpoint, circuit in self._circuits.items()
+            )
@@ -0,0 +1,244 @@
+import re
+
+from rabbitmq_admin.codec import JSONCodec
+
+_WHITESPACE = re.compile(br'[ \t\n\r]*')
+
+# A string, from its opening quote
+_STRING = re.compile(br'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+# Everything inside an array or object up to its next bracket, skipping
+# whole strings
+_CONTENT = re.compile(br'(?:[^"\[\]{}]+|"(?:[^"\\]|\\.)*")*', re.DOTALL)
+
+# The end of a number, true, false or null
+_SCALAR_END = re.compile(br'[ \t\n\r,\]]')
+
+
+class JSONArrayDecoder(object):
+    """
+    Incrementally decodes a JSON array, one item at a time. Feed it chunks of
+    the document as they arrive and it returns every item that has been
+    completed so far. Only the item currently being received is buffered, so
+    memory use is bounded by the largest item rather than the whole array.
+
+    Items are decoded with ``loads``, such as the ``loads`` of the client's
+    :mod:`codec <rabbitmq_admin.codec>`: the complete items of each chunk
+    with a single call where possible, or one at a time otherwise.
+
+    Example ::
+
+        >>> decoder = JSONArrayDecoder()
+        >>> decoder.feed(b'[{"name": "a"}, {"na')
+        [{'name': 'a'}]
+        >>> decoder.feed(b'me": "b"}]')
+        [{'name': 'b'}]
+        >>> decoder.close()
+        []
+    """
+
+    # What the decoder expects next
+    _OPEN, _FIRST_ITEM, _ITEM, _SEPARATOR, _DONE = range(5)
+
+    #: The number of places to try to cut a batch of items at, before
+    #: falling back to decoding one item at a time
+    BATCH_ATTEMPTS = 3
+
+    def __init__(self, loads=None):
+        """
+        :param loads: Decodes JSON from its UTF-8 bytes. Defaults to
+            :meth:`rabbitmq_admin.codec.JSONCodec.loads`.
+        :type loads: callable
+        """
+        self._loads = loads or JSONCodec().loads
+        self._buffer = b''
+        self._state = self._OPEN
+        # How far into the buffered item has been scanned, and how deeply
+        # nested it is there
+        self._scanned = 0
+        self._depth = 0
+
+    @property
+    def done(self):
+        """
+        ``True`` once the closing bracket of the array has been decoded
+        """
+        return self._state == self._DONE
+
+    def feed(self, chunk):
+        """
+        Adds the next chunk of the document.
+
+        :param chunk: The next bytes of the document
+        :type chunk: bytes
+
+        :returns: The items completed by this chunk
+        :rtype: list
+        """
+        self._buffer += chunk
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Signals the end of the document.
+
+        :returns: Any items that were waiting for the end of the document
+        :rtype: list
+
+        :raises ValueError: If the document is not a complete JSON array
+        """
+        items = self._parse(final=True)
+        if not self.done:
+            raise ValueError('Incomplete JSON array')
+        return items
+
+    def _parse(self, final):
+        items = []
+        buffer = self._buffer
+        pos = 0
+        batch = True
+        while self._state != self._DONE:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+
+            if self._state == self._ITEM or (
+                    self._state == self._FIRST_ITEM and buffer[pos:pos + 1] != b']'):
+                end = self._parse_batch(buffer, pos, items) if batch else None
+                if end is None:
+                    batch = False
+                    end = self._parse_item(buffer, pos, final, items)
+                if end is None:
+                    break
+                pos = end
+            else:
+                self._parse_punctuation(buffer[pos:pos + 1])
+                pos += 1
+
+        self._buffer = buffer[pos:]
+        return items
+
+    def _parse_punctuation(self, char):
+        if self._state == self._OPEN:
+            if char != b'[':
+                raise ValueError('Expected a JSON array, found {0!r}'.format(_text(char)))
+            self._state = self._FIRST_ITEM
+        elif char == b']':
+            self._state = self._DONE
+        elif char == b',':
+            self._state = self._ITEM
+        else:
+            raise ValueError('Expected "," or "]", found {0!r}'.format(_text(char)))
+
+    def _parse_batch(self, buffer, pos, items):
+        """
+        Decodes the complete items from ``pos`` on with a single call of
+        ``loads``, and returns where they end, or ``None`` if no batch was
+        found. A batch is cut after a closing bracket followed by a comma,
+        and only a cut between two items leaves a valid array: one inside
+        an item leaves a bracket or string open.
+        """
+        cut = len(buffer)
+        for _ in range(self.BATCH_ATTEMPTS):
+            cut = _last_boundary(buffer, pos, cut)
+            if cut is None:
+                return None
+            try:
+                batch = self._loads(b'[' + buffer[pos:cut] + b']')
+            except ValueError:
+                continue
+            items.extend(batch)
+            self._state = self._SEPARATOR
+            self._scanned = self._depth = 0
+            return cut
+        return None
+
+    def _parse_item(self, buffer, pos, final, items):
+        """
+        Decodes the item starting at ``pos`` and returns where it ends, or
+        ``None`` if more of the document is needed.
+        """
+        end = self._item_end(buffer, pos, final)
+        if end is None:
+            if final:
+                raise ValueError('Incomplete JSON array item')
+            return None
+
+        # Only accept the item once the following "," or "]" has arrived, as
+        # a number at the end of the buffer may still be cut short.
+        following = _WHITESPACE.match(buffer, end).end()
+        if not final and buffer[following:following + 1] not in (b',', b']'):
+            return None
+
+        items.append(self._loads(buffer[pos:end]))
+        self._state = self._SEPARATOR
+        return end
+
+    def _item_end(self, buffer, pos, final):
+        """
+        Where the item starting at ``pos`` ends, or ``None`` if it has not
+        been received in full
+        """
+        char = buffer[pos:pos + 1]
+        if char == b'"':
+            match = _STRING.match(buffer, pos)
+            return match.end() if match else None
+        if char not in b'[{':
+            match = _SCALAR_END.search(buffer, pos)
+            return match.start() if match else (len(buffer) if final else None)
+
+        # Carry on from where the previous chunk ran out
+        scan, depth = (pos + self._scanned, self._depth) if self._scanned else (pos + 1, 1)
+        while depth:
+            scan = _CONTENT.match(buffer, scan).end()
+            bracket = buffer[scan:scan + 1]
+            if not bracket or bracket == b'"':
+                self._scanned, self._depth = scan - pos, depth
+                return None
+            depth += 1 if bracket in b'[{' else -1
+            scan += 1
+        self._scanned = self._depth = 0
+        return scan
+
+
+def _last_boundary(buffer, start, end, max_candidates=64):
+    """
+    The position of the last comma between ``start`` and ``end`` that
+    follows a closing bracket and comes before something that starts like
+    the item at ``start``, or ``None``. The items of a list usually start
+    alike, e.g. with ``{"name":``.
+    """
+    prefix = buffer[start:start + 8]
+    found = buffer.rfind(prefix, start + 1, end)
+    for _ in range(max_candidates):
+        if found == -1:
+            return None
+        window = max(found - 8, start)
+        before = buffer[window:found].rstrip()
+        if before.endswith(b',') and before[:-1].rstrip()[-1:] in (b'}', b']'):
+            return window + len(before) - 1
+        found = buffer.rfind(prefix, start + 1, found)
+    return None
+
+
+def _text(char):
+    return char.decode('utf-8', 'replace')
+
+
+def iter_json_array(chunks, loads=None):
+    """
+    Yields the items of a JSON array as they are decoded from an iterable of
+    byte chunks, such as :meth:`requests.Response.iter_content`.
+
+    :param chunks: The chunks of the document
+    :type chunks: iterable of bytes
+
+    :param loads: Decodes each item, see :class:`JSONArrayDecoder`
+    :type loads: callable
+    """
+    array = JSONArrayDecoder(loads)
+    for chunk in chunks:
+        for item in array.feed(chunk):
+            yield item
+    for item in array.close():
+        yield item
@@ -0,0 +1,117 @@
+"""
+A transport adapter for tests that answers requests with canned responses,
+without a server
+"""
+import io
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+
+class Chunks(io.RawIOBase):
+    """
+    A response body read one chunk at a time. An exception in ``chunks`` is
+    raised when it is reached, like a connection failing mid-body, and
+    ``on_read`` is called before every read.
+    """
+
+    def __init__(self, chunks, on_read=None):
+        super(Chunks, self).__init__()
+        self.chunks = list(chunks)
+        self.on_read = on_read
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if self.on_read is not None:
+            self.on_read()
+        if not self.chunks:
+            return b''
+        chunk = self.chunks.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+
+class ScriptedAdapter(BaseAdapter):
+    """
+    Answers requests with canned responses, and keeps every request it was
+    sent with its send options in :attr:`sent`.
+
+    An answer is a status, a body, a ``(status, body)`` tuple, an exception
+    to raise, or a function called with the request that returns one of
+    those. A body is ``bytes``, a list of byte chunks that are read one at a
+    time (see :class:`Chunks`), a file object, or anything else, which is
+    sent as JSON. A status alone is sent with ``{}``.
+
+    Each request takes the next answer of ``script`` if there is one, then
+    the answer given in ``answers`` for its url or for its path and query
+    string on any node, and ``default`` otherwise. Every request is answered
+    after ``delay`` seconds.
+    """
+
+    def __init__(self, answers=None, default=(200, {}), script=(), delay=0):
+        super(ScriptedAdapter, self).__init__()
+        self.answers = answers or {}
+        self.default = default
+        self.script = list(script)
+        self.delay = delay
+        #: ``(request, send options)`` of every request, in the order sent
+        self.sent = []
+        self.lock = threading.Lock()
+
+    @property
+    def urls(self):
+        return [request.url for request, _ in self.sent]
+
+    @property
+    def methods(self):
+        return [request.method for request, _ in self.sent]
+
+    def send(self, request, **kwargs):
+        # Read streamed request bodies the way a server would
+        if request.body is not None and not isinstance(request.body, (bytes, str)):
+            request.body = list(request.body)
+        with self.lock:
+            self.sent.append((request, kwargs))
+            answer = self.script.pop(0) if self.script else self.answer(request)
+        time.sleep(self.delay)
+
+        if callable(answer) and not isinstance(answer, Exception):
+            answer = answer(request)
+        if isinstance(answer, Exception):
+            raise answer
+        if isinstance(answer, int):
+            answer = (answer, {})
+        elif not isinstance(answer, tuple):
+            answer = (200, answer)
+        status, body = answer
+
+        response = requests.Response()
+        response.status_code = status
+        response.request = request
+        response.url = request.url
+        response.raw = self.body(body)
+        return response
+
+    def answer(self, request):
+        path = '/' + request.url.split('/', 3)[3]
+        return self.answers.get(request.url, self.answers.get(path, self.default))
+
+    @staticmethod
+    def body(body):
+        if isinstance(body, list) and body and all(
+                isinstance(chunk, (bytes, Exception)) for chunk in body):
+            return Chunks(body)
+        if isinstance(body, io.IOBase):
+            return body
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        return io.BytesIO(body)
+
+    def close(self):
+        pass
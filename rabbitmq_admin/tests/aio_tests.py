@@ -0,0 +1,215 @@
+import asyncio
+import json
+import sys
+from unittest import TestCase, skipIf
+
+from requests import HTTPError
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from rabbitmq_admin.aio import AsyncAdminAPI
+    from rabbitmq_admin.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+except (ImportError, SyntaxError):  # pragma: no cover
+    AsyncAdminAPI = None
+
+
+@skipIf(AsyncAdminAPI is None or sys.version_info < (3, 7),
+        'The async client needs Python 3.7+ and aiohttp')
+class AsyncAdminAPITests(TestCase):
+    """
+    Runs the async client against an in-process aiohttp server that records
+    every request it receives.
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.requests = []
+
+        async def handler(request):
+            body = await request.read()
+            self.requests.append({
+                'method': request.method,
+                'path': request.raw_path,
+                'query': dict(request.query),
+                'body': json.loads(body.decode('utf-8')) if body else None,
+                'authorization': request.headers.get('Authorization'),
+            })
+            if request.path == '/api/vhosts/slow':
+                await asyncio.sleep(0.5)
+            if request.path == '/api/vhosts/busy' and len(self.requests) == 1:
+                return web.json_response({'error': 'Service Unavailable'}, status=503)
+            if request.path in ('/api/vhosts/missing', '/api/bindings/missing'):
+                return web.json_response({'error': 'Object Not Found'}, status=404)
+            if request.path == '/api/bindings':
+                return web.json_response([{'source': str(i)} for i in range(5)])
+            if request.method == 'GET':
+                return web.json_response({'path': request.path})
+            return web.Response(status=204)
+
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', handler)
+        self.server = TestServer(app, loop=self.loop)
+        self.loop.run_until_complete(self.server.start_server())
+        self.api = AsyncAdminAPI(
+            str(self.server.make_url('')), auth=('guest', 'guest'))
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.api.close())
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+
+    def run_coroutine(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_get(self):
+        response = self.run_coroutine(self.api.overview())
+
+        self.assertEqual(response, {'path': '/api/overview'})
+        self.assertEqual(self.requests[0]['method'], 'GET')
+        self.assertEqual(self.requests[0]['authorization'], 'Basic Z3Vlc3Q6Z3Vlc3Q=')
+
+    def test_get_params_match_blocking_client(self):
+        self.run_coroutine(self.api.get_node('rabbit@rabbit1', memory=True))
+
+        self.assertEqual(self.requests[0]['path'].split('?')[0], '/api/nodes/rabbit@rabbit1')
+        self.assertEqual(self.requests[0]['query'], {'memory': 'true', 'binary': 'false'})
+
+    def test_put(self):
+        self.run_coroutine(self.api.create_vhost('vhost/1', tracing=True))
+
+        self.assertEqual(self.requests[0]['method'], 'PUT')
+        self.assertEqual(self.requests[0]['path'], '/api/vhosts/vhost%2F1')
+        self.assertEqual(self.requests[0]['body'], {'tracing': True})
+
+    def test_post(self):
+        self.run_coroutine(self.api.post_definitions({'vhosts': []}))
+
+        self.assertEqual(self.requests[0]['method'], 'POST')
+        self.assertEqual(self.requests[0]['body'], {'vhosts': []})
+
+    def test_delete(self):
+        self.run_coroutine(self.api.delete_connection('c1', reason='bye'))
+
+        self.assertEqual(self.requests[0]['method'], 'DELETE')
+        self.assertEqual(self.requests[0]['path'], '/api/connections/c1')
+
+    def test_http_error(self):
+        with self.assertRaises(HTTPError) as context:
+            self.run_coroutine(self.api.get_vhost('missing'))
+
+        self.assertEqual(context.exception.response.status_code, 404)
+
+    def test_concurrent_calls(self):
+        async def run():
+            return await asyncio.gather(*[self.api.get_vhost(str(i)) for i in range(20)])
+
+        responses = self.run_coroutine(run())
+
+        self.assertEqual(
+            [response['path'] for response in responses],
+            ['/api/vhosts/{0}'.format(i) for i in range(20)]
+        )
+
+    def test_context_manager(self):
+        async def run():
+            async with self.api as api:
+                await api.whoami()
+                return api._client_session
+
+        session = self.run_coroutine(run())
+
+        self.assertTrue(session.closed)
+        self.assertIsNone(self.api._client_session)
+
+    def test_stream(self):
+        async def run():
+            items = await self.api.list_bindings(stream=True)
+            return [item async for item in items]
+
+        self.assertEqual(self.run_coroutine(run()), [{'source': str(i)} for i in range(5)])
+
+    def test_stream_http_error(self):
+        with self.assertRaises(HTTPError):
+            self.run_coroutine(self.api.list_bindings_for_vhost('missing', stream=True))
+
+    def test_hooks(self):
+        events = []
+        self.api.hooks.append(events.append)
+
+        async def run():
+            await self.api.get_vhost('tenant')
+            with self.assertRaises(HTTPError):
+                await self.api.get_vhost('missing')
+            items = await self.api.list_bindings(stream=True)
+            self.assertEqual(len(events), 2)
+            return [item async for item in items]
+
+        self.assertEqual(len(self.run_coroutine(run())), 5)
+        self.assertEqual(
+            [(event.endpoint, event.status) for event in events],
+            [('/api/vhosts/{name}', 200), ('/api/vhosts/{name}', 404), ('/api/bindings', 200)])
+        self.assertGreater(events[2].bytes, 0)
+        self.assertTrue(all(event.latency is not None for event in events))
+
+    def test_retry(self):
+        self.api = AsyncAdminAPI(
+            str(self.server.make_url('')), auth=('guest', 'guest'),
+            retry=RetryPolicy(backoff=0.01))
+
+        self.assertEqual(
+            self.run_coroutine(self.api.get_vhost('busy')), {'path': '/api/vhosts/busy'})
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.api.retry.counters()[('GET', '/api/vhosts/{name}')]['retries'], 1)
+
+    def test_breaker_connection_errors(self):
+        self.api.breaker = CircuitBreaker(threshold=1)
+        self.run_coroutine(self.server.close())
+
+        with self.assertRaises(Exception):
+            self.run_coroutine(self.api.overview())
+        with self.assertRaises(CircuitOpenError):
+            self.run_coroutine(self.api.overview())
+
+    def test_timeout(self):
+        self.api = AsyncAdminAPI(
+            str(self.server.make_url('')), auth=('guest', 'guest'), timeout=(1, 0.05))
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_coroutine(self.api.get_vhost('slow'))
+        self.assertEqual(
+            self.run_coroutine(self.api.get_vhost('fast')), {'path': '/api/vhosts/fast'})
+
+    def test_blocking_only_methods(self):
+        for name in ('iter_queues', 'bulk_create_vhosts', 'health_sweep', 'export_definitions'):
+            with self.assertRaises(TypeError) as context:
+                getattr(self.api, name)('arg')
+            self.assertIn('AdminAPI', str(context.exception))
+
+    def test_deadline_is_per_task(self):
+        async def limited():
+            with self.api.deadline(30):
+                await asyncio.sleep(0.01)
+                return self.api.capture_context()
+
+        async def other():
+            await asyncio.sleep(0.005)
+            return self.api.capture_context()
+
+        async def run():
+            return await asyncio.gather(limited(), other())
+
+        limited_context, other_context = self.run_coroutine(run())
+
+        self.assertIn('deadline', limited_context)
+        self.assertEqual(other_context, {})
+        self.assertEqual(self.api.capture_context(), {})
+
+    def test_deadline(self):
+        async def run():
+            with self.api.deadline(0.05):
+                await self.api.get_vhost('slow')
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_coroutine(run())
@@ -1,3 +1,4 @@
+import io
 import os
 from unittest import TestCase
 
@@ -6,6 +7,8 @@ import requests
 from requests import HTTPError
 
 from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.timeseries import TimeSeries
+from rabbitmq_admin.topology import Topology
 
 
 class AdminAPITests(TestCase):
@@ -73,6 +76,23 @@ class AdminAPITests(TestCase):
         response = self.api.overview()
         self.assertIsInstance(response, dict)
 
+    def test_overview_disable_stats(self):
+        response = self.api.overview(disable_stats=True)
+        self.assertNotIn('message_stats', response)
+
+    def test_overview_columns(self):
+        self.assertEqual(
+            self.api.overview(columns='cluster_name,object_totals.queues'),
+            {
+                'cluster_name': 'rabbit@rabbit1',
+                'object_totals': {'queues': 2},
+            }
+        )
+
+    def test_overview_history(self):
+        response = self.api.overview(history=(60, 5))
+        self.assertIsInstance(response['queue_totals']['messages_details']['samples'], TimeSeries)
+
     def test_get_cluster_name(self):
         self.assertDictEqual(
             self.api.get_cluster_name(),
@@ -105,12 +125,31 @@ class AdminAPITests(TestCase):
         response = self.api.get_definitions()
         self.api.post_definitions(response)
 
+    def test_export_import_definitions(self):
+        backup = io.BytesIO()
+        self.assertGreater(self.api.export_definitions(backup, compress='bz2'), 0)
+
+        backup.seek(0)
+        self.api.import_definitions(backup)
+
     def test_list_connections(self):
         self.assertEqual(
             len(self.api.list_connections()),
             1
         )
 
+    def test_list_connections_columns(self):
+        self.assertEqual(
+            list(self.api.list_connections(columns=['name', 'vhost'])[0].keys()),
+            ['name', 'vhost']
+        )
+
+    def test_iter_connections(self):
+        self.assertEqual(
+            list(self.api.iter_connections(page_size=1, prefetch=True)),
+            self.api.list_connections()
+        )
+
     def test_get_connection(self):
         cname = self.api.list_connections()[0].get('name')
         self.assertIsInstance(
@@ -126,6 +165,14 @@ class AdminAPITests(TestCase):
         with self.assertRaises(requests.HTTPError):
             self.api.delete_connection('not-a-connection', 'I don\'t like you')
 
+    def test_select_connections(self):
+        self.assertEqual(len(self.api.select_connections(user='guest', min_channels=1)), 1)
+        self.assertEqual(self.api.select_connections(user='nobody'), [])
+
+    def test_bulk_close_connections_none_selected(self):
+        report = self.api.bulk_close_connections(user='nobody')
+        self.assertEqual(report.summary(), {'succeeded': 0, 'failed': 0, 'errors': {}})
+
     def test_list_connection_channels(self):
         cname = self.api.list_connections()[0].get('name')
         response = self.api.list_connection_channels(cname)
@@ -141,6 +188,18 @@ class AdminAPITests(TestCase):
             1
         )
 
+    def test_list_channels_as_records(self):
+        channel = self.api.list_channels(as_records=True)[0]
+
+        self.assertEqual(channel.as_dict(), self.api.list_channels()[0])
+        self.assertEqual(channel.name, channel['name'])
+
+    def test_iter_channels(self):
+        self.assertEqual(
+            [channel['name'] for channel in self.api.iter_channels(page_size=1)],
+            [channel['name'] for channel in self.api.list_channels()]
+        )
+
     def test_get_channel(self):
         cname = self.api.list_channels()[0].get('name')
         self.assertIsInstance(
@@ -160,6 +219,10 @@ class AdminAPITests(TestCase):
             []
         )
 
+    def test_iter_consumers(self):
+        self.assertEqual(list(self.api.iter_consumers()), [])
+        self.assertEqual(list(self.api.iter_consumers('/')), [])
+
     def test_list_exchanges(self):
         self.assertEqual(
             len(self.api.list_exchanges()),
@@ -172,6 +235,16 @@ class AdminAPITests(TestCase):
             8
         )
 
+    def test_iter_exchanges(self):
+        self.assertEqual(
+            [exchange['name'] for exchange in self.api.iter_exchanges(page_size=3)],
+            [exchange['name'] for exchange in self.api.list_exchanges()]
+        )
+        self.assertEqual(
+            len(list(self.api.iter_exchanges('/', name='amq.', page_size=3, prefetch=True))),
+            7
+        )
+
     def test_get_create_delete_exchange_for_vhost(self):
         name = 'myexchange'
         body = {
@@ -198,6 +271,60 @@ class AdminAPITests(TestCase):
             8
         )
 
+    def test_list_queues(self):
+        self.assertEqual(
+            [queue['name'] for queue in self.api.list_queues(columns=['name'])],
+            ['aliveness-test', 'test_queue']
+        )
+
+    def test_list_queues_for_vhost(self):
+        self.assertEqual(
+            len(self.api.list_queues_for_vhost('/', disable_stats=True)),
+            2
+        )
+
+    def test_iter_queues(self):
+        self.assertEqual(
+            [queue['name'] for queue in self.api.iter_queues('/', page_size=1, prefetch=True)],
+            ['aliveness-test', 'test_queue']
+        )
+
+    def test_get_create_purge_delete_queue_for_vhost(self):
+        name = 'myqueue'
+
+        self.api.create_queue_for_vhost(name, '/', {'durable': False})
+        self.assertEqual(
+            self.api.get_queue_for_vhost(name, '/').get('name'),
+            name
+        )
+        self.api.purge_queue_for_vhost(name, '/')
+
+        self.api.delete_queue_for_vhost(name, '/', if_unused=True, if_empty=True)
+        with self.assertRaises(HTTPError):
+            self.api.get_queue_for_vhost(name, '/')
+
+    def test_select_queues(self):
+        self.assertEqual(
+            self.api.select_queues(pattern='^test_', vhost='/'),
+            [{'name': 'test_queue', 'vhost': '/', 'messages': 1}]
+        )
+
+    def test_bulk_purge_delete_queues(self):
+        for i in range(5):
+            self.api.create_queue_for_vhost('bulk_{0}'.format(i), '/')
+
+        self.assertTrue(self.api.bulk_purge_queues(pattern='^bulk_').ok)
+        report = self.api.bulk_delete_queues(pattern='^bulk_', max_rate=100)
+
+        self.assertEqual(len(report.succeeded), 5)
+        self.assertEqual(self.api.select_queues(pattern='^bulk_'), [])
+
+    def test_topology_route(self):
+        topology = Topology.from_api(self.api, vhost='/')
+
+        self.assertEqual(topology.route('/', '', 'test_queue'), set(['test_queue']))
+        self.assertEqual(topology.route('/', 'amq.direct', 'test_queue'), set())
+
     def test_list_bindings(self):
         self.assertEqual(
             self.api.list_bindings(),
@@ -217,6 +344,12 @@ class AdminAPITests(TestCase):
               'vhost': '/'}]
         )
 
+    def test_list_bindings_stream(self):
+        self.assertEqual(
+            list(self.api.list_bindings(stream=True)),
+            self.api.list_bindings()
+        )
+
     def test_list_bindings_for_vhost(self):
         self.assertEqual(
             self.api.list_bindings_for_vhost('/'),
@@ -236,6 +369,35 @@ class AdminAPITests(TestCase):
               'vhost': '/'}]
         )
 
+    def test_iter_bindings(self):
+        self.assertEqual(list(self.api.iter_bindings()), self.api.list_bindings())
+        self.assertEqual(list(self.api.iter_bindings('/')), self.api.list_bindings())
+
+    def test_create_list_delete_binding(self):
+        self.api.create_binding('/', 'amq.topic', 'test_queue', routing_key='test.#')
+        bindings = self.api.list_bindings_between('/', 'amq.topic', 'test_queue')
+        self.assertEqual(
+            [binding['routing_key'] for binding in bindings],
+            ['test.#']
+        )
+
+        self.api.delete_binding('/', 'amq.topic', 'test_queue', bindings[0]['properties_key'])
+        self.assertEqual(self.api.list_bindings_between('/', 'amq.topic', 'test_queue'), [])
+
+    def test_reconcile_definitions(self):
+        desired = self.api.get_definitions()
+        desired['vhosts'].append({'name': 'reconciled'})
+
+        diff = self.api.reconcile_definitions(desired, dry_run=True)
+        self.assertEqual(diff.added['vhosts'], [{'name': 'reconciled'}])
+        self.assertIsNone(diff.report)
+
+        diff = self.api.reconcile_definitions(desired)
+        self.assertTrue(diff.report.ok)
+        self.assertFalse(self.api.reconcile_definitions(desired, dry_run=True))
+
+        self.api.delete_vhost('reconciled')
+
     def test_list_vhosts(self):
         response = self.api.list_vhosts()
         self.assertEqual(
@@ -435,3 +597,9 @@ class AdminAPITests(TestCase):
             self.api.is_vhost_alive('/'),
             {'status': 'ok'}
         )
+
+    def test_health_sweep(self):
+        report = self.api.health_sweep()
+
+        self.assertTrue(report.ok, report.failed)
+        self.assertEqual(list(report.as_dict()['vhosts']), ['/'])
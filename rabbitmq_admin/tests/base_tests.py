@@ -1,9 +1,16 @@
-from unittest import TestCase
+import gc
+import threading
+import warnings
+from unittest import SkipTest, TestCase
 
 from mock import patch, Mock
 import requests
 
 from rabbitmq_admin.base import Resource
+from rabbitmq_admin.cache import ResponseCache
+from rabbitmq_admin.codec import JSONCodec, OrjsonCodec, default_codec
+from rabbitmq_admin.deadline import DeadlineExceeded
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
 
 
 class ResourceTests(TestCase):
@@ -21,7 +28,7 @@ class ResourceTests(TestCase):
         self.assertEqual(resource.auth, self.auth)
         self.assertEqual(resource.headers, {'Content-type': 'application/json'})
 
-    @patch.object(requests, 'put', autospec=True)
+    @patch.object(requests.Session, 'put', autospec=True)
     def test_put_no_data(self, mock_put):
 
         mock_response = Mock()
@@ -43,10 +50,11 @@ class ResourceTests(TestCase):
             headers={
                 'k1': 'v1',
                 'Content-type': 'application/json'
-            }
+            },
+            timeout=Resource.DEFAULT_TIMEOUT,
         )
 
-    @patch.object(requests, 'post', autospec=True)
+    @patch.object(requests.Session, 'post', autospec=True)
     def test_post_no_data(self, mock_post):
 
         mock_response = Mock()
@@ -56,7 +64,7 @@ class ResourceTests(TestCase):
 
         mock_response.raise_for_status.assert_called_once_with()
 
-    @patch.object(requests, 'post', autospec=True)
+    @patch.object(requests.Session, 'post', autospec=True)
     def test_post(self, mock_post):
 
         mock_response = Mock()
@@ -65,3 +73,407 @@ class ResourceTests(TestCase):
         self.resource._post(self.url, auth=self.auth, data={'hello': 'world'})
 
         mock_response.raise_for_status.assert_called_once_with()
+
+    def test_session_is_reused(self):
+        self.assertIs(self.resource.session, self.resource.session)
+        self.assertIs(
+            self.resource.session.get_adapter(self.url),
+            self.resource._adapter
+        )
+
+    def test_session_per_thread_shares_pool(self):
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(self.resource.session))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(sessions[0], self.resource.session)
+        self.assertIs(sessions[0].get_adapter(self.url), self.resource._adapter)
+
+    def test_sessions_of_finished_threads_are_released(self):
+        self.resource.session
+        threads = [threading.Thread(target=lambda: self.resource.session) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        self.assertEqual(len(self.resource._sessions), 1)
+
+    def test_pool_options(self):
+        resource = Resource(self.url, self.auth, pool_maxsize=3, pool_block=True)
+
+        self.assertEqual(resource._adapter._pool_maxsize, 3)
+        self.assertTrue(resource._adapter._pool_block)
+
+    def test_no_keep_alive(self):
+        resource = Resource(self.url, self.auth, keep_alive=False)
+
+        self.assertEqual(resource.session.headers['Connection'], 'close')
+
+    @patch.object(requests.Session, 'close', autospec=True)
+    def test_context_manager_closes(self, mock_close):
+        with Resource(self.url, self.auth) as resource:
+            session = resource.session
+
+        mock_close.assert_called_once_with(session)
+        self.assertEqual(len(resource._sessions), 0)
+        self.assertIsNot(resource.session, session)
+
+    def test_encode_params(self):
+        self.assertEqual(
+            Resource._encode_params({'memory': True, 'binary': False, 'page': 2, 'columns': None}),
+            {'memory': 'true', 'binary': 'false', 'page': 2}
+        )
+
+    @patch.object(Resource, '_get')
+    def test_api_get_params(self, mock_get):
+        self.resource._api_get('/api/nodes/rabbit', params={'memory': True})
+
+        mock_get.assert_called_once_with(
+            url=self.url + '/api/nodes/rabbit',
+            auth=self.auth,
+            headers={'Content-type': 'application/json'},
+            params={'memory': 'true'},
+            timeout=Resource.DEFAULT_TIMEOUT,
+        )
+
+    def paged_get(self, pages):
+        """
+        Patches _get to answer with one page of ``pages`` per request
+        """
+        def get(**kwargs):
+            page = kwargs['params']['page']
+            items = pages[page - 1] if pages else []
+            return {'items': items, 'page': page, 'page_count': len(pages)}
+
+        patcher = patch.object(Resource, '_get', side_effect=get)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_api_iter(self):
+        mock_get = self.paged_get([[1, 2], [3, 4], [5]])
+
+        items = self.resource._api_iter('/api/connections', page_size=2, params={'name': 'c'})
+
+        self.assertEqual(list(items), [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [call[1]['params'] for call in mock_get.call_args_list],
+            [
+                {'name': 'c', 'pagination': 'true', 'page_size': 2, 'page': 1},
+                {'name': 'c', 'pagination': 'true', 'page_size': 2, 'page': 2},
+                {'name': 'c', 'pagination': 'true', 'page_size': 2, 'page': 3},
+            ]
+        )
+
+    def test_api_iter_is_lazy(self):
+        mock_get = self.paged_get([[1, 2], [3]])
+
+        items = self.resource._api_iter('/api/connections', page_size=2)
+        self.assertEqual(mock_get.call_count, 0)
+        self.assertEqual(next(items), 1)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_api_iter_empty(self):
+        self.paged_get([])
+
+        self.assertEqual(list(self.resource._api_iter('/api/channels')), [])
+
+    def test_api_iter_prefetch(self):
+        mock_get = self.paged_get([[1, 2], [3, 4], [5]])
+
+        items = self.resource._api_iter('/api/connections', page_size=2, prefetch=True)
+
+        self.assertEqual(next(items), 1)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(list(items), [2, 3, 4, 5])
+        self.assertEqual(mock_get.call_count, 3)
+
+    def test_api_iter_prefetch_uses_one_thread(self):
+        threads = set()
+        mock_get = self.paged_get([[page] for page in range(10)])
+        get = mock_get.side_effect
+
+        def record(**kwargs):
+            threads.add(threading.current_thread())
+            return get(**kwargs)
+        mock_get.side_effect = record
+
+        items = list(self.resource._api_iter('/api/queues', prefetch=True))
+
+        self.assertEqual(items, list(range(10)))
+        workers = threads - set([threading.current_thread()])
+        self.assertEqual(len(workers), 1)
+        self.assertFalse(workers.pop().is_alive())
+
+    def test_api_iter_prefetch_closed_early(self):
+        self.paged_get([[1], [2], [3]])
+        before = threading.active_count()
+
+        items = self.resource._api_iter('/api/queues', prefetch=True)
+        self.assertEqual(next(items), 1)
+        items.close()
+
+        self.assertEqual(threading.active_count(), before)
+
+    def test_api_iter_prefetch_error(self):
+        with patch.object(Resource, '_get', side_effect=[
+                {'items': [1], 'page': 1, 'page_count': 2},
+                requests.HTTPError('boom')]):
+            items = self.resource._api_iter('/api/connections', prefetch=True)
+
+            self.assertEqual(next(items), 1)
+            with self.assertRaises(requests.HTTPError):
+                next(items)
+
+    @patch.object(requests.Session, 'get', autospec=True)
+    def test_get_stream(self, mock_get):
+        mock_response = Mock()
+        mock_response.iter_content.return_value = iter([b'[{"a": 1}, {"a"', b': 2}]'])
+        mock_get.return_value = mock_response
+
+        items = self.resource._get(self.url, stream=True)
+
+        self.assertEqual(next(items), {'a': 1})
+        mock_response.close.assert_not_called()
+        self.assertEqual(list(items), [{'a': 2}])
+        mock_response.iter_content.assert_called_once_with(Resource.stream_chunk_size)
+        mock_response.close.assert_called_once_with()
+        mock_response.json.assert_not_called()
+
+    @patch.object(requests.Session, 'get', autospec=True)
+    def test_get_stream_http_error(self, mock_get):
+        mock_response = Mock()
+        mock_response.raise_for_status.side_effect = requests.HTTPError('404')
+        mock_get.return_value = mock_response
+
+        with self.assertRaises(requests.HTTPError):
+            self.resource._get(self.url, stream=True)
+        mock_response.close.assert_called_once_with()
+
+    @patch.object(Resource, '_get')
+    def test_api_get_cached(self, mock_get):
+        mock_get.return_value = {'name': 'rabbit'}
+        resource = Resource(self.url, self.auth, cache=ResponseCache())
+
+        self.assertEqual(resource._api_get('/api/overview'), {'name': 'rabbit'})
+        self.assertEqual(resource._api_get('/api/overview'), {'name': 'rabbit'})
+        resource._api_get('/api/overview', params={'columns': 'name'})
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(resource.cache.stats()['hits'], 1)
+
+    @patch.object(Resource, '_get')
+    def test_api_get_not_cached(self, mock_get):
+        resource = Resource(self.url, self.auth, cache=ResponseCache())
+
+        resource._api_get('/api/connections')
+        resource._api_get('/api/connections')
+        resource._api_get('/api/overview', stream=True)
+        resource._api_get('/api/overview', stream=True)
+
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(len(resource.cache), 0)
+
+    @patch.object(Resource, '_get')
+    @patch.object(Resource, '_put')
+    def test_api_put_invalidates_cache(self, mock_put, mock_get):
+        mock_get.side_effect = [[], [{'name': 'new'}]]
+        resource = Resource(self.url, self.auth, cache=ResponseCache())
+
+        self.assertEqual(resource._api_get('/api/vhosts'), [])
+        resource._api_put('/api/vhosts/new', data={})
+
+        self.assertEqual(resource._api_get('/api/vhosts'), [{'name': 'new'}])
+
+    @patch.object(Resource, '_get')
+    @patch.object(Resource, '_delete', side_effect=requests.HTTPError('500'))
+    def test_failed_delete_invalidates_cache(self, mock_delete, mock_get):
+        resource = Resource(self.url, self.auth, cache=ResponseCache())
+        resource._api_get('/api/vhosts')
+
+        with self.assertRaises(requests.HTTPError):
+            resource._api_delete('/api/vhosts/old')
+
+        self.assertEqual(len(resource.cache), 0)
+
+    def test_default_headers_are_shared(self):
+        kwargs = self.resource._api_kwargs('/api/overview', {})
+
+        self.assertIs(kwargs['headers'], self.resource.headers)
+        self.assertEqual(
+            self.resource._api_kwargs('/api/overview', {'headers': {'k1': 'v1'}})['headers'],
+            {'k1': 'v1', 'Content-type': 'application/json'}
+        )
+
+    def test_changing_default_headers(self):
+        resource, sent = self.recording_resource()
+        resource._api_get('/api/overview')
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            resource.headers['k1'] = 'v1'
+        resource._api_get('/api/overview')
+        resource.headers = {'k2': 'v2'}
+        resource._api_get('/api/overview')
+
+        self.assertEqual([warning.category for warning in caught], [DeprecationWarning])
+        self.assertNotIn('k1', sent[0][0].headers)
+        self.assertEqual(sent[1][0].headers['k1'], 'v1')
+        self.assertEqual(sent[2][0].headers['k2'], 'v2')
+        self.assertNotIn('Content-type', sent[2][0].headers)
+
+    def recording_resource(self, auth=None):
+        resource = Resource(self.url, auth or self.auth, codec=JSONCodec())
+        resource._adapter = ScriptedAdapter()
+        return resource, resource._adapter.sent
+
+    def test_timeouts(self):
+        resource, sent = self.recording_resource()
+        resource.timeout = 5
+
+        resource._api_get('/api/overview')
+        with resource.call_timeout((1, 2)):
+            resource._api_get('/api/overview')
+            with resource.call_timeout(None):
+                resource._api_delete('/api/vhosts/a')
+            resource._api_put('/api/vhosts/a')
+        resource._api_get('/api/overview')
+
+        self.assertEqual([options['timeout'] for _, options in sent], [5, (1, 2), None, (1, 2), 5])
+
+    def test_deadline(self):
+        resource, sent = self.recording_resource()
+
+        with resource.deadline(30) as deadline:
+            with resource.deadline(60) as inner:
+                self.assertIs(inner, deadline)
+                resource._api_get('/api/overview')
+            with resource.call_timeout(None):
+                resource._api_get('/api/overview')
+            deadline.expires_at -= 30
+
+            with self.assertRaises(DeadlineExceeded):
+                resource._api_get('/api/overview')
+        resource._api_get('/api/overview')
+
+        connect, read = sent[0][1]['timeout']
+        self.assertEqual(connect, 10)
+        self.assertTrue(25 < read <= 30)
+        self.assertTrue(25 < sent[1][1]['timeout'] <= 30)
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(sent[2][1]['timeout'], (10, 60))
+
+    def test_context_reaches_prefetch_thread(self):
+        resource, sent = self.recording_resource()
+        timeouts = []
+
+        def get(**kwargs):
+            timeouts.append(resource._with_timeout({})['timeout'])
+            page = kwargs['params']['page']
+            return {'items': [page], 'page': page, 'page_count': 3}
+
+        with patch.object(Resource, '_get', side_effect=get):
+            with resource.call_timeout(7):
+                self.assertEqual(list(resource._api_iter('/api/queues', prefetch=True)), [1, 2, 3])
+
+        self.assertEqual(timeouts, [7, 7, 7])
+
+    def test_prepared_requests(self):
+        resource, sent = self.recording_resource()
+
+        resource._api_get('/api/nodes/rabbit', params={'memory': True})
+        resource._api_put('/api/vhosts/new', data={'tracing': True}, headers={'k1': 'v1'})
+
+        get, get_options = sent[0]
+        self.assertEqual(get.method, 'GET')
+        self.assertEqual(get.url, self.url + '/api/nodes/rabbit?memory=true')
+        self.assertEqual(get.headers['Authorization'], 'Basic Z3Vlc3Q6Z3Vlc3Q=')
+        self.assertEqual(get.headers['Content-type'], 'application/json')
+        self.assertIn('User-Agent', get.headers)
+        self.assertNotIn('Content-Length', get.headers)
+        self.assertIsNone(get.body)
+        self.assertEqual(get_options['timeout'], (10, 60))
+        self.assertFalse(get_options['stream'])
+        self.assertIn('verify', get_options)
+
+        put = sent[1][0]
+        self.assertEqual(put.method, 'PUT')
+        self.assertEqual(put.body, '{"tracing": true}')
+        self.assertEqual(put.headers['Content-Length'], '17')
+        self.assertEqual(put.headers['k1'], 'v1')
+        self.assertEqual(put.headers['Authorization'], 'Basic Z3Vlc3Q6Z3Vlc3Q=')
+
+    def test_prepared_request_templates_are_reused(self):
+        resource, sent = self.recording_resource()
+
+        with patch.object(
+                requests.Session, 'merge_environment_settings',
+                autospec=True, return_value={'verify': True}) as mock_environment:
+            for _ in range(3):
+                resource._api_get('/api/overview')
+                resource._api_delete('/api/vhosts/old')
+
+        self.assertEqual(mock_environment.call_count, 1)
+        self.assertEqual(len(resource.session._templates), 1)
+        self.assertEqual([request.method for request, _ in sent], ['GET', 'DELETE'] * 3)
+        self.assertEqual(sent[1][0].headers['Content-Length'], '0')
+        self.assertNotIn('Content-Length', sent[2][0].headers)
+
+    def test_session_changes_rebuild_templates(self):
+        resource, sent = self.recording_resource()
+        resource._api_get('/api/overview')
+
+        resource.session.headers['User-Agent'] = 'monitor'
+        resource.session.proxies['http'] = 'http://proxy:3128'
+        resource._api_get('/api/overview')
+
+        self.assertNotEqual(sent[0][0].headers['User-Agent'], 'monitor')
+        self.assertEqual(sent[1][0].headers['User-Agent'], 'monitor')
+        self.assertEqual(sent[1][1]['proxies']['http'], 'http://proxy:3128')
+        self.assertEqual(len(resource.session._templates), 1)
+
+    def test_other_auth_is_prepared_per_request(self):
+        resource, sent = self.recording_resource(requests.auth.HTTPBasicAuth('bob', 'secret'))
+
+        resource._api_get('/api/overview')
+
+        self.assertEqual(sent[0][0].headers['Authorization'], 'Basic Ym9iOnNlY3JldA==')
+        self.assertEqual(resource.session._templates, {})
+
+    def test_default_codec(self):
+        self.assertIs(type(self.resource.codec), type(default_codec()))
+
+    def test_codec_decodes_raw_content(self):
+        codec = Mock()
+        codec.dumps.return_value = b'{"tracing":true}'
+        resource, sent = self.recording_resource()
+        resource.codec = codec
+
+        self.assertIs(resource._api_get('/api/overview'), codec.loads.return_value)
+        codec.loads.assert_called_once_with(b'{}')
+
+        resource._api_put('/api/vhosts/new', data={'tracing': True})
+        codec.dumps.assert_called_once_with({'tracing': True})
+        self.assertEqual(sent[1][0].body, b'{"tracing":true}')
+
+
+class CodecTests(TestCase):
+
+    document = {'name': u'caf\xe9', 'arguments': {'x-max-length': 10}, 'items': [1, 2.5, None]}
+
+    def check(self, codec):
+        encoded = codec.dumps(self.document)
+        if not isinstance(encoded, bytes):
+            encoded = encoded.encode('utf-8')
+        self.assertEqual(codec.loads(encoded), self.document)
+
+    def test_json(self):
+        self.check(JSONCodec())
+
+    def test_orjson(self):
+        try:
+            codec = OrjsonCodec()
+        except ImportError:
+            raise SkipTest('orjson is not installed')
+        self.check(codec)
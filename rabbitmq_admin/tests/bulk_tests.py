@@ -0,0 +1,372 @@
+import re
+import threading
+import time
+from unittest import TestCase
+
+from mock import patch
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.base import Resource
+from rabbitmq_admin.bulk import BulkReport, DependencyError, Operation
+from rabbitmq_admin.deadline import DeadlineExceeded
+
+
+class BulkApplyTests(TestCase):
+    """
+    Runs bulk operations against a client whose transport records every
+    request instead of sending it
+    """
+
+    def setUp(self):
+        self.api = AdminAPI('http://127.0.0.1:15672', ('guest', 'guest'))
+        self.calls = []
+        self.failing = set()
+        self.delays = {}
+        self.timeouts = []
+        self.lock = threading.Lock()
+
+        def record(method):
+            def send(**kwargs):
+                path = kwargs['url'][len(self.api.url):]
+                time.sleep(self.delays.get(path, 0))
+                with self.lock:
+                    self.calls.append((method, path))
+                    self.timeouts.append(kwargs['timeout'])
+                if path in self.failing:
+                    raise requests.HTTPError('500 for {0}'.format(path))
+            return send
+
+        for method in ('put', 'post', 'delete'):
+            patcher = patch.object(Resource, '_' + method, side_effect=record(method.upper()))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_results_in_order(self):
+        report = self.api.bulk_apply([
+            Operation('create_vhost', 'a'),
+            Operation('create_vhost', name='b', tracing=True),
+        ])
+
+        self.assertIsInstance(report, BulkReport)
+        self.assertTrue(report.ok)
+        self.assertEqual(len(report), 2)
+        self.assertEqual(report[1].operation.kwargs, {'name': 'b', 'tracing': True})
+        self.assertEqual(len(report.succeeded), 2)
+        self.assertEqual(report.failed, [])
+
+    def test_permission_waits_for_vhost_and_user(self):
+        self.delays['/api/vhosts/tenant'] = 0.05
+        self.delays['/api/users/app'] = 0.1
+
+        report = self.api.bulk_apply([
+            Operation('create_user_permission', 'app', 'tenant'),
+            Operation('create_policy_for_vhost', 'tenant', 'ha', {'ha-mode': 'all'}),
+            Operation('create_vhost', 'tenant'),
+            Operation('create_user', 'app', 'secret'),
+        ])
+
+        self.assertTrue(report.ok)
+        paths = [path for _, path in self.calls]
+        self.assertLess(paths.index('/api/vhosts/tenant'), paths.index('/api/policies/tenant/ha'))
+        self.assertLess(paths.index('/api/users/app'), paths.index('/api/permissions/tenant/app'))
+
+    def test_failure_skips_dependents_only(self):
+        self.failing.add('/api/vhosts/broken')
+
+        report = self.api.bulk_apply([
+            Operation('create_vhost', 'broken'),
+            Operation('create_user', 'app', 'secret'),
+            Operation('create_user_permission', 'app', 'broken'),
+            Operation('create_vhost', 'fine'),
+        ])
+
+        self.assertFalse(report.ok)
+        self.assertIsInstance(report[0].error, requests.HTTPError)
+        self.assertTrue(report[1].ok)
+        self.assertIsInstance(report[2].error, DependencyError)
+        self.assertIs(report[2].error.dependency, report[0].operation)
+        self.assertTrue(report[3].ok)
+        self.assertNotIn(('PUT', '/api/permissions/broken/app'), self.calls)
+
+    def test_delete_vhost_runs_after_contents_even_if_they_fail(self):
+        self.delays['/api/policies/old/ha/'] = 0.05
+        self.failing.add('/api/policies/old/ha/')
+
+        report = self.api.bulk_apply([
+            Operation('delete_vhost', 'old'),
+            Operation('delete_policy_for_vhost', 'old', 'ha'),
+        ])
+
+        self.assertEqual(
+            [path for _, path in self.calls],
+            ['/api/policies/old/ha/', '/api/vhosts/old']
+        )
+        self.assertTrue(report[0].ok)
+        self.assertFalse(report[1].ok)
+
+    def test_concurrency(self):
+        for i in range(8):
+            self.delays['/api/vhosts/{0}'.format(i)] = 0.1
+
+        start = time.time()
+        report = self.api.bulk_create_vhosts([str(i) for i in range(8)], max_workers=8)
+
+        self.assertTrue(report.ok)
+        self.assertLess(time.time() - start, 0.4)
+
+    def test_invalid_arguments(self):
+        report = self.api.bulk_apply([
+            Operation('create_user_permission', 'app'),
+            Operation('create_vhost', 'a'),
+            Operation('no_such_method'),
+        ])
+
+        self.assertIsInstance(report[0].error, TypeError)
+        self.assertTrue(report[1].ok)
+        self.assertIsInstance(report[2].error, AttributeError)
+        self.assertEqual(self.calls, [('PUT', '/api/vhosts/a')])
+
+    def test_vhost_is_deleted_and_created_in_order(self):
+        self.delays['/api/vhosts/old'] = 0.05
+
+        report = self.api.bulk_apply([
+            Operation('delete_vhost', 'old'),
+            Operation('create_vhost', 'old'),
+            Operation('create_queue_for_vhost', 'work', 'old'),
+        ])
+
+        self.assertTrue(report.ok)
+        self.assertEqual(self.calls, [
+            ('DELETE', '/api/vhosts/old'),
+            ('PUT', '/api/vhosts/old'),
+            ('PUT', '/api/queues/old/work'),
+        ])
+
+    def test_bulk_helpers(self):
+        self.api.bulk_create_users([{'name': 'app', 'password': 'secret'}])
+        self.api.bulk_create_user_permissions([{'name': 'app', 'vhost': '/'}])
+        self.api.bulk_create_policies([{'vhost': '/', 'name': 'ha', 'definition': {}}])
+
+        self.assertEqual(self.calls, [
+            ('PUT', '/api/users/app'),
+            ('PUT', '/api/permissions/%2F/app'),
+            ('PUT', '/api/policies/%2F/ha'),
+        ])
+
+    def test_operation_repr(self):
+        self.assertEqual(
+            repr(Operation('create_user', 'app', password='x')),
+            "create_user('app', password='x')"
+        )
+
+    def test_max_rate(self):
+        start = time.time()
+        report = self.api.bulk_create_vhosts(['a', 'b', 'c'], max_workers=3)
+        self.assertTrue(report.ok)
+        unlimited = time.time() - start
+
+        start = time.time()
+        self.api.bulk_apply(
+            [Operation('create_vhost', name) for name in 'abc'], max_workers=3, max_rate=20)
+
+        self.assertGreaterEqual(time.time() - start, 0.1 - unlimited)
+
+    def queues(self):
+        queues = [
+            {'name': 'test.1', 'vhost': '/', 'messages': 0},
+            {'name': 'test.2', 'vhost': 'other', 'messages': 50},
+            {'name': 'work', 'vhost': '/', 'messages': 100},
+        ]
+
+        def get(*args, **kwargs):
+            # The server matches names when use_regex is set
+            pattern = kwargs['params'].get('name', '')
+            items = [queue for queue in queues if re.search(pattern, queue['name'])]
+            return {'items': items, 'page': 1, 'page_count': 1}
+
+        patcher = patch.object(Resource, '_get', side_effect=get)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_select_queues(self):
+        mock_get = self.queues()
+
+        self.assertEqual(
+            [queue['name'] for queue in self.api.select_queues(pattern=r'^test\.')],
+            ['test.1', 'test.2']
+        )
+        self.assertEqual(mock_get.call_args[1]['params']['name'], r'^test\.')
+        self.assertEqual(mock_get.call_args[1]['params']['use_regex'], 'true')
+        self.assertEqual(
+            [queue['name'] for queue in self.api.select_queues(min_messages=50)],
+            ['test.2', 'work']
+        )
+        self.assertEqual(mock_get.call_args[1]['params'], {
+            'columns': 'name,vhost,messages',
+            'disable_stats': 'true',
+            'enable_queue_totals': 'true',
+            'use_regex': 'false',
+            'pagination': 'true',
+            'page_size': 500,
+            'page': 1,
+        })
+
+    def test_select_queues_for_vhost(self):
+        mock_get = self.queues()
+
+        self.api.select_queues(vhost='/')
+
+        self.assertEqual(mock_get.call_args[1]['url'], self.api.url + '/api/queues/%2F')
+
+    def test_bulk_purge_queues(self):
+        self.queues()
+
+        progress = []
+
+        report = self.api.bulk_purge_queues(
+            pattern='test', max_rate=100,
+            progress=lambda result, done, total: progress.append((done, total)))
+
+        self.assertTrue(report.ok)
+        self.assertEqual(sorted(progress), [(1, 2), (2, 2)])
+        self.assertEqual(sorted(self.calls), [
+            ('DELETE', '/api/queues/%2F/test.1/contents'),
+            ('DELETE', '/api/queues/other/test.2/contents'),
+        ])
+
+    def test_bulk_delete_queues(self):
+        self.queues()
+        self.failing.add('/api/queues/%2F/work')
+
+        report = self.api.bulk_delete_queues(min_messages=1, if_empty=True)
+
+        self.assertEqual(len(report.failed), 1)
+        self.assertEqual(report.failed[0].operation.args, ('work', '/'))
+        self.assertEqual(report.failed[0].operation.kwargs, {'if_unused': False, 'if_empty': True})
+
+    def test_create_queue_waits_for_vhost(self):
+        self.delays['/api/vhosts/tenant'] = 0.05
+
+        self.api.bulk_apply([
+            Operation('create_queue_for_vhost', 'work', 'tenant'),
+            Operation('create_vhost', 'tenant'),
+        ])
+
+        self.assertEqual(
+            [path for _, path in self.calls],
+            ['/api/vhosts/tenant', '/api/queues/tenant/work']
+        )
+
+    def test_binding_waits_for_exchange_and_queue(self):
+        self.delays['/api/exchanges/%2F/events'] = 0.05
+
+        self.api.bulk_apply([
+            Operation('create_binding', '/', 'events', 'work', routing_key='a.#'),
+            Operation('create_queue_for_vhost', 'work', '/'),
+            Operation('create_exchange_for_vhost', 'events', '/', {'type': 'topic'}),
+        ])
+
+        self.assertEqual(self.calls[-1], ('POST', '/api/bindings/%2F/e/events/q/work'))
+
+    def test_delete_queue_runs_after_its_bindings(self):
+        self.delays['/api/bindings/%2F/e/events/q/work/a'] = 0.05
+
+        self.api.bulk_apply([
+            Operation('delete_queue_for_vhost', 'work', '/'),
+            Operation('delete_binding', '/', 'events', 'work', 'a'),
+        ])
+
+        self.assertEqual(
+            [path for _, path in self.calls],
+            ['/api/bindings/%2F/e/events/q/work/a', '/api/queues/%2F/work']
+        )
+
+    def test_progress_and_summary(self):
+        self.failing.add('/api/vhosts/b')
+        progress = []
+
+        report = self.api.bulk_apply(
+            [
+                Operation('create_vhost', 'a'),
+                Operation('create_vhost', 'b'),
+                Operation('create_user_permission', 'app', 'b'),
+            ],
+            progress=lambda result, done, total: progress.append((done, total, result.ok)),
+        )
+
+        self.assertEqual([(done, total) for done, total, _ in progress], [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(sorted(ok for _, _, ok in progress), [False, False, True])
+        self.assertEqual(report.summary(), {
+            'succeeded': 1, 'failed': 2, 'errors': {'HTTPError': 1, 'DependencyError': 1}})
+
+    def connections(self):
+        connections = [
+            {'name': '10.0.0.1:1 -> 10.1.0.1:5672', 'vhost': '/', 'user': 'app', 'channels': 0,
+             'client_properties': {'connection_name': 'worker-1'}},
+            {'name': '10.0.0.2:2 -> 10.1.0.1:5672', 'vhost': '/', 'user': 'app', 'channels': 5,
+             'client_properties': {'connection_name': 'web-1'}},
+            {'name': '10.0.0.3:3 -> 10.1.0.1:5672', 'vhost': 'other', 'user': 'admin',
+             'channels': 1, 'client_properties': {}},
+        ]
+        patcher = patch.object(Resource, '_get', return_value={
+            'items': connections, 'page': 1, 'page_count': 1})
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_select_connections(self):
+        mock_get = self.connections()
+
+        selected = self.api.select_connections(
+            user=['app', 'admin'], client_properties={'connection_name': '^worker-'})
+
+        self.assertEqual([c['name'] for c in selected], ['10.0.0.1:1 -> 10.1.0.1:5672'])
+        self.assertEqual(mock_get.call_args[1]['params'], {
+            'columns': 'name,vhost,user,client_properties.connection_name',
+            'disable_stats': 'true',
+            'use_regex': 'false',
+            'pagination': 'true',
+            'page_size': 500,
+            'page': 1,
+        })
+
+    def test_select_connections_by_name_is_filtered_by_server(self):
+        mock_get = self.connections()
+
+        selected = self.api.select_connections(name=r'^10\.0\.0\.[23]:', max_channels=1)
+
+        self.assertEqual([c['vhost'] for c in selected], ['other'])
+        params = mock_get.call_args[1]['params']
+        self.assertEqual((params['name'], params['use_regex']), (r'^10\.0\.0\.[23]:', 'true'))
+        self.assertEqual(params['columns'], 'name,vhost,user,channels')
+
+    def test_bulk_close_connections(self):
+        self.connections()
+
+        report = self.api.bulk_close_connections(reason='leaked', vhost='/', min_channels=1)
+
+        self.assertTrue(report.ok)
+        self.assertEqual(self.calls, [
+            ('DELETE', '/api/connections/10.0.0.2%3A2+-%3E+10.1.0.1%3A5672'),
+        ])
+
+    def test_deadline_reaches_workers(self):
+        with self.api.call_timeout((1, 90)), self.api.deadline(30):
+            report = self.api.bulk_create_vhosts(['a', 'b'])
+
+        self.assertTrue(report.ok)
+        self.assertEqual(len(self.timeouts), 2)
+        for connect, read in self.timeouts:
+            self.assertEqual(connect, 1)
+            self.assertTrue(25 < read <= 30)
+
+    def test_expired_deadline_stops_work(self):
+        with self.api.deadline(0):
+            report = self.api.bulk_apply([
+                Operation('create_vhost', 'a'),
+                Operation('create_user_permission', 'app', 'a'),
+            ])
+
+        self.assertEqual(self.calls, [])
+        self.assertIsInstance(report[0].error, DeadlineExceeded)
+        self.assertIsInstance(report[1].error, DependencyError)
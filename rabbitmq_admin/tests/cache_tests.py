@@ -0,0 +1,111 @@
+from unittest import TestCase
+
+from rabbitmq_admin.cache import ResponseCache
+
+URL = 'http://127.0.0.1:15672'
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.cache = ResponseCache(maxsize=3, clock=lambda: self.now)
+
+    def put(self, path, response='response', params=None):
+        key = self.cache.key(URL + path, params)
+        self.cache.set(key, response, self.cache.ttl_for(path))
+        return key
+
+    def test_ttl_for(self):
+        cache = ResponseCache(ttls={'/api/vhosts': 10, '/api/nodes': 0})
+
+        self.assertEqual(cache.ttl_for('/api/overview'), 5)
+        self.assertEqual(cache.ttl_for('/api/vhosts'), 10)
+        self.assertEqual(cache.ttl_for('/api/vhosts/my-vhost/'), 10)
+        self.assertIsNone(cache.ttl_for('/api/nodes'))
+        self.assertIsNone(cache.ttl_for('/api/connections'))
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(
+            self.cache.key(URL, {'a': 1, 'b': 2}),
+            self.cache.key(URL, {'b': 2, 'a': 1})
+        )
+        self.assertNotEqual(self.cache.key(URL, {'a': 1}), self.cache.key(URL))
+
+    def test_hit_and_miss(self):
+        key = self.cache.key(URL + '/api/overview')
+        self.assertEqual(self.cache.get(key), (False, None))
+
+        self.put('/api/overview', {'a': 1})
+
+        self.assertEqual(self.cache.get(key), (True, {'a': 1}))
+        self.assertEqual(self.cache.stats(), {
+            'hits': 1, 'misses': 1, 'evictions': 0, 'invalidations': 0, 'size': 1,
+        })
+
+    def test_expiry(self):
+        key = self.put('/api/overview')
+
+        self.now += 4.9
+        self.assertTrue(self.cache.get(key)[0])
+        self.now += 0.1
+        self.assertFalse(self.cache.get(key)[0])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        first = self.put('/api/vhosts/a')
+        second = self.put('/api/vhosts/b')
+        self.put('/api/vhosts/c')
+        self.cache.get(first)
+
+        self.put('/api/vhosts/d')
+
+        self.assertTrue(self.cache.get(first)[0])
+        self.assertFalse(self.cache.get(second)[0])
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_set_after_invalidation_is_dropped(self):
+        generation = self.cache.generation
+        self.cache.invalidate(URL, '/api/users/bob')
+
+        self.cache.set(self.cache.key(URL + '/api/whoami'), 'stale', 60, generation=generation)
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate_related(self):
+        self.cache.ttls['/api/users'] = 10
+        users = self.put('/api/users')
+        overview = self.put('/api/overview')
+        nodes = self.put('/api/nodes')
+
+        self.cache.invalidate(URL, '/api/permissions/vhost/bob')
+
+        self.assertFalse(self.cache.get(users)[0])
+        self.assertFalse(self.cache.get(overview)[0])
+        self.assertTrue(self.cache.get(nodes)[0])
+        self.assertEqual(self.cache.stats()['invalidations'], 2)
+
+    def test_invalidate_vhost_clears_everything(self):
+        nodes = self.put('/api/nodes')
+        self.put('/api/vhosts')
+
+        self.cache.invalidate(URL, '/api/vhosts/my-vhost')
+
+        self.assertFalse(self.cache.get(nodes)[0])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate_other_url(self):
+        self.put('/api/vhosts')
+
+        self.cache.invalidate('http://127.0.0.1:1567', '/api/vhosts/my-vhost')
+
+        self.assertEqual(len(self.cache), 1)
+
+    def test_clear(self):
+        self.put('/api/overview')
+        generation = self.cache.generation
+
+        self.cache.clear()
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertNotEqual(self.cache.generation, generation)
@@ -0,0 +1,123 @@
+import io
+import json
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+
+from mock import patch
+
+from rabbitmq_admin import cli
+from rabbitmq_admin.tests.adapters import Chunks, ScriptedAdapter
+
+
+class MainTests(TestCase):
+
+    def setUp(self):
+        self.output = io.BytesIO()
+        # Lines only reach the output once they are flushed
+        stdout = patch.object(
+            sys, 'stdout', io.TextIOWrapper(io.BufferedWriter(self.output)))
+        stdout.start()
+        self.addCleanup(stdout.stop)
+        self.errors = []
+        stderr = patch.object(sys, 'stderr')
+        stderr.start().write.side_effect = self.errors.append
+        self.addCleanup(stderr.stop)
+
+    def run_cli(self, *argv, **answers):
+        client = cli._client
+
+        def connected(options):
+            api = client(options)
+            api._adapter = self.adapter
+            return api
+
+        self.adapter = ScriptedAdapter(answers.get('answers'), default=[b'{}'])
+        with patch.object(cli, '_client', side_effect=connected) as self.connect:
+            status = cli.main(list(argv))
+        return status, [json.loads(line) for line in self.output.getvalue().splitlines()]
+
+    def test_list_streams_json_lines(self):
+        lines_before_read = []
+        body = Chunks(
+            [b'[{"name": "a", "messages": 1},', b' {"name": "b", "messages": 2}', b']'],
+            on_read=lambda: lines_before_read.append(self.output.getvalue().count(b'\n')))
+        answers = {'/api/queues?columns=name%2Cmessages': (200, body)}
+
+        status, lines = self.run_cli(
+            'list-queues', '--columns', 'name,messages', answers=answers)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, [{'name': 'a', 'messages': 1}, {'name': 'b', 'messages': 2}])
+        # The first queue was written before the rest of the body was read
+        self.assertEqual(lines_before_read[:2], [0, 1])
+
+    def test_arguments(self):
+        status, lines = self.run_cli(
+            'create-vhost', 'tenant', 'tracing=true', '--url', 'http://rabbit:15672/')
+
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, [])
+        self.assertEqual(self.adapter.urls, ['http://rabbit:15672/api/vhosts/tenant'])
+
+    def test_get(self):
+        status, lines = self.run_cli(
+            'get-queue-for-vhost', 'orders', '/',
+            answers={'/api/queues/%2F/orders': [b'{"name": "orders"}']})
+
+        self.assertEqual(lines, [{'name': 'orders'}])
+
+    def test_parallel_vhosts(self):
+        answers = dict(
+            ('/api/queues/{0}'.format(vhost), [json.dumps([{'vhost': vhost}]).encode('utf-8')])
+            for vhost in ('a', 'b', 'c'))
+        answers['/api/queues/c'] = 500
+
+        status, lines = self.run_cli(
+            'list-queues', '--vhost', 'a', '--vhost', 'b', '--vhost', 'c', '--parallel', '3',
+            answers=answers)
+
+        self.assertEqual(status, 1)
+        self.assertEqual(sorted(line['vhost'] for line in lines), ['a', 'b'])
+        self.assertEqual(len(self.errors), 1)
+        self.assertIn('for vhost c', self.errors[0])
+
+    def test_all_vhosts(self):
+        answers = {'/api/vhosts?columns=name': [b'[{"name": "/"}, {"name": "a"}]']}
+
+        status, lines = self.run_cli('is-vhost-alive', '--all-vhosts', answers=answers)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(line['vhost'] for line in lines), ['/', 'a'])
+        self.assertEqual(lines[0]['result'], {})
+
+    def test_failure(self):
+        status, lines = self.run_cli('overview', answers={'/api/overview': 401})
+
+        self.assertEqual(status, 1)
+        self.assertIn('overview failed: 401', self.errors[0])
+
+    def test_usage_errors(self):
+        for argv in (['bulk-apply'], ['_call'], ['list-nothing'], ['overview', '--vhost', 'a']):
+            with self.assertRaises(SystemExit) as context:
+                self.run_cli(*argv)
+            self.assertEqual(context.exception.code, 2)
+            # The arguments are checked before a client is created
+            self.assertFalse(self.connect.called)
+
+    def test_parse_arguments(self):
+        self.assertEqual(
+            cli._parse_arguments(['a=b', 'x', 'n=5', 'body={"type": "direct"}', 'x-y=1']),
+            (['x', 'x-y=1'], {'a': 'b', 'n': 5, 'body': {'type': 'direct'}}))
+
+
+class LazyImportTests(TestCase):
+
+    @skipIf(sys.version_info < (3, 7), 'Needs module __getattr__')
+    def test_cli_does_not_import_requests(self):
+        code = ('import sys, rabbitmq_admin.cli; '
+                'print("requests" in sys.modules, "rabbitmq_admin.api" in sys.modules)')
+
+        output = subprocess.check_output([sys.executable, '-c', code])
+
+        self.assertEqual(output.split(), [b'False', b'False'])
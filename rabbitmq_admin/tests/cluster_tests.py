@@ -0,0 +1,188 @@
+from unittest import TestCase
+
+from mock import patch
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.base import Resource
+from rabbitmq_admin.cluster import NodePool
+
+
+URLS = ['http://rabbit-1:15672', 'http://rabbit-2:15672', 'http://rabbit-3:15672']
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError('{0} error'.format(status), response=response)
+
+
+class NodePoolTests(TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.pool = NodePool(URLS, eject_for=5, max_eject_for=12, clock=lambda: self.now)
+        self.first, self.second, self.third = self.pool.nodes
+
+    def test_requires_urls(self):
+        with self.assertRaises(ValueError):
+            NodePool([])
+
+    def test_reads_go_to_least_outstanding(self):
+        self.first.outstanding = 2
+        self.second.outstanding = 1
+        self.third.outstanding = 3
+
+        self.assertIs(self.pool.acquire(), self.second)
+        self.assertEqual(self.second.outstanding, 2)
+
+    def test_idle_nodes_take_turns(self):
+        nodes = []
+        for _ in range(6):
+            node = self.pool.acquire()
+            nodes.append(node)
+            self.pool.release(node)
+
+        self.assertEqual(set(nodes), set(self.pool.nodes))
+
+    def test_writes_stay_on_preferred_node(self):
+        self.first.outstanding = 5
+
+        self.assertIs(self.pool.acquire(read=False), self.first)
+        self.assertIs(self.pool.acquire(read=False), self.first)
+
+    def test_ejection_and_probe(self):
+        node = self.pool.acquire(read=False)
+        self.pool.release(node, failed=True)
+
+        self.assertEqual(self.pool.stats()[0], {
+            'url': URLS[0], 'outstanding': 0, 'failures': 1, 'ejected': True})
+        self.assertIs(self.pool.acquire(read=False), self.second)
+        self.assertNotIn(self.first, [self.pool.acquire() for _ in range(6)])
+
+        # Once the ejection expires, a single request probes the node
+        self.now += 5
+        probe = self.pool.acquire(read=False)
+        self.assertIs(probe, self.first)
+        self.assertIs(self.pool.acquire(read=False), self.second)
+
+        self.pool.release(probe)
+        self.assertEqual(self.first.failures, 0)
+        self.assertIsNone(self.first.ejected_until)
+        self.assertIs(self.pool.acquire(read=False), self.first)
+
+    def test_ejection_backs_off(self):
+        for expected in (5, 10, 12):
+            self.pool.release(self.pool.acquire(read=False), failed=True)
+            self.assertEqual(self.first.ejected_until, self.now + expected)
+            self.now += expected
+
+    def test_every_node_ejected(self):
+        for node, delay in zip(self.pool.nodes, (3, 1, 2)):
+            node.ejected_until = self.now + delay
+
+        self.assertIs(self.pool.acquire(), self.second)
+
+    def test_success_does_not_end_ejection(self):
+        node = self.pool.acquire(read=False)
+        self.pool.release(self.pool.acquire(read=False), failed=True)
+        self.pool.release(node)
+
+        self.assertTrue(self.pool.stats()[0]['ejected'])
+
+    def test_add(self):
+        self.pool.add('http://rabbit-4:15672/')
+        self.pool.add(URLS[0])
+
+        self.assertEqual(self.pool.urls, URLS + ['http://rabbit-4:15672'])
+
+    def test_call_fails_over_reads(self):
+        urls = []
+
+        def send(node):
+            urls.append(node.url)
+            if len(urls) < 3:
+                raise [requests.ConnectTimeout(), http_error(503)][len(urls) - 1]
+            return 'ok'
+
+        self.assertEqual(self.pool.call(send), 'ok')
+        self.assertEqual(len(set(urls)), 3)
+        self.assertEqual([stat['ejected'] for stat in self.pool.stats()].count(True), 2)
+
+    def test_call_does_not_retry_client_errors(self):
+        urls = []
+
+        def send(node):
+            urls.append(node.url)
+            raise http_error(404)
+
+        with self.assertRaises(requests.HTTPError):
+            self.pool.call(send)
+        self.assertEqual(len(urls), 1)
+        self.assertEqual(self.pool.stats()[0]['failures'], 0)
+
+    def test_call_retries_writes_on_connection_errors_only(self):
+        urls = []
+
+        def send(node):
+            urls.append(node.url)
+            raise requests.ConnectionError() if len(urls) == 1 else requests.ReadTimeout()
+
+        with self.assertRaises(requests.ReadTimeout):
+            self.pool.call(send, read=False)
+        self.assertEqual(urls, URLS[:2])
+
+    def test_call_gives_up_after_every_node(self):
+        def send(node):
+            raise requests.ConnectionError()
+
+        with self.assertRaises(requests.ConnectionError):
+            self.pool.call(send)
+        self.assertEqual([node.outstanding for node in self.pool.nodes], [0, 0, 0])
+
+
+class ClusterClientTests(TestCase):
+
+    def test_single_url(self):
+        api = AdminAPI(URLS[0] + '/', ('guest', 'guest'))
+
+        self.assertEqual(api.url, URLS[0])
+        self.assertIsNone(api.nodes)
+        self.assertIsNone(AdminAPI(URLS[:1], ('guest', 'guest')).nodes)
+
+    @patch.object(Resource, '_put')
+    @patch.object(Resource, '_get')
+    def test_requests_fail_over(self, mock_get, mock_put):
+        api = AdminAPI(URLS, ('guest', 'guest'))
+        self.assertEqual(api.url, URLS[0])
+        self.assertEqual(api.nodes.urls, URLS)
+
+        def get(**kwargs):
+            if kwargs['url'].startswith(URLS[0]):
+                raise requests.ConnectionError()
+            return {'url': kwargs['url']}
+        mock_get.side_effect = get
+
+        for _ in range(4):
+            self.assertNotEqual(api.overview()['url'], URLS[0] + '/api/overview')
+        self.assertEqual(mock_get.call_count, 5)
+
+        api.create_vhost('tenant')
+        self.assertEqual(mock_put.call_args[1]['url'], URLS[1] + '/api/vhosts/tenant')
+
+    @patch.object(Resource, '_get')
+    def test_discover_nodes(self, mock_get):
+        mock_get.return_value = [
+            {'name': 'rabbit@rabbit-1', 'running': True},
+            {'name': 'rabbit@rabbit-2', 'running': True},
+            {'name': 'rabbit@rabbit-3', 'running': False},
+        ]
+        api = AdminAPI(URLS[0], ('guest', 'guest'))
+
+        self.assertEqual(api.discover_nodes(), URLS[:2])
+        self.assertEqual(api.nodes.urls, URLS[:2])
+        self.assertEqual(
+            api.discover_nodes(scheme='https', port=15671),
+            URLS[:2] + ['https://rabbit-1:15671', 'https://rabbit-2:15671']
+        )
+        self.assertEqual(len(api.nodes.nodes), 4)
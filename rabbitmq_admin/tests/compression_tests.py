@@ -0,0 +1,152 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.cluster import PartialResponseError
+from rabbitmq_admin.compression import ChunkWriter, detect, read_chunks
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+
+
+class CompressionTests(TestCase):
+
+    def setUp(self):
+        self.chunks = [json.dumps({'index': i}).encode('utf-8') * 50 for i in range(100)]
+        self.data = b''.join(self.chunks)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_round_trip(self):
+        for compress in (None, 'gzip', 'bz2'):
+            path = os.path.join(self.directory, 'data')
+            with ChunkWriter(path, compress) as writer:
+                for chunk in self.chunks:
+                    writer.write(chunk)
+
+            self.assertEqual(writer.size, len(self.data))
+            with open(path, 'rb') as fileobj:
+                self.assertEqual(detect(fileobj.read(3)), compress)
+            self.assertEqual(b''.join(read_chunks(path, chunk_size=100)), self.data)
+            self.assertEqual(b''.join(read_chunks(path, compress)), self.data)
+
+    def test_file_objects_are_left_open(self):
+        fileobj = io.BytesIO()
+        with ChunkWriter(fileobj, 'gzip') as writer:
+            writer.write(self.data)
+
+        fileobj.seek(0)
+        self.assertEqual(b''.join(read_chunks(fileobj)), self.data)
+        self.assertFalse(fileobj.closed)
+
+    def test_truncated(self):
+        fileobj = io.BytesIO()
+        with ChunkWriter(fileobj, 'bz2') as writer:
+            writer.write(self.data)
+
+        with self.assertRaises(ValueError):
+            list(read_chunks(io.BytesIO(fileobj.getvalue()[:-10])))
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            ChunkWriter(io.BytesIO(), 'zip')
+
+
+class DefinitionsTransferTests(TestCase):
+
+    def setUp(self):
+        self.document = json.dumps({
+            'vhosts': [{'name': 'vhost-{0}'.format(i)} for i in range(1000)],
+        }).encode('utf-8')
+        self.api = AdminAPI('http://rabbit:15672', ('guest', 'guest'))
+        self.adapter = self.api._adapter = ScriptedAdapter(default=self.answer)
+        self.api.stream_chunk_size = 1024
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def answer(self, request):
+        return (204, b'') if request.method == 'POST' else self.document
+
+    def sent(self, method):
+        return [request for request, _ in self.adapter.sent if request.method == method]
+
+    def cluster(self):
+        api = AdminAPI(['http://rabbit-1:15672', 'http://rabbit-2:15672'], ('guest', 'guest'))
+        api._adapter = self.adapter
+        api.stream_chunk_size = 1024
+        return api
+
+    def test_export(self):
+        fileobj = io.BytesIO()
+
+        self.assertEqual(self.api.export_definitions(fileobj), len(self.document))
+        self.assertEqual(detect(fileobj.getvalue()), 'gzip')
+        self.assertEqual(b''.join(read_chunks(io.BytesIO(fileobj.getvalue()))), self.document)
+
+    def test_export_to_path(self):
+        path = os.path.join(self.directory, 'backup.json')
+
+        self.api.export_definitions(path, compress=None)
+
+        with open(path, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.document)
+        self.assertEqual(os.listdir(self.directory), ['backup.json'])
+
+    def test_export_failing_mid_body_is_not_retried(self):
+        api = self.cluster()
+        path = os.path.join(self.directory, 'backup.json')
+        with open(path, 'wb') as fileobj:
+            fileobj.write(b'previous backup')
+        self.adapter.script = [(200, [
+            self.document[:1024], self.document[1024:2048],
+            requests.ConnectionError('Read timed out')])]
+
+        with self.assertRaises(PartialResponseError):
+            api.export_definitions(path, compress=None)
+
+        self.assertEqual(len(self.sent('GET')), 1)
+        with open(path, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), b'previous backup')
+        self.assertEqual(os.listdir(self.directory), ['backup.json'])
+
+    def test_export_failing_to_connect_is_retried(self):
+        api = self.cluster()
+        fileobj = io.BytesIO()
+        self.adapter.script = [requests.ConnectionError()]
+
+        api.export_definitions(fileobj, compress=None)
+
+        self.assertEqual(len(self.sent('GET')), 2)
+        self.assertEqual(fileobj.getvalue(), self.document)
+
+    def test_import_streams_body(self):
+        fileobj = io.BytesIO()
+        with ChunkWriter(fileobj, 'gzip') as writer:
+            writer.write(self.document)
+        fileobj.seek(0)
+
+        self.api.import_definitions(fileobj)
+
+        request, = self.sent('POST')
+        chunks = request.body
+        self.assertEqual(request.url, 'http://rabbit:15672/api/definitions')
+        self.assertEqual(request.headers['Transfer-Encoding'], 'chunked')
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), self.document)
+
+    def test_import_retry_rereads_file(self):
+        self.api = AdminAPI(
+            ['http://rabbit-1:15672', 'http://rabbit-2:15672'], ('guest', 'guest'))
+        self.api._adapter = self.adapter
+        self.adapter.script = [requests.ConnectionError()]
+        fileobj = io.BytesIO(b'--' + self.document)
+        fileobj.read(2)
+
+        self.api.import_definitions(fileobj, compress=None)
+
+        failed, request = self.sent('POST')
+        self.assertEqual(b''.join(request.body), self.document)
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import requests
+
+from rabbitmq_admin.deadline import Deadline, DeadlineExceeded
+
+
+class DeadlineTests(TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.deadline = Deadline(10, clock=lambda: self.now)
+
+    def test_remaining(self):
+        self.now += 4
+
+        self.assertEqual(self.deadline.remaining(), 6)
+        self.assertFalse(self.deadline.expired)
+        self.assertEqual(self.deadline.check(), 6)
+
+    def test_cap(self):
+        self.now += 4
+
+        self.assertEqual(self.deadline.cap(None), 6)
+        self.assertEqual(self.deadline.cap(2), 2)
+        self.assertEqual(self.deadline.cap(60), 6)
+        self.assertEqual(self.deadline.cap((3, 60)), (3, 6))
+        self.assertEqual(self.deadline.cap((None, 1)), (6, 1))
+
+    def test_expired(self):
+        self.now += 10
+
+        self.assertTrue(self.deadline.expired)
+        with self.assertRaises(DeadlineExceeded):
+            self.deadline.cap(5)
+        self.assertTrue(issubclass(DeadlineExceeded, requests.Timeout))
@@ -0,0 +1,241 @@
+import copy
+import threading
+from unittest import TestCase
+
+from mock import patch
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.base import Resource
+from rabbitmq_admin.definitions import diff_definitions, plan_definitions
+
+
+CURRENT = {
+    'vhosts': [{'name': '/'}, {'name': 'old'}],
+    'users': [
+        {'name': 'guest', 'password_hash': 'abc', 'tags': 'administrator'},
+        {'name': 'app', 'password_hash': 'def', 'tags': ''},
+    ],
+    'permissions': [
+        {'user': 'guest', 'vhost': '/', 'configure': '.*', 'write': '.*', 'read': '.*'},
+        {'user': 'app', 'vhost': 'old', 'configure': '.*', 'write': '.*', 'read': '.*'},
+    ],
+    'policies': [],
+    'exchanges': [
+        {'vhost': '/', 'name': 'amq.direct', 'type': 'direct', 'durable': True},
+        {'vhost': '/', 'name': 'events', 'type': 'topic', 'durable': True,
+         'auto_delete': False, 'internal': False, 'arguments': {}},
+    ],
+    'queues': [
+        {'vhost': '/', 'name': 'work', 'durable': True, 'auto_delete': False, 'arguments': {}},
+        {'vhost': '/', 'name': 'stale', 'durable': True, 'auto_delete': False, 'arguments': {}},
+    ],
+    'bindings': [
+        {'vhost': '/', 'source': 'events', 'destination': 'work', 'destination_type': 'queue',
+         'routing_key': 'a.#', 'arguments': {}},
+        {'vhost': '/', 'source': 'events', 'destination': 'stale', 'destination_type': 'queue',
+         'routing_key': 'b', 'arguments': {}},
+        {'vhost': '/', 'source': 'events', 'destination': 'work', 'destination_type': 'queue',
+         'routing_key': 'old', 'arguments': {}},
+    ],
+}
+
+
+def desired_definitions():
+    desired = copy.deepcopy(CURRENT)
+    desired['vhosts'] = [{'name': '/'}, {'name': 'new'}]
+    desired['users'][0]['tags'] = ['administrator']
+    desired['users'][1]['tags'] = 'monitoring'
+    desired['permissions'] = [
+        desired['permissions'][0],
+        {'user': 'app', 'vhost': 'new', 'configure': '', 'write': '.*', 'read': '.*'},
+    ]
+    desired['policies'] = [
+        {'vhost': 'new', 'name': 'ha', 'pattern': '', 'definition': {'ha-mode': 'all'}},
+    ]
+    desired['queues'] = [
+        {'vhost': '/', 'name': 'work', 'durable': True, 'auto_delete': False,
+         'arguments': {'x-max-length': 10}},
+        {'vhost': 'new', 'name': 'jobs', 'durable': True},
+    ]
+    desired['bindings'] = [
+        CURRENT['bindings'][0],
+        {'vhost': 'new', 'source': 'amq.topic', 'destination': 'jobs',
+         'destination_type': 'queue', 'routing_key': 'jobs.#', 'arguments': {}},
+    ]
+    return desired
+
+
+class DiffDefinitionsTests(TestCase):
+
+    def test_no_changes(self):
+        diff = diff_definitions(CURRENT, copy.deepcopy(CURRENT))
+
+        self.assertFalse(diff)
+        self.assertEqual(diff.summary()['queues'], {'added': 0, 'removed': 0, 'changed': 0})
+
+    def test_diff(self):
+        diff = diff_definitions(CURRENT, desired_definitions())
+
+        self.assertTrue(diff)
+        self.assertEqual(diff.summary(), {
+            'vhosts': {'added': 1, 'removed': 1, 'changed': 0},
+            'users': {'added': 0, 'removed': 0, 'changed': 1},
+            'permissions': {'added': 1, 'removed': 1, 'changed': 0},
+            'policies': {'added': 1, 'removed': 0, 'changed': 0},
+            'exchanges': {'added': 0, 'removed': 0, 'changed': 0},
+            'queues': {'added': 1, 'removed': 1, 'changed': 1},
+            'bindings': {'added': 1, 'removed': 2, 'changed': 0},
+        })
+        self.assertEqual(diff.changed['users'][0][1]['name'], 'app')
+        self.assertEqual(diff.changed['queues'][0][0]['name'], 'work')
+
+    def test_missing_fields_are_not_changes(self):
+        desired = copy.deepcopy(CURRENT)
+        del desired['users'][0]['password_hash']
+        del desired['exchanges'][1]['arguments']
+
+        self.assertFalse(diff_definitions(CURRENT, desired))
+
+
+class PlanDefinitionsTests(TestCase):
+
+    def plan(self, current, desired):
+        return plan_definitions(None, diff_definitions(current, desired), desired)
+
+    def test_tags_only_change_keeps_password(self):
+        current = {'users': [{
+            'name': 'bob', 'password_hash': 'HASH', 'tags': 'administrator',
+            'hashing_algorithm': 'rabbit_password_hashing_sha256'}]}
+        desired = {'users': [{'name': 'bob', 'tags': 'monitoring'}]}
+
+        operation, = self.plan(current, desired)
+
+        self.assertEqual(operation.method, 'create_user')
+        self.assertEqual(operation.args, ('bob', ''))
+        self.assertEqual(operation.kwargs, {
+            'password_hash': 'HASH', 'tags': ['monitoring'],
+            'hashing_algorithm': 'rabbit_password_hashing_sha256'})
+
+    def test_policy_change_keeps_fields_left_out(self):
+        current = {'policies': [{
+            'vhost': '/', 'name': 'ha', 'pattern': '^ha\\.', 'definition': {'ha-mode': 'all'},
+            'priority': 5, 'apply-to': 'queues'}]}
+        desired = {'policies': [{
+            'vhost': '/', 'name': 'ha', 'definition': {'ha-mode': 'exactly'}}]}
+
+        operation, = self.plan(current, desired)
+
+        self.assertEqual(operation.args, ('/', 'ha', {'ha-mode': 'exactly'}))
+        # Fields with a default are reset to it, like the diff expects
+        self.assertEqual(operation.kwargs, {'pattern': '^ha\\.', 'priority': 0, 'apply_to': 'all'})
+
+
+class ReconcileDefinitionsTests(TestCase):
+    """
+    Reconciles definitions with a client whose transport records every
+    request instead of sending it
+    """
+
+    def setUp(self):
+        self.api = AdminAPI('http://127.0.0.1:15672', ('guest', 'guest'))
+        self.calls = []
+        self.bindings = CURRENT['bindings']
+        lock = threading.Lock()
+
+        def get(**kwargs):
+            path = kwargs['url'][len(self.api.url):]
+            if path == '/api/definitions':
+                return copy.deepcopy(CURRENT)
+            self.assertEqual(path, '/api/bindings/%2F')
+            return [dict(binding, properties_key=binding['routing_key'] + '-key')
+                    for binding in self.bindings]
+
+        def record(method):
+            def send(**kwargs):
+                path = kwargs['url'][len(self.api.url):]
+                with lock:
+                    self.calls.append((method, path, kwargs.get('data')))
+            return send
+
+        patchers = [patch.object(Resource, '_get', side_effect=get)] + [
+            patch.object(Resource, '_' + method, side_effect=record(method.upper()))
+            for method in ('put', 'post', 'delete')
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def paths(self):
+        return [(method, path) for method, path, _ in self.calls]
+
+    def test_dry_run(self):
+        diff = self.api.reconcile_definitions(desired_definitions(), dry_run=True)
+
+        self.assertTrue(diff)
+        self.assertIsNone(diff.report)
+        self.assertEqual(self.calls, [])
+
+    def test_apply_without_delete(self):
+        diff = self.api.reconcile_definitions(desired_definitions())
+
+        self.assertTrue(diff.report.ok)
+        self.assertEqual(sorted(self.paths()), [
+            ('POST', '/api/bindings/new/e/amq.topic/q/jobs'),
+            ('PUT', '/api/permissions/new/app'),
+            ('PUT', '/api/policies/new/ha'),
+            ('PUT', '/api/queues/new/jobs'),
+            ('PUT', '/api/users/app'),
+            ('PUT', '/api/vhosts/new'),
+        ])
+        paths = self.paths()
+        self.assertEqual(paths.index(('PUT', '/api/vhosts/new')), 0)
+        self.assertLess(
+            paths.index(('PUT', '/api/queues/new/jobs')),
+            paths.index(('POST', '/api/bindings/new/e/amq.topic/q/jobs'))
+        )
+        self.assertIn(
+            ('PUT', '/api/permissions/new/app', {'configure': '', 'write': '.*', 'read': '.*'}),
+            self.calls
+        )
+        self.assertIn(
+            ('PUT', '/api/users/app', {'tags': 'monitoring', 'password_hash': 'def'}),
+            self.calls
+        )
+
+    def test_apply_with_delete_and_recreate(self):
+        diff = self.api.reconcile_definitions(desired_definitions(), delete=True, recreate=True)
+
+        self.assertTrue(diff.report.ok)
+        paths = self.paths()
+        self.assertEqual(sorted(paths), sorted([
+            ('DELETE', '/api/vhosts/old'),
+            ('DELETE', '/api/queues/%2F/stale'),
+            ('DELETE', '/api/bindings/%2F/e/events/q/work/old-key'),
+            ('DELETE', '/api/queues/%2F/work'),
+            ('PUT', '/api/queues/%2F/work'),
+            ('POST', '/api/bindings/%2F/e/events/q/work'),
+            ('POST', '/api/bindings/new/e/amq.topic/q/jobs'),
+            ('PUT', '/api/permissions/new/app'),
+            ('PUT', '/api/policies/new/ha'),
+            ('PUT', '/api/queues/new/jobs'),
+            ('PUT', '/api/users/app'),
+            ('PUT', '/api/vhosts/new'),
+        ]))
+        self.assertLess(
+            paths.index(('DELETE', '/api/queues/%2F/work')),
+            paths.index(('PUT', '/api/queues/%2F/work'))
+        )
+        self.assertLess(
+            paths.index(('PUT', '/api/queues/%2F/work')),
+            paths.index(('POST', '/api/bindings/%2F/e/events/q/work'))
+        )
+
+    def test_binding_deleted_meanwhile(self):
+        self.bindings = []
+
+        diff = self.api.reconcile_definitions(desired_definitions(), delete=True)
+
+        self.assertTrue(diff.report.ok)
+        self.assertIn(('DELETE', '/api/queues/%2F/stale'), self.paths())
+        self.assertFalse([path for method, path in self.paths()
+                          if method == 'DELETE' and path.startswith('/api/bindings/')])
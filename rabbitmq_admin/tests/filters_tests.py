@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from rabbitmq_admin.filters import ConnectionFilter
+
+
+class ConnectionFilterTests(TestCase):
+
+    def setUp(self):
+        self.connection = {
+            'name': 'conn', 'vhost': '/', 'user': 'app', 'channels': 2,
+            'connected_at': 1000000, 'client_properties': {'product': 'pika'},
+            'recv_oct_details': {'rate': 0.0}, 'send_oct_details': {'rate': 0.0},
+        }
+
+    def test_no_criteria(self):
+        selected = ConnectionFilter()
+
+        self.assertTrue(selected(self.connection))
+        self.assertEqual(selected.columns, ['name', 'vhost', 'user'])
+        self.assertTrue(selected.disable_stats)
+
+    def test_idle_needs_stats(self):
+        selected = ConnectionFilter(idle=True)
+
+        self.assertTrue(selected(self.connection))
+        self.assertFalse(selected.disable_stats)
+        self.assertIn('recv_oct_details.rate', selected.columns)
+
+        self.connection['send_oct_details']['rate'] = 10.5
+        self.assertFalse(selected(self.connection))
+
+    def test_connected_for(self):
+        self.assertTrue(ConnectionFilter(connected_for=60, clock=lambda: 1060)(self.connection))
+        self.assertFalse(ConnectionFilter(connected_for=60, clock=lambda: 1059)(self.connection))
+
+    def test_channels(self):
+        self.assertTrue(ConnectionFilter(min_channels=2, max_channels=2)(self.connection))
+        self.assertFalse(ConnectionFilter(min_channels=3)(self.connection))
+        self.assertFalse(ConnectionFilter(max_channels=1)(self.connection))
+
+    def test_client_properties(self):
+        self.assertTrue(ConnectionFilter(client_properties={'product': 'pi'})(self.connection))
+        self.assertFalse(ConnectionFilter(client_properties={'product': '^ka'})(self.connection))
+        self.assertFalse(ConnectionFilter(client_properties={'missing': ''})(self.connection))
+
+    def test_user_and_vhost(self):
+        self.assertTrue(ConnectionFilter(user='app', vhost=['/', 'other'])(self.connection))
+        self.assertFalse(ConnectionFilter(user='ap')(self.connection))
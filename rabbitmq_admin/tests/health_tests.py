@@ -0,0 +1,129 @@
+from unittest import TestCase
+
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.bulk import Operation
+from rabbitmq_admin.health import CLUSTER_CHECKS, NODE_CHECKS, HealthReport
+from rabbitmq_admin.retry import RetryPolicy
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+
+
+def health_adapter(answers=None, delay=0):
+    """
+    Passes every check not given in ``answers``
+    """
+    return ScriptedAdapter(answers, default=(200, {'status': 'ok'}), delay=delay)
+
+
+FAILED = (503, {'status': 'failed', 'reason': 'resource alarm(s) in effect'})
+
+
+class HealthCheckTests(TestCase):
+
+    def setUp(self):
+        self.retry = RetryPolicy(sleep=lambda seconds: None)
+        self.api = AdminAPI(
+            ['http://rabbit-1:15672', 'http://rabbit-2:15672'], ('guest', 'guest'),
+            retry=self.retry)
+
+    def test_failed_check_is_returned(self):
+        self.api._adapter = adapter = health_adapter(
+            {'http://rabbit-1:15672/api/health/checks/local-alarms': FAILED})
+
+        with self.api.pinned('http://rabbit-1:15672/'):
+            self.assertEqual(self.api.check_local_alarms(), FAILED[1])
+
+        self.assertEqual(len(adapter.sent), 1)
+        self.assertEqual(self.retry.counters(), {})
+        self.assertEqual([node['failures'] for node in self.api.nodes.stats()], [0, 0])
+
+    def test_other_errors_raise(self):
+        self.api._adapter = health_adapter(
+            {'http://rabbit-2:15672/api/health/checks/alarms': (401, {})})
+
+        with self.api.pinned('http://rabbit-2:15672'):
+            with self.assertRaises(requests.HTTPError):
+                self.api.check_alarms()
+
+    def test_paths(self):
+        self.api._adapter = adapter = health_adapter()
+
+        with self.api.pinned('http://rabbit-2:15672'):
+            self.api.check_certificate_expiration(2, 'weeks')
+            self.api.check_port_listener(5672)
+            self.api.check_protocol_listener('amqp/ssl')
+            self.api.check_node_is_quorum_critical()
+
+        self.assertEqual(adapter.urls, [
+            'http://rabbit-2:15672/api/health/checks/certificate-expiration/2/weeks',
+            'http://rabbit-2:15672/api/health/checks/port-listener/5672',
+            'http://rabbit-2:15672/api/health/checks/protocol-listener/amqp%2Fssl',
+            'http://rabbit-2:15672/api/health/checks/node-is-quorum-critical',
+        ])
+
+
+class HealthSweepTests(TestCase):
+
+    def setUp(self):
+        self.api = AdminAPI(
+            ['http://rabbit-1:15672', 'http://rabbit-2:15672'], ('guest', 'guest'))
+        self.vhosts = ['vhost-{0}'.format(index) for index in range(20)]
+
+    def test_concurrent(self):
+        self.api._adapter = adapter = health_adapter(delay=0.1)
+
+        report = self.api.health_sweep(vhosts=self.vhosts, max_workers=32)
+
+        self.assertIsInstance(report, HealthReport)
+        self.assertTrue(report.ok)
+        self.assertEqual(len(report), len(adapter.sent))
+        self.assertEqual(len(report), 20 + len(CLUSTER_CHECKS) + 2 * len(NODE_CHECKS))
+        self.assertLess(report.elapsed, 0.5)
+
+    def test_report(self):
+        self.api._adapter = health_adapter({
+            '/api/vhosts?columns=name': (200, [{'name': '/'}, {'name': 'broken'}]),
+            '/api/aliveness-test/broken': (500, {'error': 'badarg'}),
+            'http://rabbit-2:15672/api/health/checks/local-alarms': FAILED,
+        })
+
+        report = self.api.health_sweep(
+            node_checks=[Operation('check_local_alarms'), Operation('check_port_listener', 5672)])
+        result = report.as_dict()
+
+        self.assertFalse(report.ok)
+        self.assertEqual(report.summary(), {
+            'passed': 5, 'failed': 2, 'checks': {'aliveness': 1, 'local_alarms': 1}})
+        self.assertEqual(sorted(result['vhosts']), ['/', 'broken'])
+        self.assertTrue(result['vhosts']['/']['aliveness']['ok'])
+        self.assertIn('500', result['vhosts']['broken']['aliveness']['reason'])
+        self.assertEqual(sorted(result['cluster']), ['alarms'])
+        self.assertEqual(
+            result['nodes']['http://rabbit-2:15672']['local_alarms']['reason'],
+            'resource alarm(s) in effect')
+        self.assertTrue(
+            result['nodes']['http://rabbit-1:15672']['port_listener/5672']['ok'])
+        self.assertIsInstance(report.failed[0].error, requests.HTTPError)
+
+    def test_vhosts_down_on_one_node(self):
+        self.api._adapter = health_adapter({
+            'http://rabbit-2:15672/api/health/checks/virtual-hosts': (
+                503, {'status': 'failed', 'reason': 'Some virtual hosts are down'}),
+        })
+
+        report = self.api.health_sweep(vhosts=[])
+        result = report.as_dict()
+
+        self.assertEqual([(failed.target, failed.check) for failed in report.failed],
+                         [('http://rabbit-2:15672', 'virtual_hosts')])
+        self.assertTrue(result['nodes']['http://rabbit-1:15672']['virtual_hosts']['ok'])
+        self.assertNotIn('virtual_hosts', result['cluster'])
+
+    def test_timeout(self):
+        self.api._adapter = adapter = health_adapter()
+
+        self.api.health_sweep(vhosts=[], timeout=2)
+
+        for request, options in adapter.sent:
+            self.assertLessEqual(max(options['timeout']), 2)
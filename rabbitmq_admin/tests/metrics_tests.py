@@ -0,0 +1,150 @@
+from unittest import TestCase
+
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.base import ApiPath
+from rabbitmq_admin.metrics import MetricsCollector, RequestEvent
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+
+
+BODY = b'[{"name": "a"}, {"name": "b"}]'
+
+
+class ApiPathTests(TestCase):
+
+    def test_quotes_params_and_keeps_template(self):
+        path = ApiPath('/api/queues/{vhost}/{queue}', vhost='/', queue='a b')
+
+        self.assertEqual(path, '/api/queues/%2F/a+b')
+        self.assertEqual(path.template, '/api/queues/{vhost}/{queue}')
+        self.assertEqual(path + '/get', '/api/queues/%2F/a+b/get')
+
+
+class HookTests(TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.api = AdminAPI('http://rabbit:15672', ('guest', 'guest'), hooks=[self.events.append])
+        self.adapter = self.api._adapter = ScriptedAdapter(default=BODY)
+
+    def test_no_hooks(self):
+        api = AdminAPI('http://rabbit:15672', ('guest', 'guest'))
+        api._adapter = self.adapter
+
+        self.assertEqual(len(api.list_queues_for_vhost('/')), 2)
+
+    def test_get_event(self):
+        self.api.list_queues_for_vhost('/', columns=['name'])
+
+        event, = self.events
+        self.assertEqual(event.method, 'GET')
+        self.assertEqual(event.endpoint, '/api/queues/{vhost}')
+        self.assertEqual(event.path, '/api/queues/%2F')
+        self.assertEqual(event.url, 'http://rabbit:15672/api/queues/%2F?columns=name')
+        self.assertEqual(event.status, 200)
+        self.assertEqual(event.bytes, len(BODY))
+        self.assertIsNone(event.caller)
+        self.assertIsNone(event.error)
+        self.assertGreaterEqual(event.latency, event.decode_time)
+        self.assertGreater(event.decode_time, 0)
+
+    def test_endpoint_without_params(self):
+        self.api.list_queues()
+
+        self.assertEqual(self.events[0].endpoint, '/api/queues')
+
+    def test_write_event(self):
+        self.adapter.default = (204, b'')
+        self.api.delete_vhost('tenant')
+
+        event, = self.events
+        self.assertEqual((event.method, event.endpoint, event.status), (
+            'DELETE', '/api/vhosts/{name}', 204))
+
+    def test_http_error_event(self):
+        self.adapter.default = 404
+
+        with self.assertRaises(requests.HTTPError):
+            self.api.get_vhost('missing')
+
+        event, = self.events
+        self.assertEqual(event.status, 404)
+        self.assertEqual(event.outcome, '404')
+        self.assertIsInstance(event.error, requests.HTTPError)
+
+    def test_connection_error_event(self):
+        self.adapter.default = requests.ConnectionError()
+
+        with self.assertRaises(requests.ConnectionError):
+            self.api.overview()
+        self.assertEqual(self.events[0].outcome, 'ConnectionError')
+
+    def test_caller(self):
+        with self.api.caller('billing'):
+            self.api.list_vhosts()
+            with self.api.caller('audit'):
+                self.api.list_users()
+            self.api.list_users()
+        self.api.list_vhosts()
+
+        self.assertEqual(
+            [event.caller for event in self.events], ['billing', 'audit', 'billing', None])
+
+    def test_stream_event_finishes_with_stream(self):
+        items = self.api.list_queues(stream=True)
+        self.assertEqual(self.events, [])
+
+        self.assertEqual([item['name'] for item in items], ['a', 'b'])
+        event, = self.events
+        self.assertEqual(event.bytes, len(BODY))
+        self.assertEqual(event.status, 200)
+
+    def test_failing_hook_is_ignored(self):
+        def fail(event):
+            raise ValueError()
+        self.api.hooks.insert(0, fail)
+
+        self.assertEqual(len(self.api.list_queues()), 2)
+        self.assertEqual(len(self.events), 1)
+
+
+class MetricsCollectorTests(TestCase):
+
+    def event(self, status=200, latency=0.02, size=300, caller=None):
+        event = RequestEvent('GET', '/api/queues/{vhost}', '/api/queues/%2F', caller)
+        event.status, event.latency, event.bytes, event.decode_time = status, latency, size, 0.5
+        return event
+
+    def test_snapshot(self):
+        metrics = MetricsCollector()
+        metrics(self.event())
+        metrics(self.event(status=404, latency=0.04))
+
+        self.assertEqual(list(metrics.snapshot().keys()), [('GET', '/api/queues/{vhost}', '')])
+        summary = metrics.snapshot()[('GET', '/api/queues/{vhost}', '')]
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(summary['bytes'], 600)
+        self.assertAlmostEqual(summary['latency'], 0.06)
+        self.assertEqual(summary['decode_time'], 1.0)
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_render(self):
+        metrics = MetricsCollector(prefix='rmq', latency_buckets=(0.1, 0.01), size_buckets=(1024,))
+        metrics(self.event(caller='a"b'))
+        metrics(self.event(latency=0.5, size=2048, caller='a"b'))
+
+        lines = metrics.render().splitlines()
+        labels = 'method="GET",endpoint="/api/queues/{vhost}",caller="a\\"b"'
+        self.assertIn('# TYPE rmq_requests_total counter', lines)
+        self.assertIn('rmq_requests_total{%s,status="200"} 2' % labels, lines)
+        self.assertIn('rmq_decode_seconds_total{%s} 1.0' % labels, lines)
+        self.assertIn('# TYPE rmq_request_duration_seconds histogram', lines)
+        self.assertIn('rmq_request_duration_seconds_bucket{%s,le="0.01"} 0' % labels, lines)
+        self.assertIn('rmq_request_duration_seconds_bucket{%s,le="0.1"} 1' % labels, lines)
+        self.assertIn('rmq_request_duration_seconds_bucket{%s,le="+Inf"} 2' % labels, lines)
+        self.assertIn('rmq_request_duration_seconds_count{%s} 2' % labels, lines)
+        self.assertIn('rmq_response_size_bytes_bucket{%s,le="1024.0"} 1' % labels, lines)
+        self.assertIn('rmq_response_size_bytes_sum{%s} 2348.0' % labels, lines)
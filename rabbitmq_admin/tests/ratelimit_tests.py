@@ -0,0 +1,189 @@
+import threading
+import time
+from unittest import TestCase
+
+from mock import Mock
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.deadline import Deadline, DeadlineExceeded
+from rabbitmq_admin.metrics import MetricsCollector
+from rabbitmq_admin.ratelimit import HIGH, LOW, NORMAL, Governor, RateLimiter, classify
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+
+
+class RateLimiterTests(TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def limiter(self, rate, burst=1):
+        return RateLimiter(rate, burst, clock=lambda: self.now, sleep=self.sleep)
+
+    def test_rate(self):
+        limiter = self.limiter(10)
+
+        waits = [limiter.acquire() for _ in range(4)]
+
+        self.assertEqual(waits[0], 0)
+        for wait in waits[1:]:
+            self.assertAlmostEqual(wait, 0.1)
+        self.assertAlmostEqual(self.now, 100.3)
+
+    def test_burst(self):
+        limiter = self.limiter(1, burst=3)
+
+        self.assertEqual([limiter.acquire() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(limiter.acquire(), 1)
+
+    def test_idle_time_refills_up_to_burst(self):
+        limiter = self.limiter(2, burst=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        self.now += 60
+
+        self.assertEqual([limiter.acquire() for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(limiter.acquire(), 0.5)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+class ClassifyTests(TestCase):
+
+    def test_classify(self):
+        self.assertEqual(classify('GET', '/api/overview'), HIGH)
+        self.assertEqual(classify('GET', '/api/aliveness-test/{vhost}'), HIGH)
+        self.assertEqual(classify('GET', '/api/queues/{vhost}/{queue}'), NORMAL)
+        self.assertEqual(classify('GET', '/api/queues'), LOW)
+        self.assertEqual(classify('PUT', '/api/vhosts/{name}'), LOW)
+
+
+class GovernorTests(TestCase):
+
+    def wait_for(self, governor, waiting):
+        for _ in range(500):
+            if governor.stats()['waiting'] == waiting:
+                return
+            time.sleep(0.01)
+        self.fail('{0} requests never queued'.format(waiting))
+
+    def test_priority_order(self):
+        governor = Governor(max_concurrent=1)
+        order = []
+
+        def request(level):
+            governor.acquire(level)
+            order.append(level)
+            governor.release()
+
+        governor.acquire()
+        threads = []
+        for level in (LOW, NORMAL, HIGH, LOW):
+            threads.append(threading.Thread(target=request, args=(level,)))
+            threads[-1].start()
+            self.wait_for(governor, len(threads))
+        governor.release()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, [HIGH, NORMAL, LOW, LOW])
+        self.assertEqual(governor.stats()['granted'], 5)
+
+    def test_concurrency_cap(self):
+        governor = Governor(max_concurrent=2)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def request():
+            governor.acquire()
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+            governor.release()
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(governor.stats()['active'], 0)
+
+    def test_deadline(self):
+        governor = Governor(max_concurrent=1)
+        governor.acquire()
+
+        with self.assertRaises(DeadlineExceeded):
+            governor.acquire(deadline=Deadline(0.05))
+        self.assertEqual(governor.stats()['waiting'], 0)
+
+        governor.release()
+        governor.acquire(deadline=Deadline(0.05))
+
+    def test_rate(self):
+        sleep = Mock()
+        governor = Governor(max_concurrent=2, rate=10, clock=lambda: 100.0, sleep=sleep)
+
+        governor.acquire()
+        governor.acquire()
+
+        sleep.assert_called_once_with(0.1)
+
+    def test_invalid_max_concurrent(self):
+        with self.assertRaises(ValueError):
+            Governor(max_concurrent=0)
+
+
+class ResourceGovernorTests(TestCase):
+
+    def setUp(self):
+        self.metrics = MetricsCollector()
+        self.governor = Governor(max_concurrent=1)
+        self.api = AdminAPI('http://rabbit:15672', ('guest', 'guest'),
+                            governor=self.governor, hooks=[self.metrics])
+        self.api._adapter = ScriptedAdapter()
+
+    def test_queue_wait_metric(self):
+        self.governor.acquire()
+        timer = threading.Timer(0.05, self.governor.release)
+        timer.start()
+
+        self.api.overview()
+        timer.join()
+
+        wait = self.metrics.snapshot()[('GET', '/api/overview', '')]['queue_wait']
+        self.assertGreater(wait, 0.03)
+        self.assertIn('rabbitmq_admin_queue_wait_seconds_count{method="GET",'
+                      'endpoint="/api/overview",caller=""} 1', self.metrics.render())
+        self.assertEqual(self.governor.stats()['active'], 0)
+
+    def test_priority(self):
+        self.governor.classify = Mock(return_value=LOW)
+        self.governor.acquire = Mock(return_value=0.0)
+
+        self.api.list_queues()
+        with self.api.priority(HIGH):
+            self.api.list_queues()
+
+        self.assertEqual([call[0][0] for call in self.governor.acquire.call_args_list],
+                         [LOW, HIGH])
+
+    def test_slot_released_after_error(self):
+        self.api.session.mount('http://', ScriptedAdapter(default=503))
+
+        with self.assertRaises(requests.HTTPError):
+            self.api.overview()
+        self.assertEqual(self.governor.stats()['active'], 0)
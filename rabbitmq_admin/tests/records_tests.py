@@ -0,0 +1,118 @@
+from unittest import TestCase
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.cache import ResponseCache
+from rabbitmq_admin.records import Channel, Record
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+
+CHANNELS = [
+    {
+        'name': '10.0.0.1:1024 -> 10.1.0.1:5672 ({0})'.format(number),
+        'number': number,
+        'vhost': '/',
+        'prefetch_count': 10,
+        'connection_details': {'name': '10.0.0.1:1024 -> 10.1.0.1:5672', 'peer_port': 1024},
+        'message_stats': {'ack': 5},
+    }
+    for number in (1, 2)
+]
+
+
+class RecordTests(TestCase):
+
+    def setUp(self):
+        self.item = CHANNELS[0]
+        self.record = Channel(self.item)
+
+    def test_attributes(self):
+        self.assertEqual(self.record.name, self.item['name'])
+        self.assertEqual(self.record.prefetch_count, 10)
+        self.assertEqual(self.record.connection_details['peer_port'], 1024)
+
+        with self.assertRaises(AttributeError):
+            self.record.consumer_count
+
+    def test_keys(self):
+        self.assertEqual(self.record['number'], 1)
+        self.assertEqual(self.record['message_stats'], {'ack': 5})
+        self.assertEqual(self.record.get('consumer_count', 0), 0)
+        self.assertIn('message_stats', self.record)
+        self.assertNotIn('consumer_count', self.record)
+
+        with self.assertRaises(KeyError):
+            self.record['consumer_count']
+
+    def test_nested_fields_are_decoded_lazily(self):
+        self.assertIsNone(self.record._decoded)
+        self.assertIsNotNone(self.record._extra)
+
+        self.record.name
+        self.assertIsNone(self.record._decoded)
+
+        self.record.message_stats
+        self.assertIsNone(self.record._extra)
+        self.assertEqual(self.record._decoded, {
+            'connection_details': self.item['connection_details'],
+            'message_stats': {'ack': 5},
+        })
+
+    def test_nested_values_are_never_unpacked(self):
+        record = Channel({'name': {'odd': True}})
+
+        self.assertEqual(record.name, {'odd': True})
+        self.assertEqual(record.extra, {'name': {'odd': True}})
+
+    def test_no_extra_fields(self):
+        record = Channel({'name': 'a', 'number': 1})
+
+        self.assertIsNone(record._extra)
+        self.assertEqual(record.extra, {})
+
+    def test_as_dict(self):
+        self.assertEqual(self.record.as_dict(), self.item)
+        self.assertEqual(self.record, Channel(self.item))
+        self.assertNotEqual(self.record, Channel(CHANNELS[1]))
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(self.record, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            self.record.unknown = True
+
+    def test_convert(self):
+        records = Channel.convert(CHANNELS)
+
+        self.assertEqual([record.number for record in records], [1, 2])
+        self.assertIsInstance(Channel.convert(self.item), Record)
+
+
+class AsRecordsTests(TestCase):
+
+    def setUp(self):
+        self.api = AdminAPI('http://rabbit:15672', ('guest', 'guest'))
+        self.api._adapter = ScriptedAdapter(default=CHANNELS)
+
+    def test_as_records(self):
+        channels = self.api.list_channels(as_records=True)
+
+        self.assertTrue(all(isinstance(channel, Channel) for channel in channels))
+        self.assertEqual([channel.as_dict() for channel in channels], CHANNELS)
+
+    def test_stream_as_records(self):
+        channels = list(self.api.list_channels(stream=True, as_records=True))
+
+        self.assertEqual([channel.number for channel in channels], [1, 2])
+        self.assertEqual(channels[1].connection_details['peer_port'], 1024)
+
+    def test_dicts_by_default(self):
+        self.assertEqual(self.api.list_channels(), CHANNELS)
+
+    def test_cached_records_and_dicts(self):
+        api = AdminAPI('http://rabbit:15672', ('guest', 'guest'),
+                       cache=ResponseCache(ttls={'/api/channels': 60}))
+        api._adapter = ScriptedAdapter(default=CHANNELS)
+
+        for as_records in (True, False, True, False):
+            channels = api.list_channels(as_records=as_records)
+            self.assertEqual(isinstance(channels[0], Channel), as_records)
+        self.assertEqual(api.cache.stats()['hits'], 2)
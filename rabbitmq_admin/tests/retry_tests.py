@@ -0,0 +1,226 @@
+from unittest import TestCase
+
+from mock import Mock
+import requests
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.deadline import DeadlineExceeded
+from rabbitmq_admin.metrics import MetricsCollector
+from rabbitmq_admin.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+
+
+def response(status, content=b'{}'):
+    response = requests.Response()
+    response.status_code = status
+    response._content = content
+    return response
+
+
+def http_error(status, content=b'{}'):
+    return requests.HTTPError(response=response(status, content))
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RetryPolicyTests(TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(attempts=3, backoff=1.0, max_backoff=3.0, random=lambda: 1.0)
+
+    def test_retryable(self):
+        retryable = self.policy.retryable
+
+        self.assertTrue(retryable('GET', http_error(503)))
+        self.assertTrue(retryable('DELETE', requests.ConnectionError()))
+        self.assertTrue(retryable('PUT', requests.Timeout()))
+        self.assertTrue(retryable('GET', http_error(500, b'{"reason": "Stats not ready"}')))
+        self.assertFalse(retryable('GET', http_error(500, b'{"reason": "badarg"}')))
+        self.assertFalse(retryable('GET', http_error(404)))
+        self.assertFalse(retryable('POST', http_error(503)))
+        self.assertFalse(retryable('GET', CircuitOpenError('/api/queues', 1.0)))
+
+    def test_post_opt_in(self):
+        policy = RetryPolicy(methods=('GET', 'POST'))
+
+        self.assertTrue(policy.retryable('POST', http_error(503)))
+
+    def test_delay_grows_with_full_jitter(self):
+        self.assertEqual([self.policy.delay(attempt) for attempt in (1, 2, 3, 4)],
+                         [1.0, 2.0, 3.0, 3.0])
+        self.policy.random = lambda: 0.25
+        self.assertEqual(self.policy.delay(2), 0.5)
+
+    def test_next_delay_counts(self):
+        error = http_error(503)
+
+        self.assertEqual(self.policy.next_delay('GET', '/api/queues', error, 1), 1.0)
+        self.assertEqual(self.policy.next_delay('GET', '/api/queues', error, 2), 2.0)
+        self.assertIsNone(self.policy.next_delay('GET', '/api/queues', error, 3))
+        self.assertIsNone(self.policy.next_delay('GET', '/api/queues', http_error(404), 1))
+        self.assertEqual(self.policy.counters(), {
+            ('GET', '/api/queues'): {'retries': 2, 'exhausted': 1}})
+
+
+class CircuitBreakerTests(TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.breaker = CircuitBreaker(threshold=2, reset_after=10, clock=self.clock)
+
+    def fail(self, endpoint='/api/queues'):
+        self.breaker.before(endpoint)
+        self.breaker.record(endpoint, http_error(503))
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail()
+        self.breaker.record('/api/queues')
+        self.fail()
+        self.breaker.before('/api/queues')
+        self.fail()
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.before('/api/queues')
+        self.assertEqual(context.exception.retry_after, 10)
+        self.breaker.before('/api/nodes')
+        self.assertEqual(self.breaker.counters()['/api/queues'],
+                         {'trips': 1, 'rejected': 1, 'open': True})
+
+    def test_client_errors_do_not_count(self):
+        for _ in range(3):
+            self.breaker.before('/api/queues')
+            self.breaker.record('/api/queues', http_error(404))
+
+        self.breaker.before('/api/queues')
+
+    def test_half_open(self):
+        self.fail()
+        self.fail()
+        self.clock.now += 10
+
+        self.breaker.before('/api/queues')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before('/api/queues')
+        self.breaker.record('/api/queues', requests.ConnectionError())
+
+        self.assertEqual(self.breaker.counters()['/api/queues']['trips'], 2)
+        self.clock.now += 10
+        self.breaker.before('/api/queues')
+        self.breaker.record('/api/queues')
+        self.breaker.before('/api/queues')
+        self.assertFalse(self.breaker.counters()['/api/queues']['open'])
+
+    def test_release(self):
+        self.fail()
+        self.fail()
+        self.clock.now += 10
+
+        self.breaker.before('/api/queues')
+        self.breaker.release('/api/queues')
+        self.breaker.before('/api/queues')
+        self.breaker.record('/api/queues', http_error(503))
+
+        self.assertEqual(self.breaker.counters()['/api/queues']['trips'], 2)
+
+
+class ResourceRetryTests(TestCase):
+
+    def setUp(self):
+        self.sleep = Mock()
+        self.metrics = MetricsCollector()
+        self.retry = RetryPolicy(attempts=3, random=lambda: 0.5, sleep=self.sleep)
+        self.api = AdminAPI(
+            'http://rabbit:15672', ('guest', 'guest'), retry=self.retry, hooks=[self.metrics])
+
+    def test_get_is_retried(self):
+        self.api._adapter = adapter = ScriptedAdapter(
+            script=[503, requests.ConnectionError(), (500, {'error': 'stats_not_ready'})])
+
+        with self.assertRaises(requests.HTTPError):
+            self.api.overview()
+        self.assertEqual(len(adapter.methods), 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+        self.api.session.mount('http://', ScriptedAdapter(script=[503]))
+        self.assertEqual(self.api.overview(), {})
+        self.assertEqual(self.retry.counters()[('GET', '/api/overview')],
+                         {'retries': 3, 'exhausted': 1})
+        self.assertEqual(
+            self.metrics.snapshot()[('GET', '/api/overview', '')]['retries'], 3)
+        self.assertIn(
+            'rabbitmq_admin_retries_total{method="GET",endpoint="/api/overview",caller=""} 3',
+            self.metrics.render())
+
+    def test_post_is_not_retried(self):
+        self.api._adapter = adapter = ScriptedAdapter(script=[503])
+
+        with self.assertRaises(requests.HTTPError):
+            self.api.create_binding('/', 'exchange', 'queue', routing_key='key')
+        self.assertEqual(adapter.methods, ['POST'])
+
+    def test_download_is_not_retried(self):
+        self.api._adapter = adapter = ScriptedAdapter(script=[503])
+
+        with self.assertRaises(requests.HTTPError):
+            self.api._api_download('/api/definitions', write=Mock())
+        self.assertEqual(len(adapter.methods), 1)
+
+    def test_breaker_fails_fast(self):
+        self.api.breaker = CircuitBreaker(threshold=2)
+        self.api._adapter = adapter = ScriptedAdapter(script=[503, 503, 503])
+
+        with self.assertRaises(CircuitOpenError):
+            self.api.get_vhost('a')
+        self.assertEqual(len(adapter.methods), 2)
+
+        with self.assertRaises(CircuitOpenError):
+            self.api.get_vhost('b')
+        self.assertEqual(len(adapter.methods), 2)
+        self.assertEqual(self.api.list_vhosts(), {})
+        self.assertEqual(self.api.breaker.counters()['/api/vhosts/{name}']['rejected'], 2)
+
+    def test_breaker_without_hooks(self):
+        api = AdminAPI('http://rabbit:15672', ('guest', 'guest'),
+                       breaker=CircuitBreaker(threshold=1))
+        api._adapter = ScriptedAdapter(script=[requests.ConnectionError()])
+
+        with self.assertRaises(requests.ConnectionError):
+            api.overview()
+        with self.assertRaises(CircuitOpenError):
+            api.overview()
+
+    def test_probe_not_sent_leaves_circuit_open(self):
+        clock = Clock()
+        self.api.breaker = CircuitBreaker(threshold=2, reset_after=10, clock=clock)
+        self.api._adapter = adapter = ScriptedAdapter(script=[503, 503, 503])
+        with self.assertRaises(CircuitOpenError):
+            self.api.get_vhost('a')
+        clock.now += 10
+
+        with self.api.deadline(0):
+            with self.assertRaises(DeadlineExceeded):
+                self.api.get_vhost('a')
+
+        # The probe is let through again, and one more failure reopens the circuit
+        with self.assertRaises(CircuitOpenError):
+            self.api.get_vhost('a')
+        self.assertEqual(len(adapter.methods), 3)
+        self.assertEqual(self.api.breaker.counters()['/api/vhosts/{name}']['trips'], 2)
+
+    def test_no_retry_past_deadline(self):
+        self.api._adapter = adapter = ScriptedAdapter(script=[503, 503])
+        self.retry.random = lambda: 1.0
+        self.retry.backoff = self.retry.max_backoff = 60
+
+        with self.api.deadline(30):
+            with self.assertRaises(requests.HTTPError):
+                self.api.overview()
+        self.assertEqual(len(adapter.methods), 1)
+        self.sleep.assert_not_called()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import json
+from unittest import TestCase
+
+from rabbitmq_admin.streaming import JSONArrayDecoder, iter_json_array
+
+
+class JSONArrayDecoderTests(TestCase):
+
+    def setUp(self):
+        self.items = [
+            {'name': u'caf\xe9 {0}'.format(i), 'arguments': {'x-max-length': i}, 'list': [i]}
+            for i in range(20)
+        ] + [12345, 2.5, 'text', None, True, [], {'a "[quoted]" {key}\\': [[{}], '}']}]
+        self.document = json.dumps(self.items).encode('utf-8')
+
+    def chunks(self, size):
+        return [self.document[i:i + size] for i in range(0, len(self.document), size)]
+
+    def test_every_chunk_size(self):
+        for size in (1, 2, 3, 7, 64, len(self.document)):
+            self.assertEqual(list(iter_json_array(self.chunks(size))), self.items)
+
+    def test_items_are_returned_as_they_complete(self):
+        decoder = JSONArrayDecoder()
+
+        self.assertEqual(decoder.feed(b'[{"name": "a"}, {"na'), [{'name': 'a'}])
+        self.assertEqual(decoder.feed(b'me": "b"}'), [])
+        self.assertEqual(decoder.feed(b']'), [{'name': 'b'}])
+        self.assertTrue(decoder.done)
+        self.assertEqual(decoder.close(), [])
+
+    def test_items_are_decoded_with_loads(self):
+        decoded = []
+
+        def loads(data):
+            decoded.append(data)
+            return json.loads(data.decode('utf-8'))
+
+        for size in (5, len(self.document)):
+            del decoded[:]
+            self.assertEqual(list(iter_json_array(self.chunks(size), loads)), self.items)
+            self.assertTrue(all(isinstance(data, bytes) for data in decoded))
+        # Complete items are decoded together
+        self.assertLess(len(decoded), len(self.items))
+
+    def test_number_split_across_chunks(self):
+        self.assertEqual(list(iter_json_array([b'[1', b'2.', b'5]'])), [12.5])
+
+    def test_buffer_only_holds_the_current_item(self):
+        decoder = JSONArrayDecoder()
+        decoder.feed(b'[' + b'{"a": 1},' * 1000 + b'{"b"')
+
+        self.assertEqual(decoder._buffer, b'{"b"')
+
+    def test_empty(self):
+        self.assertEqual(list(iter_json_array([b' [ ', b' ] '])), [])
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"a": 1}']))
+
+    def test_missing_separator(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1 2]']))
+
+    def test_trailing_comma(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1,]']))
+
+    def test_incomplete(self):
+        for document in (b'', b'[', b'[1,', b'[{"a": 1}'):
+            with self.assertRaises(ValueError):
+                list(iter_json_array([document]))
@@ -0,0 +1,112 @@
+from array import array
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+
+from rabbitmq_admin.api import AdminAPI
+from rabbitmq_admin.tests.adapters import ScriptedAdapter
+from rabbitmq_admin.timeseries import TimeSeries, compact_samples, history_params
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+SAMPLES = [
+    {'sample': 300, 'timestamp': 1500000020000},
+    {'sample': 100, 'timestamp': 1500000010000},
+    {'sample': 50, 'timestamp': 1500000000000},
+]
+
+QUEUE = {
+    'name': 'work',
+    'messages_details': {'rate': 1.0, 'samples': SAMPLES},
+    'message_stats': {'publish': 300, 'publish_details': {'rate': 20.0, 'samples': []}},
+}
+
+
+class HistoryParamsTests(TestCase):
+
+    def test_every_kind(self):
+        self.assertEqual(history_params((600, 10)), {
+            'msg_rates_age': 600, 'msg_rates_incr': 10,
+            'lengths_age': 600, 'lengths_incr': 10,
+            'data_rates_age': 600, 'data_rates_incr': 10,
+        })
+
+    def test_some_kinds(self):
+        self.assertEqual(history_params({'lengths': (60, 5)}), {
+            'lengths_age': 60, 'lengths_incr': 5})
+        self.assertEqual(history_params(None), {})
+
+        with self.assertRaises(ValueError):
+            history_params({'queue_lengths': (60, 5)})
+
+
+class TimeSeriesTests(TestCase):
+
+    def test_from_samples(self):
+        series = TimeSeries.from_samples(SAMPLES, use_numpy=False)
+
+        self.assertIsInstance(series.values, array)
+        self.assertEqual(list(series.timestamps), [1500000000000, 1500000010000, 1500000020000])
+        self.assertEqual(list(series.values), [50, 100, 300])
+        self.assertEqual(list(series), list(zip(series.timestamps, series.values)))
+        self.assertEqual(len(series), 3)
+        self.assertEqual(list(series.rates()), [5.0, 20.0])
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        series = TimeSeries.from_samples(SAMPLES, use_numpy=True)
+
+        self.assertEqual(series.values.dtype, numpy.float64)
+        self.assertEqual(series.rates().tolist(), [5.0, 20.0])
+
+    def test_compact_samples(self):
+        document = {
+            'name': 'work',
+            'messages_details': {'samples': list(SAMPLES)},
+            'consumer_details': [{'samples': 'not history'}],
+        }
+
+        self.assertIs(compact_samples(document, use_numpy=False), document)
+        self.assertIsInstance(document['messages_details']['samples'], TimeSeries)
+        self.assertEqual(document['consumer_details'][0]['samples'], 'not history')
+
+
+class HistoryRequestTests(TestCase):
+
+    def setUp(self):
+        self.api = AdminAPI('http://rabbit:15672', ('guest', 'guest'))
+        self.adapter = self.api._adapter = ScriptedAdapter(default=QUEUE)
+
+    def test_history(self):
+        queue = self.api.get_queue_for_vhost('work', '/', history={'lengths': (30, 10)})
+
+        self.assertEqual(
+            self.adapter.urls[0],
+            'http://rabbit:15672/api/queues/%2F/work?lengths_age=30&lengths_incr=10',
+        )
+        series = queue['messages_details']['samples']
+        self.assertIsInstance(series, TimeSeries)
+        self.assertEqual(list(series.values), [50, 100, 300])
+        self.assertEqual(len(queue['message_stats']['publish_details']['samples']), 0)
+
+    def test_no_history(self):
+        queue = self.api.get_queue_for_vhost('work', '/')
+
+        self.assertEqual(queue['messages_details']['samples'], SAMPLES)
+
+
+class LazyImportTests(TestCase):
+
+    def test_api_does_not_import_numpy(self):
+        code = ('import sys, rabbitmq_admin.api; '
+                'from rabbitmq_admin.timeseries import TimeSeries; '
+                'print("numpy" in sys.modules); '
+                'TimeSeries.from_samples([], use_numpy=False); '
+                'print("numpy" in sys.modules)')
+
+        output = subprocess.check_output([sys.executable, '-c', code])
+
+        self.assertEqual(output.split(), [b'False', b'False'])
@@ -0,0 +1,189 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from rabbitmq_admin.topology import Topology, TopicTrie, binding_identity, headers_match
+
+
+def exchange(name, exchange_type, **arguments):
+    return {'name': name, 'vhost': '/', 'type': exchange_type, 'arguments': arguments}
+
+
+def binding(source, destination, routing_key='', destination_type='queue', **arguments):
+    return {
+        'source': source, 'vhost': '/', 'destination': destination,
+        'destination_type': destination_type, 'routing_key': routing_key,
+        'arguments': arguments,
+        'properties_key': routing_key + ('~' + str(sorted(arguments)) if arguments else ''),
+    }
+
+
+EXCHANGES = [
+    exchange('', 'direct'),
+    exchange('orders', 'topic'),
+    exchange('broadcast', 'fanout'),
+    exchange('matching', 'headers'),
+    exchange('unrouted', 'direct', **{'alternate-exchange': 'broadcast'}),
+]
+
+BINDINGS = [
+    binding('', 'audit', 'audit'),
+    binding('orders', 'orders.eu', 'order.*.eu'),
+    binding('orders', 'orders.all', 'order.#'),
+    binding('orders', 'broadcast', 'order.cancelled.#', destination_type='exchange'),
+    binding('broadcast', 'audit'),
+    binding('broadcast', 'archive'),
+    binding('broadcast', 'orders', destination_type='exchange'),
+    binding('matching', 'pdf', **{'x-match': 'all', 'format': 'pdf', 'type': 'report'}),
+    binding('matching', 'any', **{'x-match': 'any', 'format': 'pdf', 'type': 'report'}),
+]
+
+
+class TopicTrieTests(TestCase):
+
+    def setUp(self):
+        self.trie = TopicTrie()
+        for key in ('a.b.c', 'a.*.c', 'a.#', '#', '*', '#.c', 'a.#.c', ''):
+            self.trie.add(key, key)
+
+    def test_match(self):
+        self.assertEqual(
+            self.trie.match('a.b.c'), set(['a.b.c', 'a.*.c', 'a.#', '#', '#.c', 'a.#.c']))
+        self.assertEqual(self.trie.match('a.c'), set(['a.#', '#', '#.c', 'a.#.c']))
+        self.assertEqual(self.trie.match('a'), set(['a.#', '#', '*']))
+        self.assertEqual(self.trie.match('b'), set(['#', '*']))
+        self.assertEqual(self.trie.match(''), set(['#', '']))
+        self.assertEqual(self.trie.match('a.x.y.c'), set(['a.#', '#', '#.c', 'a.#.c']))
+
+    def test_remove_prunes_empty_branches(self):
+        self.trie.remove('a.b.c', 'a.b.c')
+        self.trie.remove('a.*.c', 'a.*.c')
+
+        self.assertNotIn('b', self.trie.root.children['a'].children)
+        self.assertNotIn('*', self.trie.root.children['a'].children)
+        self.assertEqual(self.trie.match('a.b.c'), set(['a.#', '#', '#.c', 'a.#.c']))
+
+    def test_remove_unknown(self):
+        self.trie.remove('x.y', 'x.y')
+        self.trie.remove('a.b.c', 'other')
+
+        self.assertIn('a.b.c', self.trie.match('a.b.c'))
+
+
+class HeadersMatchTests(TestCase):
+
+    def test_all(self):
+        arguments = {'x-match': 'all', 'format': 'pdf', 'x-ignored': 1}
+
+        self.assertTrue(headers_match(arguments, {'format': 'pdf', 'size': 1}))
+        self.assertFalse(headers_match(arguments, {'format': 'zip'}))
+        self.assertTrue(headers_match({}, {}))
+
+    def test_any(self):
+        arguments = {'x-match': 'any', 'format': 'pdf', 'type': 'report'}
+
+        self.assertTrue(headers_match(arguments, {'type': 'report'}))
+        self.assertFalse(headers_match(arguments, {}))
+
+    def test_with_x(self):
+        arguments = {'x-match': 'all-with-x', 'x-tenant': 'a'}
+
+        self.assertTrue(headers_match(arguments, {'x-tenant': 'a'}))
+        self.assertFalse(headers_match(arguments, {}))
+
+
+class TopologyTests(TestCase):
+
+    def setUp(self):
+        self.topology = Topology(EXCHANGES, BINDINGS)
+
+    def test_indexes(self):
+        self.assertEqual(len(self.topology.bindings_from('/', 'broadcast')), 3)
+        self.assertEqual(
+            sorted(item['source'] for item in self.topology.bindings_to('/', 'audit')),
+            ['', 'broadcast'])
+        self.assertEqual(
+            self.topology.bindings_to('/', 'broadcast', destination_type='exchange'),
+            [BINDINGS[3]])
+        self.assertEqual(len(self.topology.bindings_in('/')), len(BINDINGS))
+        self.assertEqual(self.topology.bindings_in('other'), [])
+
+    def test_direct(self):
+        self.assertEqual(self.topology.route('/', '', 'audit'), set(['audit']))
+        self.assertEqual(self.topology.route('/', '', 'missing'), set())
+
+    def test_topic(self):
+        self.assertEqual(
+            self.topology.route('/', 'orders', 'order.created.eu'),
+            set(['orders.eu', 'orders.all']))
+        self.assertEqual(self.topology.route('/', 'orders', 'invoice.created'), set())
+
+    def test_exchange_to_exchange(self):
+        # orders -> broadcast -> orders is a cycle, which is only followed once
+        self.assertEqual(
+            self.topology.route('/', 'orders', 'order.cancelled.us'),
+            set(['orders.all', 'audit', 'archive']))
+
+    def test_fanout(self):
+        self.assertEqual(
+            self.topology.route('/', 'broadcast', 'anything'), set(['audit', 'archive']))
+        self.assertEqual(
+            self.topology.route('/', 'broadcast', 'order.placed'),
+            set(['audit', 'archive', 'orders.all']))
+
+    def test_headers(self):
+        self.assertEqual(
+            self.topology.route('/', 'matching', headers={'format': 'pdf', 'type': 'report'}),
+            set(['pdf', 'any']))
+        self.assertEqual(
+            self.topology.route('/', 'matching', headers={'format': 'pdf'}), set(['any']))
+        self.assertEqual(self.topology.route('/', 'matching'), set())
+
+    def test_alternate_exchange(self):
+        self.assertEqual(
+            self.topology.route('/', 'unrouted', 'nothing'), set(['audit', 'archive']))
+
+    def test_refresh_only_applies_changes(self):
+        trie = self.topology._tries[('/', 'orders')]
+        new = binding('orders', 'orders.us', 'order.*.us')
+
+        added, removed = self.topology.refresh(BINDINGS[2:] + [new])
+
+        self.assertEqual(added, [new])
+        self.assertEqual(removed, BINDINGS[:2])
+        self.assertIs(self.topology._tries[('/', 'orders')], trie)
+        self.assertEqual(
+            self.topology.route('/', 'orders', 'order.created.us'),
+            set(['orders.us', 'orders.all']))
+        self.assertEqual(self.topology.route('/', '', 'audit'), set())
+        self.assertNotIn(binding_identity(BINDINGS[0]), self.topology.bindings)
+        self.assertEqual(self.topology.refresh(BINDINGS[2:] + [new]), ([], []))
+
+    def test_refresh_exchange_type(self):
+        exchanges = [dict(item, type='fanout') if item['name'] == 'orders' else item
+                     for item in EXCHANGES]
+
+        self.topology.refresh(BINDINGS, exchanges)
+
+        self.assertNotIn(('/', 'orders'), self.topology._tries)
+        self.assertEqual(
+            self.topology.route('/', 'orders', 'invoice'),
+            set(['orders.eu', 'orders.all', 'audit', 'archive']))
+
+        self.topology.refresh(BINDINGS, EXCHANGES)
+
+        self.assertEqual(self.topology.route('/', 'orders', 'invoice'), set())
+        self.assertEqual(self.topology.route('/', 'orders', 'order.x.eu'),
+                         set(['orders.eu', 'orders.all']))
+
+    def test_from_api(self):
+        api = Mock()
+        api.list_exchanges_for_vhost.return_value = EXCHANGES
+        api.list_bindings_for_vhost.return_value = BINDINGS
+
+        topology = Topology.from_api(api, vhost='/')
+
+        api.list_exchanges_for_vhost.assert_called_once_with(
+            '/', columns=Topology.EXCHANGE_COLUMNS, disable_stats=True)
+        self.assertEqual(len(topology.bindings), len(BINDINGS))
+        self.assertEqual(topology.exchange_type('/', 'orders'), 'topic')
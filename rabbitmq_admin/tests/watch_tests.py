@@ -0,0 +1,123 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock
+import requests
+
+from rabbitmq_admin.watch import Change, Watcher, diff_snapshots
+
+
+class DiffSnapshotsTests(TestCase):
+
+    def test_diff(self):
+        old = {
+            ('/', 'a'): {'name': 'a', 'vhost': '/', 'state': 'running'},
+            ('/', 'b'): {'name': 'b', 'vhost': '/', 'state': 'running'},
+        }
+        new = {
+            ('/', 'a'): {'name': 'a', 'vhost': '/', 'state': 'blocked', 'channels': 1},
+            ('other', 'b'): {'name': 'b', 'vhost': 'other', 'state': 'running'},
+        }
+
+        changes = sorted(diff_snapshots('connections', old, new), key=lambda c: c.kind)
+
+        self.assertEqual(
+            [(change.kind, change.key) for change in changes],
+            [('added', ('other', 'b')), ('changed', ('/', 'a')), ('removed', ('/', 'b'))],
+        )
+        self.assertEqual(changes[1].fields, {
+            'state': ('running', 'blocked'),
+            'channels': (None, 1),
+        })
+        self.assertEqual(changes[2].item['vhost'], '/')
+
+    def test_no_changes(self):
+        snapshot = {(None, 'a'): {'name': 'a'}}
+        self.assertEqual(diff_snapshots('vhosts', snapshot, dict(snapshot)), [])
+
+
+class WatcherTests(TestCase):
+
+    def setUp(self):
+        self.api = Mock()
+        self.vhosts = [{'name': '/', 'tracing': False}]
+        self.api.list_vhosts.side_effect = lambda **kwargs: [dict(v) for v in self.vhosts]
+        self.now = 0.0
+        self.poll_time = 0.0
+
+        def clock():
+            self.now += self.poll_time
+            return self.now
+
+        self.watcher = Watcher(
+            self.api, ['vhosts'], ignore=['messages'], min_interval=1, max_interval=8,
+            clock=clock)
+
+    def test_unknown_collection(self):
+        with self.assertRaises(ValueError):
+            Watcher(self.api, ['bindings'])
+
+    def test_poll(self):
+        self.assertEqual(self.watcher.poll(), [])
+        self.api.list_vhosts.assert_called_once_with(columns=None, disable_stats=True)
+
+        self.vhosts.append({'name': 'new', 'tracing': False, 'messages': 1})
+        self.vhosts[0]['tracing'] = True
+        changes = sorted(self.watcher.poll(), key=lambda change: change.kind)
+
+        self.assertEqual([change.kind for change in changes], [Change.ADDED, Change.CHANGED])
+        self.assertEqual(changes[0].item, {'name': 'new', 'tracing': False})
+        self.assertEqual(changes[1].fields, {'tracing': (False, True)})
+
+        self.vhosts[1]['messages'] = 2
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_interval_backs_off_until_a_change(self):
+        intervals = []
+        for _ in range(5):
+            self.watcher.poll()
+            intervals.append(self.watcher.interval)
+        self.assertEqual(intervals, [2, 4, 8, 8, 8])
+
+        self.vhosts.pop()
+        self.assertEqual(len(self.watcher.poll()), 1)
+        self.assertEqual(self.watcher.interval, 1)
+
+    def test_interval_follows_slow_polls(self):
+        self.watcher.slow_factor = 10
+        self.watcher.poll()
+        self.vhosts.pop()
+        self.poll_time = 0.5
+
+        self.watcher.poll()
+
+        self.assertEqual(self.watcher.interval, 5)
+
+    def test_failed_poll_backs_off(self):
+        self.api.list_vhosts.side_effect = requests.ConnectionError()
+
+        with self.assertRaises(requests.ConnectionError):
+            self.watcher.poll()
+        self.assertEqual(self.watcher.interval, 2)
+
+    def test_run(self):
+        stop = threading.Event()
+        changes = []
+        waits = []
+        self.watcher.poll()
+        self.vhosts.append({'name': 'new'})
+
+        def callback(change):
+            changes.append(change)
+
+        def wait(interval):
+            waits.append(interval)
+            self.api.list_vhosts.side_effect = requests.ConnectionError()
+            if len(waits) == 2:
+                stop.set()
+
+        stop.wait = wait
+        self.watcher.run(callback, stop)
+
+        self.assertEqual([change.key for change in changes], [(None, 'new')])
+        self.assertEqual(waits, [1, 2])
@@ -0,0 +1,147 @@
+"""
+Compact time series for the sampled history the management API returns when
+it is asked for ``msg_rates_age``, ``lengths_age`` or ``data_rates_age``.
+
+Each ``samples`` list of ``{'sample': ..., 'timestamp': ...}`` dicts is
+replaced by a :class:`TimeSeries` backed by two arrays, which are NumPy arrays
+when NumPy is installed and :class:`array.array` otherwise. NumPy is only
+imported once a series is built.
+"""
+from array import array
+import sys
+
+_numpy = None
+
+#: The kinds of history the management API samples
+HISTORY_KINDS = ('msg_rates', 'lengths', 'data_rates')
+
+
+def _import_numpy():
+    """
+    NumPy, imported the first time it is needed, or ``None`` if it is not
+    installed
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def history_params(history):
+    """
+    The query string parameters that request sampled history.
+
+    :param history: ``(age, increment)`` in seconds for every kind of
+        history, or ``{kind: (age, increment)}`` with kinds from
+        :data:`HISTORY_KINDS`
+    :type history: tuple or dict
+
+    :rtype: dict
+    """
+    if not history:
+        return {}
+    if not isinstance(history, dict):
+        history = dict((kind, history) for kind in HISTORY_KINDS)
+
+    params = {}
+    for kind, (age, increment) in history.items():
+        if kind not in HISTORY_KINDS:
+            raise ValueError('Unknown kind of history: {0!r}'.format(kind))
+        params[kind + '_age'] = age
+        params[kind + '_incr'] = increment
+    return params
+
+
+class TimeSeries(object):
+    """
+    Samples in ascending time order, as two arrays of equal length:
+    :attr:`timestamps` in milliseconds since the epoch, and :attr:`values`.
+
+    Example ::
+
+        >>> queue = api.get_queue_for_vhost('work', '/', history=(600, 10))
+        >>> series = queue['messages_details']['samples']
+        >>> series.values.max(), series.rates()
+    """
+
+    def __init__(self, timestamps, values):
+        self.timestamps = timestamps
+        self.values = values
+
+    @classmethod
+    def from_samples(cls, samples, use_numpy=None):
+        """
+        :param samples: Samples as returned by the management API, newest
+            first
+        :type samples: list of dict
+
+        :param use_numpy: Whether to use NumPy arrays. Defaults to whether
+            NumPy is installed.
+        :type use_numpy: bool
+        """
+        samples = sorted(samples, key=lambda sample: sample['timestamp'])
+        timestamps = [sample['timestamp'] for sample in samples]
+        values = [sample['sample'] for sample in samples]
+        numpy = _import_numpy() if use_numpy or use_numpy is None else None
+        if use_numpy and numpy is None:
+            raise ImportError('NumPy is not installed')
+        if numpy is not None:
+            return cls(numpy.array(timestamps, dtype='int64'), numpy.array(values, dtype='float64'))
+        return cls(array('d', timestamps), array('d', values))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        """
+        Yields ``(timestamp, value)`` pairs
+        """
+        return iter(zip(self.timestamps, self.values))
+
+    def __repr__(self):
+        return '<TimeSeries of {0} samples>'.format(len(self))
+
+    def rates(self):
+        """
+        The change per second between consecutive samples, such as the
+        publish rate from the cumulative ``publish`` count. It has one item
+        less than the series.
+        """
+        timestamps, values = self.timestamps, self.values
+        # NumPy arrays mean that NumPy was imported already
+        numpy = sys.modules.get('numpy')
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            return numpy.diff(values) * 1000.0 / numpy.diff(timestamps)
+        return array('d', [
+            (value - previous) * 1000.0 / (timestamp - previous_timestamp)
+            for previous, value, previous_timestamp, timestamp
+            in zip(values, values[1:], timestamps, timestamps[1:])
+        ])
+
+
+def _is_samples(value):
+    return isinstance(value, list) and (
+        not value or (isinstance(value[0], dict) and 'timestamp' in value[0]))
+
+
+def compact_samples(document, use_numpy=None):
+    """
+    Replaces, in place, every ``samples`` list in a response with a
+    :class:`TimeSeries`, and returns the response.
+    """
+    stack = [document]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            for key, value in item.items():
+                if key == 'samples' and _is_samples(value):
+                    item[key] = TimeSeries.from_samples(value, use_numpy)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+    return document
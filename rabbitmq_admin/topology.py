@@ -0,0 +1,356 @@
+"""
+An in-memory index of exchanges and bindings that answers where a message
+published to an exchange ends up, without asking the server.
+"""
+
+
+def binding_identity(binding):
+    """
+    The key bindings are tracked by: ``(vhost, source, destination_type,
+    destination, properties_key)``. The properties key includes a hash of
+    the arguments, so bindings that only differ by arguments are told apart.
+    """
+    properties_key = binding.get('properties_key')
+    if properties_key is None:
+        properties_key = binding.get('routing_key', '')
+    return (binding['vhost'], binding['source'], binding['destination_type'],
+            binding['destination'], properties_key)
+
+
+def _words(key):
+    # Like the server, an empty key has no words rather than one empty word
+    return key.split('.') if key else []
+
+
+class _Node(object):
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children = {}
+        self.values = set()
+
+
+class TopicTrie(object):
+    """
+    Binding keys of a topic exchange in a trie of their words, where ``*``
+    matches exactly one word and ``#`` zero or more words ::
+
+        >>> trie = TopicTrie()
+        >>> trie.add('stock.*.nyse', 'q1')
+        >>> trie.add('stock.#', 'q2')
+        >>> trie.match('stock.ibm.nyse')
+        {'q1', 'q2'}
+
+    Matching a routing key only visits the branches its words can follow,
+    rather than testing every binding key.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+
+    def add(self, binding_key, value):
+        node = self.root
+        for word in _words(binding_key):
+            child = node.children.get(word)
+            if child is None:
+                child = node.children[word] = _Node()
+            node = child
+        node.values.add(value)
+
+    def remove(self, binding_key, value):
+        """
+        Removes ``value`` from ``binding_key``, and prunes the branches that
+        are left empty
+        """
+        words = _words(binding_key)
+        path = [self.root]
+        for word in words:
+            node = path[-1].children.get(word)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].values.discard(value)
+        for depth in range(len(words), 0, -1):
+            node = path[depth]
+            if node.values or node.children:
+                break
+            del path[depth - 1].children[words[depth - 1]]
+
+    def match(self, routing_key):
+        """
+        :returns: The values of every binding key that matches
+        :rtype: set
+        """
+        words = _words(routing_key)
+        count = len(words)
+        matched = set()
+        seen = set()
+        pending = [(self.root, 0)]
+        while pending:
+            node, index = pending.pop()
+            if (id(node), index) in seen:
+                continue
+            seen.add((id(node), index))
+            rest = node.children.get('#')
+            if rest is not None:
+                pending.extend((rest, skip) for skip in range(index, count + 1))
+            if index == count:
+                matched.update(node.values)
+                continue
+            for word in (words[index], '*'):
+                child = node.children.get(word)
+                if child is not None:
+                    pending.append((child, index + 1))
+        return matched
+
+
+def headers_match(arguments, headers):
+    """
+    Whether a message with ``headers`` matches the ``arguments`` of a binding
+    to a headers exchange
+    """
+    mode = arguments.get('x-match', 'all')
+    with_x = mode.endswith('-with-x')
+    expected = [
+        (key, value) for key, value in arguments.items()
+        if key != 'x-match' and (with_x or not key.startswith('x-'))
+    ]
+    matches = (
+        key in headers and (value is None or headers[key] == value) for key, value in expected
+    )
+    if mode.startswith('any'):
+        return any(matches)
+    return all(matches)
+
+
+class Topology(object):
+    """
+    Exchanges and bindings, indexed by source, destination and vhost ::
+
+        >>> topology = Topology.from_api(api)
+        >>> topology.route('/', 'orders', 'order.created.eu')
+        {'audit', 'orders.eu'}
+
+    Routes follow bindings from exchanges to exchanges, and the
+    ``alternate-exchange`` argument of exchanges that match no binding.
+    Direct, fanout, topic and headers exchanges are resolved. Exchanges of
+    other types, such as those of plugins, are taken to route to every
+    binding, so their result is where a message may end up.
+
+    :meth:`refresh` applies a new snapshot of bindings by adding and removing
+    only the bindings that changed.
+    """
+
+    #: The exchange fields that routing needs
+    EXCHANGE_COLUMNS = ('name', 'vhost', 'type', 'arguments')
+
+    def __init__(self, exchanges=(), bindings=()):
+        """
+        :param exchanges: Exchanges as returned by
+            :meth:`rabbitmq_admin.api.AdminAPI.list_exchanges`
+        :type exchanges: list of dict
+
+        :param bindings: Bindings as returned by
+            :meth:`rabbitmq_admin.api.AdminAPI.list_bindings`
+        :type bindings: list of dict
+        """
+        #: Exchanges by ``(vhost, name)``
+        self.exchanges = {}
+        #: Bindings by :func:`binding_identity`
+        self.bindings = {}
+        #: Binding identities by ``(vhost, source)``
+        self.by_source = {}
+        #: Binding identities by ``(vhost, destination_type, destination)``
+        self.by_destination = {}
+        #: Binding identities by vhost
+        self.by_vhost = {}
+        # Binding identities by (vhost, source), then by routing key
+        self._by_routing_key = {}
+        # A TopicTrie of binding identities for each topic exchange
+        self._tries = {}
+        self.refresh(bindings, exchanges)
+
+    @classmethod
+    def from_api(cls, api, vhost=None):
+        """
+        Builds the index from the exchanges and bindings of a server, or of
+        one of its vhosts
+
+        :param api: The client to fetch with
+        :type api: rabbitmq_admin.api.AdminAPI
+        """
+        if vhost is None:
+            exchanges = api.list_exchanges(columns=cls.EXCHANGE_COLUMNS, disable_stats=True)
+            bindings = api.list_bindings()
+        else:
+            exchanges = api.list_exchanges_for_vhost(
+                vhost, columns=cls.EXCHANGE_COLUMNS, disable_stats=True)
+            bindings = api.list_bindings_for_vhost(vhost)
+        return cls(exchanges, bindings)
+
+    def exchange_type(self, vhost, name):
+        """
+        The type of an exchange, ``'direct'`` for exchanges that are not
+        indexed
+        """
+        exchange = self.exchanges.get((vhost, name))
+        return exchange.get('type', 'direct') if exchange is not None else 'direct'
+
+    def refresh(self, bindings, exchanges=None):
+        """
+        Applies a new snapshot of bindings, and optionally of exchanges.
+        Bindings that did not change are left as they are.
+
+        :returns: The bindings added and the bindings removed
+        :rtype: tuple of two lists
+        """
+        if exchanges is not None:
+            for source in self._refresh_exchanges(exchanges):
+                self._index_topic(source)
+
+        snapshot = dict((binding_identity(binding), binding) for binding in bindings)
+        removed = [self._remove(key) for key in list(self.bindings) if key not in snapshot]
+        added = []
+        for key, binding in snapshot.items():
+            if key not in self.bindings:
+                self._add(key, binding)
+                added.append(binding)
+        return added, removed
+
+    def _refresh_exchanges(self, exchanges):
+        """
+        Replaces the exchanges, and returns those whose type changed
+        """
+        old = self.exchanges
+        self.exchanges = dict(
+            ((exchange['vhost'], exchange['name']), exchange) for exchange in exchanges)
+        return set(
+            source for source in set(old) | set(self.exchanges)
+            if (old.get(source) or {}).get('type') != (
+                self.exchanges.get(source) or {}).get('type')
+        )
+
+    def _index_topic(self, source):
+        """
+        Rebuilds the trie of an exchange whose type changed
+        """
+        self._tries.pop(source, None)
+        if self.exchange_type(*source) == 'topic':
+            trie = self._tries[source] = TopicTrie()
+            for key in self.by_source.get(source, ()):
+                trie.add(self.bindings[key].get('routing_key', ''), key)
+
+    def _add(self, key, binding):
+        vhost, source, destination_type, destination, _ = key
+        routing_key = binding.get('routing_key', '')
+        self.bindings[key] = binding
+        self.by_source.setdefault((vhost, source), set()).add(key)
+        self.by_destination.setdefault((vhost, destination_type, destination), set()).add(key)
+        self.by_vhost.setdefault(vhost, set()).add(key)
+        self._by_routing_key.setdefault((vhost, source), {}).setdefault(
+            routing_key, set()).add(key)
+        if self.exchange_type(vhost, source) == 'topic':
+            trie = self._tries.get((vhost, source))
+            if trie is None:
+                trie = self._tries[(vhost, source)] = TopicTrie()
+            trie.add(routing_key, key)
+
+    def _remove(self, key):
+        vhost, source, destination_type, destination, _ = key
+        binding = self.bindings.pop(key)
+        routing_key = binding.get('routing_key', '')
+        _discard(self.by_source, (vhost, source), key)
+        _discard(self.by_destination, (vhost, destination_type, destination), key)
+        _discard(self.by_vhost, vhost, key)
+        by_routing_key = self._by_routing_key[(vhost, source)]
+        _discard(by_routing_key, routing_key, key)
+        if not by_routing_key:
+            del self._by_routing_key[(vhost, source)]
+        if (vhost, source) in self._tries:
+            self._tries[(vhost, source)].remove(routing_key, key)
+        return binding
+
+    def bindings_from(self, vhost, exchange):
+        """
+        The bindings whose source is ``exchange``
+        """
+        return [self.bindings[key] for key in self.by_source.get((vhost, exchange), ())]
+
+    def bindings_to(self, vhost, destination, destination_type='queue'):
+        """
+        The bindings whose destination is ``destination``
+        """
+        return [self.bindings[key] for key in self.by_destination.get(
+            (vhost, destination_type, destination), ())]
+
+    def bindings_in(self, vhost):
+        """
+        The bindings of a vhost
+        """
+        return [self.bindings[key] for key in self.by_vhost.get(vhost, ())]
+
+    def match(self, vhost, exchange, routing_key='', headers=None):
+        """
+        The identities of the bindings of one exchange that a message
+        matches, without following them to other exchanges
+
+        :rtype: set
+        """
+        source = (vhost, exchange)
+        exchange_type = self.exchange_type(vhost, exchange)
+        if exchange_type == 'direct':
+            return set(self._by_routing_key.get(source, {}).get(routing_key, ()))
+        if exchange_type == 'topic':
+            trie = self._tries.get(source)
+            return trie.match(routing_key) if trie is not None else set()
+        keys = self.by_source.get(source, set())
+        if exchange_type == 'headers':
+            return set(key for key in keys if headers_match(
+                self.bindings[key].get('arguments') or {}, headers or {}))
+        return set(keys)
+
+    def route(self, vhost, exchange, routing_key='', headers=None):
+        """
+        The queues a message published to ``exchange`` ends up in
+
+        :param headers: The message headers, for headers exchanges
+        :type headers: dict
+
+        :rtype: set of str
+        """
+        queues = set()
+        visited = set()
+        pending = [exchange]
+        while pending:
+            name = pending.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            keys = self.match(vhost, name, routing_key, headers)
+            if not keys:
+                alternate = self._alternate_exchange(vhost, name)
+                if alternate is not None:
+                    pending.append(alternate)
+            for _, _, destination_type, destination, _ in keys:
+                if destination_type == 'queue':
+                    queues.add(destination)
+                else:
+                    pending.append(destination)
+        return queues
+
+    def _alternate_exchange(self, vhost, name):
+        exchange = self.exchanges.get((vhost, name))
+        if exchange is None:
+            return None
+        return (exchange.get('arguments') or {}).get('alternate-exchange')
+
+
+def _discard(index, key, value):
+    """
+    Removes ``value`` from the set at ``index[key]``, and the set once empty
+    """
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
@@ -0,0 +1,217 @@
+"""
+Polls collections such as connections or exchanges and reports what changed
+between polls, instead of whole snapshots.
+"""
+import logging
+import time
+import timeit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class Change(object):
+    """
+    An object that was added, removed or changed between two polls
+    """
+
+    ADDED, REMOVED, CHANGED = 'added', 'removed', 'changed'
+
+    def __init__(self, kind, collection, key, item, fields=None):
+        #: :attr:`ADDED`, :attr:`REMOVED` or :attr:`CHANGED`
+        self.kind = kind
+        #: The collection, e.g. ``'connections'``
+        self.collection = collection
+        #: The identity of the object, ``(vhost, name)``. ``vhost`` is
+        #: ``None`` for objects outside vhosts, such as vhosts themselves.
+        self.key = key
+        #: The object as last seen
+        self.item = item
+        #: For changed objects, ``(old, new)`` by changed field
+        self.fields = fields or {}
+
+    def __repr__(self):
+        return '<Change {0} {1} {2!r}>'.format(self.kind, self.collection, self.key)
+
+
+def identity(item):
+    """
+    The key objects are tracked by: their vhost and name
+    """
+    return item.get('vhost'), item.get('name')
+
+
+def diff_snapshots(collection, old, new):
+    """
+    :param old: The previous snapshot, by :func:`identity`
+    :type old: dict
+    :param new: The current snapshot, by :func:`identity`
+    :type new: dict
+
+    :returns: The changes from ``old`` to ``new``
+    :rtype: list of :class:`Change`
+    """
+    changes = []
+    for key, item in new.items():
+        previous = old.get(key)
+        if previous is None:
+            changes.append(Change(Change.ADDED, collection, key, item))
+        elif previous != item:
+            fields = dict(
+                (field, (previous.get(field), item.get(field)))
+                for field in set(previous) | set(item)
+                if previous.get(field) != item.get(field)
+            )
+            changes.append(Change(Change.CHANGED, collection, key, item, fields))
+    for key, item in old.items():
+        if key not in new:
+            changes.append(Change(Change.REMOVED, collection, key, item))
+    return changes
+
+
+class Watcher(object):
+    """
+    Polls collections of an :class:`rabbitmq_admin.api.AdminAPI` and emits the
+    objects added, removed or changed since the previous poll ::
+
+        >>> watcher = Watcher(api, ['connections', 'vhosts'])
+        >>> for change in watcher.poll():
+        ...     print(change.kind, change.key, sorted(change.fields))
+
+    or, in a loop that runs until ``stop`` is set ::
+
+        >>> watcher.run(handle_change, stop=threading.Event())
+
+    Only collections whose objects have a name can be watched, see
+    :attr:`COLLECTIONS`. The first poll only records a baseline.
+
+    The interval between polls doubles, up to ``max_interval``, for every
+    poll that finds no change, and returns to ``min_interval`` as soon as one
+    does. It is also kept at ``slow_factor`` times the duration of the last
+    poll, so a slow broker is polled less often.
+    """
+
+    #: The collections that can be watched
+    COLLECTIONS = (
+        'nodes', 'connections', 'channels', 'exchanges', 'queues', 'vhosts', 'users', 'policies')
+
+    def __init__(self, api, collections=('connections', 'exchanges', 'vhosts'), columns=None,
+                 ignore=(), min_interval=5, max_interval=120, backoff=2.0, slow_factor=10,
+                 clock=timeit.default_timer, sleep=time.sleep):
+        """
+        :param api: The client to poll with
+        :type api: rabbitmq_admin.api.AdminAPI
+
+        :param collections: The collections to poll, by the name of their
+            ``list_*`` method, e.g. ``'queues'`` for :meth:`list_queues`
+        :type collections: list of str
+
+        :param columns: The fields to request and compare, by collection.
+            Statistics are never requested, so that only configuration and
+            state changes are reported.
+        :type columns: dict
+
+        :param ignore: Fields left out of the comparison
+        :type ignore: set of str
+
+        :param min_interval: The shortest time between polls, in seconds
+        :type min_interval: float
+
+        :param max_interval: The longest time between polls, in seconds
+        :type max_interval: float
+
+        :param backoff: What the interval is multiplied by after a poll that
+            finds no change, or fails
+        :type backoff: float
+
+        :param slow_factor: The least the interval can be, as a multiple of
+            how long the last poll took
+        :type slow_factor: float
+        """
+        for collection in collections:
+            if collection not in self.COLLECTIONS:
+                raise ValueError('Cannot watch {0!r}'.format(collection))
+        self.api = api
+        self.collections = list(collections)
+        self.columns = columns or {}
+        self.ignore = frozenset(ignore)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.slow_factor = slow_factor
+        self.clock = clock
+        self.sleep = sleep
+
+        #: The time to wait before the next poll, in seconds
+        self.interval = min_interval
+        #: The last snapshot of each collection, by :func:`identity`
+        self.snapshots = {}
+
+    def fetch(self, collection):
+        """
+        The current objects of ``collection``, by :func:`identity`
+        """
+        items = getattr(self.api, 'list_' + collection)(
+            columns=self.columns.get(collection), disable_stats=True)
+        ignore = self.ignore
+        return dict(
+            (identity(item), dict((field, value) for field, value in item.items()
+                                  if field not in ignore))
+            for item in items
+        )
+
+    def poll(self):
+        """
+        Fetches every collection once and updates :attr:`interval`.
+
+        :returns: The changes since the previous poll
+        :rtype: list of :class:`Change`
+        """
+        start = self.clock()
+        changes = []
+        try:
+            for collection in self.collections:
+                snapshot = self.fetch(collection)
+                if collection in self.snapshots:
+                    changes.extend(diff_snapshots(
+                        collection, self.snapshots[collection], snapshot))
+                self.snapshots[collection] = snapshot
+        except Exception:
+            self.adapt(changed=False, elapsed=self.clock() - start)
+            raise
+        self.adapt(changed=bool(changes), elapsed=self.clock() - start)
+        return changes
+
+    def adapt(self, changed, elapsed):
+        """
+        Sets :attr:`interval` after a poll that took ``elapsed`` seconds
+        """
+        interval = self.min_interval if changed else self.interval * self.backoff
+        interval = max(interval, elapsed * self.slow_factor, self.min_interval)
+        self.interval = min(interval, self.max_interval)
+
+    def run(self, callback, stop=None):
+        """
+        Polls until ``stop`` is set, calling ``callback`` with every change.
+        Failed polls are logged and retried after a longer interval.
+
+        :param callback: Called with each :class:`Change`
+        :type callback: callable
+
+        :param stop: Set it to end the loop. It also interrupts the wait
+            between polls.
+        :type stop: threading.Event
+        """
+        while stop is None or not stop.is_set():
+            try:
+                changes = self.poll()
+            except requests.RequestException:
+                logger.exception('Polling %s failed', ', '.join(self.collections))
+                changes = []
+            for change in changes:
+                callback(change)
+            if stop is None:
+                self.sleep(self.interval)
+            else:
+                stop.wait(self.interval)
@@ -17,6 +17,7 @@ def get_version():
         raise RuntimeError('Unable to find version string in {0}.'.format(VERSION_FILE))
 
 install_requires = [
+    'futures>=3.0.0;python_version<"3"',
     'requests>=2.7.0',
     'six>=1.8.0'
 ]
@@ -31,6 +32,8 @@ docs_require = [
     'sphinx_rtd_theme']
 
 extras_require = {
+    'async': ['aiohttp>=3.0;python_version>="3.7"'],
+    'fast': ['orjson>=3.0;python_version>="3.6"'],
     'test': tests_require,
     'packaging': ['wheel'],
     'docs': docs_require,
@@ -50,7 +53,7 @@ setup(
     author='Micah Hausler',
     author_email='opensource@ambition.com',
     keywords='RabbitMQ, AMQP, admin',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     classifiers=[
         'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3.4',
@@ -65,5 +68,8 @@ setup(
     install_requires=install_requires,
     tests_require=tests_require,
     extras_require=extras_require,
+    entry_points={
+        'console_scripts': ['rabbitmq-admin = rabbitmq_admin.cli:main'],
+    },
     zip_safe=False,
 )